@@ -45,7 +45,8 @@ CREATE TABLE bph_works (
     -- Status
     status TEXT,
 
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()   -- Maintained by trigger; snapshot refresh key
 );
 
 -- Indexes
@@ -58,6 +59,23 @@ CREATE INDEX IF NOT EXISTS idx_bph_author ON bph_works(author);
 CREATE INDEX IF NOT EXISTS idx_bph_title_fts ON bph_works
     USING GIN (to_tsvector('simple', COALESCE(title, '')));
 
+CREATE INDEX IF NOT EXISTS idx_bph_updated_at ON bph_works(updated_at);
+
+-- Keep updated_at current on in-place updates (e.g. detected_language)
+CREATE OR REPLACE FUNCTION update_bph_works_timestamp()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bph_works_updated_at ON bph_works;
+CREATE TRIGGER bph_works_updated_at
+    BEFORE UPDATE ON bph_works
+    FOR EACH ROW
+    EXECUTE FUNCTION update_bph_works_timestamp();
+
 -- Disable RLS for bulk loading
 ALTER TABLE bph_works DISABLE ROW LEVEL SECURITY;
 
@@ -0,0 +1,35 @@
+-- ==============================================
+-- MIGRATION: updated_at for bph_works
+-- Run this if you've already created the bph_works table.
+-- Rows are updated in place (e.g. data/update_detected_language.sql), so the
+-- local snapshots (scripts/utils/table_snapshot.py) refresh on updated_at,
+-- which this trigger keeps current, rather than on created_at.
+-- ==============================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'bph_works' AND column_name = 'updated_at'
+    ) THEN
+        ALTER TABLE bph_works ADD COLUMN updated_at TIMESTAMPTZ DEFAULT NOW();
+        UPDATE bph_works SET updated_at = COALESCE(created_at, NOW());
+        COMMENT ON COLUMN bph_works.updated_at IS 'Last modification; maintained by trigger';
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_bph_updated_at ON bph_works(updated_at);
+
+CREATE OR REPLACE FUNCTION update_bph_works_timestamp()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bph_works_updated_at ON bph_works;
+CREATE TRIGGER bph_works_updated_at
+    BEFORE UPDATE ON bph_works
+    FOR EACH ROW
+    EXECUTE FUNCTION update_bph_works_timestamp();
@@ -29,7 +29,7 @@ CREATE TABLE ia_latin_texts (
 
     -- Timestamps
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW()
+    updated_at TIMESTAMPTZ DEFAULT NOW()   -- Maintained by trigger; snapshot refresh key
 );
 
 -- Indexes
@@ -49,6 +49,23 @@ CREATE INDEX IF NOT EXISTS idx_ia_title_fts ON ia_latin_texts
 CREATE INDEX IF NOT EXISTS idx_ia_creator_fts ON ia_latin_texts
     USING GIN (to_tsvector('simple', COALESCE(creator, '')));
 
+CREATE INDEX IF NOT EXISTS idx_ia_updated_at ON ia_latin_texts(updated_at);
+
+-- Keep updated_at current when a rescrape upserts an existing identifier
+CREATE OR REPLACE FUNCTION update_ia_latin_texts_timestamp()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS ia_latin_texts_updated_at ON ia_latin_texts;
+CREATE TRIGGER ia_latin_texts_updated_at
+    BEFORE UPDATE ON ia_latin_texts
+    FOR EACH ROW
+    EXECUTE FUNCTION update_ia_latin_texts_timestamp();
+
 -- Disable RLS for bulk loading
 ALTER TABLE ia_latin_texts DISABLE ROW LEVEL SECURITY;
 
@@ -0,0 +1,35 @@
+-- ==============================================
+-- MIGRATION: updated_at trigger for ia_latin_texts
+-- Run this if you've already created the ia_latin_texts table.
+-- scrape_ia_latin.py upserts on identifier without setting updated_at, so
+-- without this trigger the column keeps its insert time and the local
+-- snapshots (scripts/utils/table_snapshot.py) miss rows updated in place.
+-- ==============================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'ia_latin_texts' AND column_name = 'updated_at'
+    ) THEN
+        ALTER TABLE ia_latin_texts ADD COLUMN updated_at TIMESTAMPTZ DEFAULT NOW();
+        UPDATE ia_latin_texts SET updated_at = COALESCE(created_at, NOW());
+    END IF;
+    COMMENT ON COLUMN ia_latin_texts.updated_at IS 'Last modification; maintained by trigger';
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_ia_updated_at ON ia_latin_texts(updated_at);
+
+CREATE OR REPLACE FUNCTION update_ia_latin_texts_timestamp()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS ia_latin_texts_updated_at ON ia_latin_texts;
+CREATE TRIGGER ia_latin_texts_updated_at
+    BEFORE UPDATE ON ia_latin_texts
+    FOR EACH ROW
+    EXECUTE FUNCTION update_ia_latin_texts_timestamp();
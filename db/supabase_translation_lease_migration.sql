@@ -0,0 +1,56 @@
+-- ==============================================
+-- MIGRATION: Worker leases for translation jobs
+-- Run this if you've already created the translation_jobs table.
+-- Lets several workers (each holding several jobs) share the queue:
+-- a job is leased to one worker at a time and freed when the lease expires.
+-- ==============================================
+
+-- Add lease columns if not exist
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'translation_jobs' AND column_name = 'leased_by'
+    ) THEN
+        ALTER TABLE translation_jobs ADD COLUMN leased_by TEXT;
+        COMMENT ON COLUMN translation_jobs.leased_by IS 'Worker currently holding the job';
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'translation_jobs' AND column_name = 'lease_expires_at'
+    ) THEN
+        ALTER TABLE translation_jobs ADD COLUMN lease_expires_at TIMESTAMPTZ;
+        COMMENT ON COLUMN translation_jobs.lease_expires_at IS 'Lease end; renewed by worker heartbeats';
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_translation_jobs_lease ON translation_jobs(status, lease_expires_at);
+
+-- Atomically lease the next runnable job to a worker (see /api/worker/poll).
+-- 'rendering' jobs are claimable too, so a job whose worker died mid-render
+-- is picked up again once its lease expires.
+CREATE OR REPLACE FUNCTION claim_translation_job(p_worker TEXT, p_lease_seconds INTEGER DEFAULT 120)
+RETURNS SETOF translation_jobs AS $$
+    UPDATE translation_jobs j
+    SET status = CASE
+            WHEN j.status <> 'pending' THEN j.status
+            WHEN j.ia_identifier IS NOT NULL THEN 'processing_preview'
+            ELSE 'rendering'
+        END,
+        started_at = COALESCE(j.started_at, NOW()),
+        leased_by = p_worker,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE j.id = (
+        SELECT id FROM translation_jobs
+        WHERE status IN ('pending', 'rendering', 'processing_preview', 'processing_full')
+          AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+        ORDER BY status ASC, created_at ASC
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+$$ LANGUAGE sql;
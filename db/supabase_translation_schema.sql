@@ -42,6 +42,10 @@ CREATE TABLE IF NOT EXISTS translation_jobs (
     pages_processed INTEGER DEFAULT 0,
     current_page INTEGER,
 
+    -- Worker lease (renewed by heartbeats; an expired lease frees the job)
+    leased_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+
     -- Error tracking
     error_message TEXT,
     retry_count INTEGER DEFAULT 0,
@@ -99,6 +103,7 @@ CREATE INDEX IF NOT EXISTS idx_translation_jobs_user ON translation_jobs(user_id
 CREATE INDEX IF NOT EXISTS idx_translation_jobs_status ON translation_jobs(status);
 CREATE INDEX IF NOT EXISTS idx_translation_jobs_created ON translation_jobs(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_translation_jobs_ia ON translation_jobs(ia_identifier);
+CREATE INDEX IF NOT EXISTS idx_translation_jobs_lease ON translation_jobs(status, lease_expires_at);
 
 CREATE INDEX IF NOT EXISTS idx_job_pages_job ON job_pages(job_id);
 CREATE INDEX IF NOT EXISTS idx_job_pages_status ON job_pages(job_id, status);
@@ -164,6 +169,29 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Atomically lease the next runnable job to a worker (see /api/worker/poll)
+CREATE OR REPLACE FUNCTION claim_translation_job(p_worker TEXT, p_lease_seconds INTEGER DEFAULT 120)
+RETURNS SETOF translation_jobs AS $$
+    UPDATE translation_jobs j
+    SET status = CASE
+            WHEN j.status <> 'pending' THEN j.status
+            WHEN j.ia_identifier IS NOT NULL THEN 'processing_preview'
+            ELSE 'rendering'
+        END,
+        started_at = COALESCE(j.started_at, NOW()),
+        leased_by = p_worker,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE j.id = (
+        SELECT id FROM translation_jobs
+        WHERE status IN ('pending', 'rendering', 'processing_preview', 'processing_full')
+          AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+        ORDER BY status ASC, created_at ASC
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+$$ LANGUAGE sql;
+
 -- Trigger for auto-updating timestamp
 DROP TRIGGER IF EXISTS translation_jobs_updated_at ON translation_jobs;
 CREATE TRIGGER translation_jobs_updated_at
@@ -8,9 +8,9 @@ Samples 100 works from BPH (1400-1500) and checks:
 """
 
 import json
-import random
 import time
 import os
+import sys
 import requests
 from pathlib import Path
 from datetime import datetime
@@ -22,6 +22,9 @@ except ImportError:
     subprocess.run(["pip", "install", "supabase"], check=True)
     from supabase import create_client, Client
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+from supabase_reader import sample_rows
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "coverage_experiment"
 SAMPLE_SIZE = 100
@@ -37,20 +40,17 @@ def sample_bph_1400_1500(n=100, seed=2024):
     """Sample n works from BPH dated 1400-1500."""
     client = get_supabase_client()
 
-    # Get all BPH works from 1400-1500
-    result = client.table('bph_works').select('*').gte('year', 1400).lte('year', 1500).execute()
-    works = result.data
+    filters = [('gte', 'year', 1400), ('lte', 'year', 1500)]
 
-    print(f"BPH works 1400-1500: {len(works)}")
+    # Count BPH works from 1400-1500
+    result = client.table('bph_works').select('id', count='exact').gte('year', 1400).lte('year', 1500).limit(1).execute()
+    print(f"BPH works 1400-1500: {result.count}")
 
-    if len(works) == 0:
+    if not result.count:
         return []
 
-    # Random sample
-    random.seed(seed)
-    sample = random.sample(works, min(n, len(works)))
-
-    return sample
+    # Sample by key instead of pulling every matching row
+    return sample_rows(client, 'bph_works', '*', key='id', n=n, filters=filters, seed=seed)
 
 def search_internet_archive(title, author=""):
     """Search Internet Archive for a work."""
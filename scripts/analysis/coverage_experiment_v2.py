@@ -12,9 +12,9 @@ Fixes HathiTrust search from v1.
 """
 
 import json
-import random
 import time
 import os
+import sys
 import requests
 from pathlib import Path
 from datetime import datetime
@@ -28,6 +28,9 @@ except ImportError:
     subprocess.run(["pip", "install", "supabase"], check=True)
     from supabase import create_client, Client
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+from supabase_reader import sample_rows
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "coverage_experiment"
 SAMPLE_SIZE = 100
@@ -44,28 +47,24 @@ def sample_istc_from_supabase(n=100, seed=123):
     client = get_supabase_client()
 
     # Get total count of Latin works
-    result = client.table('istc_works').select('id', count='exact').eq('language', 'lat').execute()
+    result = client.table('istc_works').select('id', count='exact').eq('language', 'lat').limit(1).execute()
     total = result.count
     print(f"ISTC Latin works in Supabase: {total:,}")
 
-    # Generate random offsets
-    random.seed(seed)
-    offsets = random.sample(range(total), min(n, total))
+    sample = sample_rows(client, 'istc_works', 'id, author, title, date_single, place, printer',
+                         key='id', n=n, filters=[('eq', 'language', 'lat')], seed=seed)
 
     works = []
-    for offset in offsets:
-        result = client.table('istc_works').select('id, author, title, date_single, place, printer').eq('language', 'lat').range(offset, offset).execute()
-        if result.data:
-            work = result.data[0]
-            works.append({
-                'id': work['id'],
-                'author': work.get('author') or '',
-                'title': work.get('title') or '',
-                'date': str(work.get('date_single') or ''),
-                'place': work.get('place') or '',
-                'printer': work.get('printer') or '',
-                'source': 'ISTC'
-            })
+    for work in sample:
+        works.append({
+            'id': work['id'],
+            'author': work.get('author') or '',
+            'title': work.get('title') or '',
+            'date': str(work.get('date_single') or ''),
+            'place': work.get('place') or '',
+            'printer': work.get('printer') or '',
+            'source': 'ISTC'
+        })
 
     return works
 
@@ -78,24 +77,21 @@ def sample_ustc_from_supabase(n=100, seed=456):
     total = result.count
     print(f"USTC Latin editions in Supabase: {total:,}")
 
-    # Generate random offsets
-    random.seed(seed)
-    offsets = random.sample(range(min(total, 100000)), min(n, total))  # Limit to first 100k for speed
+    # Random IDs across the whole table, fetched a few hundred per request
+    sample = sample_rows(client, 'ustc_editions', 'id, author_1, title, year, place, printer_1',
+                         key='id', n=n, filters=[('eq', 'language_1', 'Latin')], seed=seed)
 
     works = []
-    for offset in offsets:
-        result = client.table('ustc_editions').select('id, author_1, title, year, place, printer_1').eq('language_1', 'Latin').range(offset, offset).execute()
-        if result.data:
-            work = result.data[0]
-            works.append({
-                'id': str(work['id']),
-                'author': work.get('author_1') or '',
-                'title': work.get('title') or '',
-                'date': str(work.get('year') or ''),
-                'place': work.get('place') or '',
-                'printer': work.get('printer_1') or '',
-                'source': 'USTC'
-            })
+    for work in sample:
+        works.append({
+            'id': str(work['id']),
+            'author': work.get('author_1') or '',
+            'title': work.get('title') or '',
+            'date': str(work.get('year') or ''),
+            'place': work.get('place') or '',
+            'printer': work.get('printer_1') or '',
+            'source': 'USTC'
+        })
 
     return works
 
@@ -4,14 +4,20 @@ Load BPH (Bibliotheca Philosophica Hermetica) catalog into Supabase.
 
 The BPH is the Embassy of the Free Mind's collection of esoteric/hermetic texts.
 ~28,000 works spanning 1469-present, with ~4,000 pre-1700.
+
+Usage:
+    python load_bph_to_supabase.py [--restart] [--workers 8]
+
+Rows are upserted on id (the BPH uuid) by loader_core.BulkLoader, so
+reloading is safe.
 """
 
 import os
-import csv
 import json
-import re
+import argparse
 from pathlib import Path
-from datetime import datetime
+
+from loader_core import BulkLoader, add_loader_arguments, parse_year, read_csv
 
 try:
     from supabase import create_client, Client
@@ -32,18 +38,6 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXV
 def get_supabase_client() -> Client:
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def parse_year(year_str: str) -> int | None:
-    """Parse BPH year string to integer."""
-    if not year_str:
-        return None
-
-    # Extract 4-digit year (1400-2099)
-    match = re.search(r'\b(1[4-9]\d{2}|20\d{2})\b', str(year_str))
-    if match:
-        return int(match.group(1))
-
-    return None
-
 def transform_row(row: dict) -> dict | None:
     """Transform a CSV row to match Supabase schema."""
     uuid = row.get('uuid', '').strip()
@@ -82,72 +76,6 @@ def transform_row(row: dict) -> dict | None:
         'status': row.get('Status', '').strip() or None,
     }
 
-def load_bph_data():
-    """Load BPH CSV and prepare for upload."""
-    works = []
-    skipped = 0
-
-    print(f"Reading {BPH_CSV}...")
-    with open(BPH_CSV, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader):
-            try:
-                work = transform_row(row)
-                if work:
-                    works.append(work)
-                else:
-                    skipped += 1
-            except Exception as e:
-                skipped += 1
-                if skipped <= 5:
-                    print(f"Error processing row {i}: {e}")
-
-    print(f"Loaded {len(works):,} works (skipped {skipped:,})")
-    return works
-
-def upload_to_supabase(works: list):
-    """Upload works to Supabase in batches."""
-    client = get_supabase_client()
-
-    # Deduplicate by ID
-    seen_ids = set()
-    unique_works = []
-    for work in works:
-        if work['id'] not in seen_ids:
-            seen_ids.add(work['id'])
-            unique_works.append(work)
-
-    print(f"\nUploading {len(unique_works):,} unique works to Supabase...")
-    print(f"Batch size: {BATCH_SIZE}")
-
-    uploaded = 0
-    errors = 0
-    error_samples = []
-
-    for i in range(0, len(unique_works), BATCH_SIZE):
-        batch = unique_works[i:i + BATCH_SIZE]
-
-        try:
-            result = client.table('bph_works').insert(batch).execute()
-            uploaded += len(batch)
-
-            if (i + BATCH_SIZE) % 5000 == 0 or i + BATCH_SIZE >= len(unique_works):
-                print(f"  Uploaded {uploaded:,}/{len(unique_works):,} ({100*uploaded/len(unique_works):.1f}%)")
-        except Exception as e:
-            error_msg = str(e)
-            if len(error_samples) < 5:
-                error_samples.append(f"Batch {i}: {error_msg[:100]}")
-            errors += len(batch)
-
-    print(f"\nDone! Uploaded: {uploaded:,}, Errors: {errors:,}")
-
-    if error_samples:
-        print("\nSample errors:")
-        for err in error_samples:
-            print(f"  {err}")
-
-    return uploaded, errors
-
 def verify_upload():
     """Verify the upload by querying Supabase."""
     client = get_supabase_client()
@@ -174,6 +102,10 @@ def verify_upload():
         print(json.dumps(sample.data[0], indent=2, default=str))
 
 def main():
+    parser = argparse.ArgumentParser(description='Load the BPH catalogue into Supabase')
+    add_loader_arguments(parser)
+    args = parser.parse_args()
+
     print("=" * 50)
     print("BPH (Bibliotheca Philosophica Hermetica) -> SUPABASE")
     print("Embassy of the Free Mind Collection")
@@ -183,11 +115,14 @@ def main():
         print(f"\nError: CSV file not found at {BPH_CSV}")
         return
 
-    # Load data
-    works = load_bph_data()
-
-    # Upload
-    upload_to_supabase(works)
+    # Stream rows from the CSV straight into the upload
+    loader = BulkLoader(
+        'bph_works', key='id', transform=transform_row,
+        client_factory=get_supabase_client, source=BPH_CSV,
+        batch_size=BATCH_SIZE, workers=args.workers, resume=not args.restart,
+        progress_every=5000,
+    )
+    loader.run(read_csv(BPH_CSV))
 
     # Verify
     verify_upload()
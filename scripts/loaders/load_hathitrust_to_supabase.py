@@ -6,13 +6,27 @@ The HathiFiles is a tab-delimited file with metadata for every item in HathiTrus
 Download from: https://www.hathitrust.org/member-libraries/resources-for-librarians/data-resources/hathifiles/
 
 Expected file: data/hathitrust/hathi_full_YYYYMMDD.txt.gz
+
+Usage:
+    python load_hathitrust_to_supabase.py [--latin] [--year-min Y] [--year-max Y] [--limit N]
+                                          [--restart] [--workers 8]
+
+The file is parsed in columnar chunks with pyarrow (only the needed columns,
+language and year filters applied before rows are built) and upserted on
+htid by loader_core.BulkLoader; statistics are printed after the upload.
 """
 
 import os
-import gzip
-import re
+import argparse
 from pathlib import Path
-from datetime import datetime
+
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from loader_core import BulkLoader, add_loader_arguments, open_text
 
 try:
     from supabase import create_client, Client
@@ -60,6 +74,23 @@ COLUMNS = [
     'author',         # 25: Author (added later, may not be in all files)
 ]
 
+# hathitrust_items columns, in order
+ITEM_FIELDS = [
+    'htid', 'access', 'rights', 'ht_bib_key', 'description', 'source', 'oclc_num',
+    'isbn', 'lccn', 'title', 'imprint', 'year', 'pub_place', 'lang', 'bib_fmt', 'author',
+]
+
+# Free-text fields: max stored length (characters)
+TRUNCATE = {'description': 500, 'title': 1000, 'imprint': 500, 'author': 500}
+
+# HathiFile columns actually parsed (rights_date_used is the year fallback)
+PARSED_COLUMNS = [c for c in COLUMNS if c in ITEM_FIELDS or c == 'rights_date_used']
+
+YEAR_REGEX = r'\b(?P<year>1[4-9]\d{2}|20\d{2})\b'
+
+# Bytes of (decompressed) input per record batch
+BLOCK_SIZE = 32 << 20
+
 def get_supabase_client() -> Client:
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
@@ -77,121 +108,175 @@ def find_hathifile():
     files.sort(reverse=True)
     return files[0]
 
-def parse_year(date_str: str) -> int | None:
-    """Extract year from various date formats."""
-    if not date_str:
-        return None
-
-    # Try to find 4-digit year
-    match = re.search(r'\b(1[4-9]\d{2}|20\d{2})\b', str(date_str))
-    if match:
-        return int(match.group(1))
-    return None
-
-def parse_row(line: str) -> dict | None:
-    """Parse a tab-delimited row into a dict."""
-    parts = line.strip().split('\t')
-
-    if len(parts) < 19:  # Minimum columns needed
-        return None
-
-    htid = parts[0] if len(parts) > 0 else None
-    if not htid:
-        return None
-
-    # Extract year from imprint field
-    imprint = parts[12] if len(parts) > 12 else ''
-    year = parse_year(imprint)
-
-    # Also try rights_date_used
-    if not year and len(parts) > 16:
-        year = parse_year(parts[16])
-
-    return {
-        'htid': htid,
-        'access': parts[1] if len(parts) > 1 else None,
-        'rights': parts[2] if len(parts) > 2 else None,
-        'ht_bib_key': parts[3] if len(parts) > 3 else None,
-        'description': parts[4][:500] if len(parts) > 4 and parts[4] else None,
-        'source': parts[5] if len(parts) > 5 else None,
-        'oclc_num': parts[7] if len(parts) > 7 else None,
-        'isbn': parts[8] if len(parts) > 8 else None,
-        'lccn': parts[10] if len(parts) > 10 else None,
-        'title': parts[11][:1000] if len(parts) > 11 and parts[11] else None,
-        'imprint': parts[12][:500] if len(parts) > 12 and parts[12] else None,
-        'year': year,
-        'pub_place': parts[17] if len(parts) > 17 else None,
-        'lang': parts[18] if len(parts) > 18 else None,
-        'bib_fmt': parts[19] if len(parts) > 19 else None,
-        'author': parts[25][:500] if len(parts) > 25 and parts[25] else None,
-    }
-
-def load_hathifile(filepath: Path, limit: int = None, latin_only: bool = False):
-    """Load and parse the HathiFile."""
-    items = []
-    skipped = 0
-
-    print(f"Loading {filepath}...")
-
-    opener = gzip.open if str(filepath).endswith('.gz') else open
-
-    with opener(filepath, 'rt', encoding='utf-8', errors='replace') as f:
-        for i, line in enumerate(f):
-            if i == 0 and line.startswith('htid'):
-                # Skip header
-                continue
-
-            try:
-                item = parse_row(line)
-                if item:
-                    # Filter for Latin if requested
-                    if latin_only and item.get('lang') != 'lat':
-                        continue
-
-                    items.append(item)
-                else:
-                    skipped += 1
-            except Exception as e:
-                skipped += 1
-                if skipped <= 5:
-                    print(f"  Error row {i}: {str(e)[:50]}")
-
-            if limit and len(items) >= limit:
-                break
-
-            if i > 0 and i % 500000 == 0:
-                print(f"  Processed {i:,} rows, kept {len(items):,}...")
-
-    print(f"Loaded {len(items):,} items (skipped {skipped:,})")
-    return items
-
-def upload_to_supabase(items: list, table: str = 'hathitrust_items'):
-    """Upload items to Supabase in batches."""
-    client = get_supabase_client()
-
-    uploaded = 0
-    errors = 0
-
-    print(f"\nUploading {len(items):,} items to Supabase...")
-
-    for i in range(0, len(items), BATCH_SIZE):
-        batch = items[i:i + BATCH_SIZE]
-
-        try:
-            result = client.table(table).upsert(batch, on_conflict='htid').execute()
-            uploaded += len(batch)
-
-            if uploaded % 50000 == 0:
-                print(f"  Uploaded {uploaded:,}/{len(items):,} ({100*uploaded/len(items):.1f}%)")
-        except Exception as e:
-            errors += len(batch)
-            if errors <= 5 * BATCH_SIZE:
-                print(f"  Error batch {i}: {str(e)[:100]}")
-
-    print(f"Done! Uploaded: {uploaded:,}, Errors: {errors:,}")
-    return uploaded, errors
+def _first_line(path: Path) -> str:
+    with open_text(path, errors='replace') as f:
+        return f.readline()
+
+def _to_utf8(array: pa.Array) -> pa.Array:
+    """Binary column -> string, replacing invalid UTF-8 (rare) like errors='replace'."""
+    try:
+        return array.cast(pa.string())
+    except pa.ArrowInvalid:
+        return pa.array([v.decode('utf-8', 'replace') if v is not None else None
+                         for v in array.to_pylist()], pa.string())
+
+def _extract_year(strings: pa.Array) -> pa.Array:
+    """First 4-digit year (1400-2099) in each string, as int32 (null if none)."""
+    matches = pc.extract_regex(strings, YEAR_REGEX)
+    return pc.cast(pc.struct_field(matches, 'year'), pa.int32())
+
+def read_hathifile_batches(path: Path, latin_only: bool = False,
+                           year_min: int | None = None, year_max: int | None = None,
+                           block_size: int = BLOCK_SIZE,
+                           counts: dict | None = None) -> Iterator[pa.RecordBatch]:
+    """
+    Stream the HathiFile as Arrow record batches in the hathitrust_items schema.
+
+    Only the needed columns are parsed. The language filter runs on the raw
+    column before anything is decoded; years come from a vectorized regex
+    over imprint (falling back to rights_date_used) and the date range is
+    applied before rows are built.
+
+    Args:
+        path: hathi_full_*.txt(.gz)
+        latin_only: Keep only lang == 'lat'
+        year_min, year_max: Keep only items with a year in this range
+        block_size: Bytes of input parsed per batch
+        counts: Optional dict updated with 'read', 'malformed' and 'kept'
+
+    Yields:
+        pa.RecordBatch with columns ITEM_FIELDS
+    """
+    counts = counts if counts is not None else {}
+    for name in ('read', 'malformed', 'kept'):
+        counts.setdefault(name, 0)
+
+    first = _first_line(path)
+    has_header = first.startswith('htid')
+    n_fields = len(first.rstrip('\r\n').split('\t'))
+    names = COLUMNS[:n_fields] + [f'extra_{i}' for i in range(n_fields - len(COLUMNS))]
+    include = [c for c in PARSED_COLUMNS if c in names]
+
+    def skip_malformed(row):
+        counts['malformed'] += 1
+        return 'skip'
+
+    print(f"Loading {path}...")
+    reader = pa_csv.open_csv(
+        str(path),
+        read_options=pa_csv.ReadOptions(column_names=names, skip_rows=int(has_header),
+                                        block_size=block_size),
+        parse_options=pa_csv.ParseOptions(delimiter='\t', quote_char=False,
+                                          invalid_row_handler=skip_malformed),
+        convert_options=pa_csv.ConvertOptions(include_columns=include,
+                                              column_types={c: pa.binary() for c in include}),
+    )
+
+    for batch in reader:
+        counts['read'] += batch.num_rows
+        if counts['read'] // 500000 != (counts['read'] - batch.num_rows) // 500000:
+            print(f"  Processed {counts['read']:,} rows, kept {counts['kept']:,}...")
+
+        mask = pc.not_equal(batch['htid'], pa.scalar(b'', pa.binary()))
+        if latin_only:
+            mask = pc.and_(mask, pc.equal(batch['lang'], pa.scalar(b'lat', pa.binary())))
+        batch = batch.filter(mask)
+        if not batch.num_rows:
+            continue
+
+        columns = {name: _to_utf8(batch[name]) for name in include}
+        year = _extract_year(columns['imprint'])
+        if 'rights_date_used' in columns:
+            year = pc.coalesce(year, _extract_year(columns['rights_date_used']))
+
+        keep = None
+        if year_min is not None:
+            keep = pc.greater_equal(year, year_min)
+        if year_max is not None:
+            upper = pc.less_equal(year, year_max)
+            keep = upper if keep is None else pc.and_(keep, upper)
+        if keep is not None:
+            keep = pc.fill_null(keep, False)
+            columns = {name: pc.filter(col, keep) for name, col in columns.items()}
+            year = pc.filter(year, keep)
+
+        n = len(year)
+        if not n:
+            continue
+
+        out = []
+        for name in ITEM_FIELDS:
+            if name == 'year':
+                out.append(year)
+            elif name not in columns:
+                out.append(pa.nulls(n, pa.string()))
+            elif name in TRUNCATE:
+                col = pc.utf8_slice_codeunits(columns[name], 0, TRUNCATE[name])
+                # Empty free-text fields are stored as NULL
+                out.append(pc.if_else(pc.equal(col, ''), pa.scalar(None, pa.string()), col))
+            else:
+                out.append(columns[name])
+
+        counts['kept'] += n
+        yield pa.RecordBatch.from_arrays(out, names=ITEM_FIELDS)
+
+def iter_hathifile_items(batches: Iterable[pa.RecordBatch]) -> Iterator[dict]:
+    """Row dicts for upload from record batches."""
+    for batch in batches:
+        yield from batch.to_pylist()
+
+class ItemStats:
+    """Access, language and century counts, gathered while rows stream past."""
+
+    def __init__(self):
+        self.access = {}
+        self.lang = {}
+        self.century = {}
+        self.early_modern = 0
+
+    def observe(self, items):
+        for item in items:
+            acc = item.get('access') or 'unknown'
+            self.access[acc] = self.access.get(acc, 0) + 1
+            lang = item.get('lang') or 'unknown'
+            self.lang[lang] = self.lang.get(lang, 0) + 1
+            year = item.get('year')
+            if year and 1400 <= year <= 2025:
+                century = (year // 100) + 1
+                self.century[century] = self.century.get(century, 0) + 1
+            if year and 1450 <= year <= 1700:
+                self.early_modern += 1
+            yield item
+
+    def report(self):
+        print("\n" + "=" * 40)
+        print("STATISTICS")
+        print("=" * 40)
+
+        print("\nBy access:")
+        for acc, count in sorted(self.access.items(), key=lambda x: -x[1]):
+            print(f"  {acc}: {count:,}")
+
+        print("\nTop languages:")
+        for lang, count in sorted(self.lang.items(), key=lambda x: -x[1])[:10]:
+            print(f"  {lang}: {count:,}")
+
+        print("\nBy century:")
+        for century in sorted(self.century.keys()):
+            if 15 <= century <= 21:
+                print(f"  {century}th c.: {self.century[century]:,}")
+
+        print(f"\nEarly modern (1450-1700): {self.early_modern:,}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Load HathiTrust HathiFiles into Supabase')
+    parser.add_argument('--latin', action='store_true', help='Load only Latin texts (lang=lat)')
+    parser.add_argument('--limit', type=int, default=None, help='Stop after this many items')
+    parser.add_argument('--year-min', type=int, default=None, help='Keep only items from this year on')
+    parser.add_argument('--year-max', type=int, default=None, help='Keep only items up to this year')
+    add_loader_arguments(parser)
+    args = parser.parse_args()
+
     print("=" * 60)
     print("HATHITRUST HATHIFILES -> SUPABASE")
     print("=" * 60)
@@ -207,74 +292,44 @@ def main():
     print(f"Size: {hathifile.stat().st_size / 1e9:.2f} GB")
 
     # Option: Load only Latin texts (much smaller)
-    import sys
-    latin_only = '--latin' in sys.argv
-    limit = None
-
-    for arg in sys.argv:
-        if arg.startswith('--limit='):
-            limit = int(arg.split('=')[1])
-
-    if latin_only:
+    if args.latin:
         print("\n*** Loading LATIN texts only (lang=lat) ***")
-    if limit:
-        print(f"*** Limiting to {limit:,} items ***")
-
-    # Load data
-    items = load_hathifile(hathifile, limit=limit, latin_only=latin_only)
-
-    if not items:
+    if args.year_min or args.year_max:
+        print(f"*** Years {args.year_min or '...'}-{args.year_max or '...'} only ***")
+    if args.limit:
+        print(f"*** Limiting to {args.limit:,} items ***")
+
+    loader = BulkLoader(
+        'hathitrust_items', key='htid', transform=dict,
+        client_factory=get_supabase_client, source=hathifile,
+        batch_size=BATCH_SIZE, workers=args.workers, resume=not args.restart,
+        options={'latin_only': args.latin, 'limit': args.limit,
+                 'year_min': args.year_min, 'year_max': args.year_max},
+        progress_every=500000,
+    )
+
+    # Stream: columnar parse/filter -> rows -> tally -> upload
+    counts = {}
+    batches = read_hathifile_batches(hathifile, latin_only=args.latin, year_min=args.year_min,
+                                     year_max=args.year_max, counts=counts)
+    item_stats = ItemStats()
+    rows = loader.rows(iter_hathifile_items(batches), limit=args.limit)
+    stats = loader.upload(item_stats.observe(rows))
+
+    print(f"HathiFile rows read: {counts['read']:,} "
+          f"(kept {counts['kept']:,}, malformed {counts['malformed']:,})")
+    if not stats.read:
         print("No items loaded!")
         return
 
-    # Print stats
-    print("\n" + "=" * 40)
-    print("STATISTICS")
-    print("=" * 40)
-
-    # By access
-    access_counts = {}
-    for item in items:
-        acc = item.get('access') or 'unknown'
-        access_counts[acc] = access_counts.get(acc, 0) + 1
-    print("\nBy access:")
-    for acc, count in sorted(access_counts.items(), key=lambda x: -x[1]):
-        print(f"  {acc}: {count:,}")
-
-    # By language (top 10)
-    lang_counts = {}
-    for item in items:
-        lang = item.get('lang') or 'unknown'
-        lang_counts[lang] = lang_counts.get(lang, 0) + 1
-    print("\nTop languages:")
-    for lang, count in sorted(lang_counts.items(), key=lambda x: -x[1])[:10]:
-        print(f"  {lang}: {count:,}")
-
-    # By century
-    century_counts = {}
-    for item in items:
-        year = item.get('year')
-        if year and 1400 <= year <= 2025:
-            century = (year // 100) + 1
-            century_counts[century] = century_counts.get(century, 0) + 1
-    print("\nBy century:")
-    for century in sorted(century_counts.keys()):
-        if 15 <= century <= 21:
-            print(f"  {century}th c.: {century_counts[century]:,}")
-
-    # Early modern count
-    early_modern = sum(1 for item in items if item.get('year') and 1450 <= item['year'] <= 1700)
-    print(f"\nEarly modern (1450-1700): {early_modern:,}")
-
-    # Upload
-    uploaded, errors = upload_to_supabase(items)
+    item_stats.report()
 
     print("\n" + "=" * 60)
     print("COMPLETE")
     print("=" * 60)
-    print(f"Total uploaded: {uploaded:,}")
-    if errors:
-        print(f"Errors: {errors:,}")
+    print(f"Total uploaded: {stats.uploaded:,}")
+    if stats.errors:
+        print(f"Errors: {stats.errors:,}")
 
 if __name__ == "__main__":
     main()
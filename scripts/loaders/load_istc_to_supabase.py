@@ -5,16 +5,19 @@ Load ISTC data into Supabase.
 Usage:
     export SUPABASE_URL="https://xxx.supabase.co"
     export SUPABASE_KEY="your-anon-key"
-    python load_istc_to_supabase.py
+    python load_istc_to_supabase.py [--restart] [--workers 8]
 
 Or create a .env file with these values.
+Rows are upserted on id by loader_core.BulkLoader, so reloading is safe.
 """
 
 import os
-import csv
+import re
 import json
+import argparse
 from pathlib import Path
-from datetime import datetime
+
+from loader_core import BulkLoader, add_loader_arguments, read_csv
 
 try:
     from supabase import create_client, Client
@@ -60,7 +63,6 @@ def parse_date(date_str: str) -> dict:
         return result
 
     # Try to extract year
-    import re
     years = re.findall(r'\b(14\d{2}|15\d{2})\b', str(date_str))
     if years:
         result['date_single'] = int(years[0])
@@ -112,57 +114,9 @@ def transform_row(row: dict) -> dict:
         'cataloguing_level': row.get('cataloguing_level', '') or None,
     }
 
-def load_istc_data():
-    """Load ISTC CSV and prepare for upload."""
-    works = []
-
-    print(f"Reading {ISTC_CSV}...")
-    with open(ISTC_CSV, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                work = transform_row(row)
-                if work['id'] and work['title']:
-                    works.append(work)
-            except Exception as e:
-                print(f"Error processing row: {e}")
-                continue
-
-    print(f"Loaded {len(works):,} works")
-    return works
-
-def upload_to_supabase(works: list):
-    """Upload works to Supabase in batches."""
-    client = get_supabase_client()
-
-    # Deduplicate by ID (keep first occurrence)
-    seen_ids = set()
-    unique_works = []
-    for work in works:
-        if work['id'] and work['id'] not in seen_ids:
-            seen_ids.add(work['id'])
-            unique_works.append(work)
-
-    print(f"\nUploading {len(unique_works):,} unique works to Supabase (removed {len(works) - len(unique_works)} duplicates)...")
-    print(f"Batch size: {BATCH_SIZE}")
-
-    uploaded = 0
-    errors = 0
-
-    for i in range(0, len(unique_works), BATCH_SIZE):
-        batch = unique_works[i:i + BATCH_SIZE]
-
-        try:
-            # Use insert instead of upsert
-            result = client.table('istc_works').insert(batch).execute()
-            uploaded += len(batch)
-            print(f"  Uploaded {uploaded:,}/{len(unique_works):,} ({100*uploaded/len(unique_works):.1f}%)")
-        except Exception as e:
-            print(f"  Error in batch {i}-{i+BATCH_SIZE}: {e}")
-            errors += len(batch)
-
-    print(f"\nDone! Uploaded: {uploaded:,}, Errors: {errors}")
-    return uploaded, errors
+def keep_work(work: dict) -> bool:
+    """Only works with a title are loaded."""
+    return bool(work['title'])
 
 def verify_upload():
     """Verify the upload by querying Supabase."""
@@ -190,15 +144,22 @@ def verify_upload():
         print(json.dumps(sample.data[0], indent=2, default=str))
 
 def main():
+    parser = argparse.ArgumentParser(description='Load ISTC works into Supabase')
+    add_loader_arguments(parser)
+    args = parser.parse_args()
+
     print("=" * 50)
     print("ISTC -> SUPABASE LOADER")
     print("=" * 50)
 
-    # Load data
-    works = load_istc_data()
-
-    # Upload
-    upload_to_supabase(works)
+    # Stream rows from the CSV straight into the upload
+    loader = BulkLoader(
+        'istc_works', key='id', transform=transform_row, keep=keep_work,
+        client_factory=get_supabase_client, source=ISTC_CSV,
+        batch_size=BATCH_SIZE, workers=args.workers, resume=not args.restart,
+        progress_every=10000,
+    )
+    loader.run(read_csv(ISTC_CSV, encoding='utf-8-sig'))
 
     # Verify
     verify_upload()
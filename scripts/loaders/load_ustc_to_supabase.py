@@ -5,16 +5,21 @@ Load USTC data into Supabase.
 Usage:
     export SUPABASE_URL="https://xxx.supabase.co"
     export SUPABASE_KEY="your-anon-key"
-    python load_ustc_to_supabase.py
+    python load_ustc_to_supabase.py [--restart] [--workers 8]
 
 This script loads the Universal Short Title Catalogue (1.6M editions from 1450-1700).
+Rows are streamed from the CSV and upserted in concurrent batches by
+loader_core.BulkLoader, so memory stays flat; rerunning resumes after the
+last committed batch (see loader_core for checkpoint and error files).
 """
 
 import os
-import csv
+import re
 import json
+import argparse
 from pathlib import Path
-from datetime import datetime
+
+from loader_core import BulkLoader, add_loader_arguments, parse_year as find_year, read_csv
 
 try:
     from supabase import create_client, Client
@@ -34,6 +39,8 @@ except ImportError:
 USTC_CSV = Path(__file__).parent.parent / "data" / "ustc" / "ustc_editions.csv"
 BATCH_SIZE = 1000  # Larger batches for efficiency
 MAX_ROWS = None  # Set to a number to limit (e.g., 10000 for testing)
+UPLOAD_WORKERS = 8  # Concurrent upload requests
+USTC_YEAR = re.compile(r'\b(1[4-7]\d{2})\b')
 
 def get_supabase_client() -> Client:
     """Create Supabase client from environment variables."""
@@ -62,12 +69,7 @@ def parse_year(year_str: str) -> int | None:
         pass
 
     # Try to extract a 4-digit year
-    import re
-    match = re.search(r'\b(1[4-7]\d{2})\b', str(year_str))
-    if match:
-        return int(match.group(1))
-
-    return None
+    return find_year(year_str, USTC_YEAR)
 
 def transform_row(row: dict) -> dict:
     """Transform a CSV row to match Supabase schema."""
@@ -142,79 +144,6 @@ def transform_row(row: dict) -> dict:
         'female_printer': female_printer,
     }
 
-def load_ustc_data():
-    """Load USTC CSV and prepare for upload."""
-    editions = []
-    skipped = 0
-
-    print(f"Reading {USTC_CSV}...")
-    with open(USTC_CSV, 'r', encoding='utf-8', errors='replace') as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader):
-            if MAX_ROWS and i >= MAX_ROWS:
-                break
-
-            try:
-                edition = transform_row(row)
-                if edition and edition['id']:
-                    editions.append(edition)
-                else:
-                    skipped += 1
-            except Exception as e:
-                skipped += 1
-                if skipped <= 10:
-                    print(f"Error processing row {i}: {e}")
-                continue
-
-            if (i + 1) % 100000 == 0:
-                print(f"  Processed {i+1:,} rows...")
-
-    print(f"Loaded {len(editions):,} editions (skipped {skipped:,})")
-    return editions
-
-def upload_to_supabase(editions: list):
-    """Upload editions to Supabase in batches."""
-    client = get_supabase_client()
-
-    # Deduplicate by ID (keep first occurrence)
-    seen_ids = set()
-    unique_editions = []
-    for edition in editions:
-        if edition['id'] and edition['id'] not in seen_ids:
-            seen_ids.add(edition['id'])
-            unique_editions.append(edition)
-
-    print(f"\nUploading {len(unique_editions):,} unique editions to Supabase...")
-    print(f"Batch size: {BATCH_SIZE}")
-
-    uploaded = 0
-    errors = 0
-    error_samples = []
-
-    for i in range(0, len(unique_editions), BATCH_SIZE):
-        batch = unique_editions[i:i + BATCH_SIZE]
-
-        try:
-            result = client.table('ustc_editions').insert(batch).execute()
-            uploaded += len(batch)
-
-            if (i + BATCH_SIZE) % 50000 == 0 or i + BATCH_SIZE >= len(unique_editions):
-                print(f"  Uploaded {uploaded:,}/{len(unique_editions):,} ({100*uploaded/len(unique_editions):.1f}%)")
-        except Exception as e:
-            error_msg = str(e)
-            if len(error_samples) < 5:
-                error_samples.append(f"Batch {i}: {error_msg[:100]}")
-            errors += len(batch)
-
-    print(f"\nDone! Uploaded: {uploaded:,}, Errors: {errors:,}")
-
-    if error_samples:
-        print("\nSample errors:")
-        for err in error_samples:
-            print(f"  {err}")
-
-    return uploaded, errors
-
 def verify_upload():
     """Verify the upload by querying Supabase."""
     client = get_supabase_client()
@@ -241,6 +170,10 @@ def verify_upload():
         print(json.dumps(sample.data[0], indent=2, default=str))
 
 def main():
+    parser = argparse.ArgumentParser(description='Load USTC editions into Supabase')
+    add_loader_arguments(parser, workers=UPLOAD_WORKERS)
+    args = parser.parse_args()
+
     print("=" * 50)
     print("USTC -> SUPABASE LOADER")
     print("=" * 50)
@@ -251,11 +184,14 @@ def main():
         print("Please run: mdb-export 'USTC Editions July 2025.accdb' 'USTC Editions July 2025' > ustc_editions.csv")
         return
 
-    # Load data
-    editions = load_ustc_data()
-
-    # Upload
-    upload_to_supabase(editions)
+    # Stream rows from the CSV straight into the upload
+    loader = BulkLoader(
+        'ustc_editions', key='id', transform=transform_row,
+        client_factory=get_supabase_client, source=USTC_CSV,
+        batch_size=BATCH_SIZE, workers=args.workers, resume=not args.restart,
+        options={'max_rows': MAX_ROWS}, progress_every=100000,
+    )
+    loader.run(read_csv(USTC_CSV, errors='replace', limit=MAX_ROWS))
 
     # Verify
     verify_upload()
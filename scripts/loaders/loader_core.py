@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Shared bulk-loading core for the Supabase loaders.
+
+Each loader supplies a reader over its source file and a row transformer;
+this module does the rest:
+
+- Streaming readers for CSV, tab-separated (optionally gzipped) and JSON /
+  JSON Lines files, so no loader holds a whole catalogue in memory
+- BulkLoader.rows(): transform, filter and count source records
+- BulkLoader.upload(): drop repeated keys (bitmap for integer keys),
+  batch, and upsert on the primary key from a thread pool with a bounded
+  number of batches in flight
+- RetryPolicy: per-batch retries with exponential backoff. A batch the
+  database rejects for its data (constraint or type errors) is bisected so
+  only the bad rows are lost, and those are logged to
+  data/loader_state/<table>.failed.jsonl; any other failure (network, auth,
+  5xx) stops the load with the batch uncommitted, so a rerun retries it
+- A checkpoint (data/loader_state/<table>.checkpoint.json) of the
+  committed batch prefix, so a rerun resumes where the last one stopped
+- Throughput reported in rows/sec
+
+Usage:
+    loader = BulkLoader('istc_works', key='id', transform=transform_row,
+                        client_factory=get_supabase_client, source=ISTC_CSV)
+    stats = loader.run(read_csv(ISTC_CSV, encoding='utf-8-sig'))
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+STATE_DIR = Path(__file__).parent.parent / "data" / "loader_state"
+
+YEAR_PATTERN = re.compile(r'\b(1[4-9]\d{2}|20\d{2})\b')
+
+# SQLSTATE classes of errors caused by the rows themselves (cardinality, data
+# exception, integrity constraint); only these are worth bisecting a batch for
+ROW_ERROR_CLASSES = ('21', '22', '23')
+
+
+def parse_year(text: str, pattern: re.Pattern = YEAR_PATTERN) -> Optional[int]:
+    """First 4-digit year in ``text`` matching ``pattern`` (default 1400-2099)."""
+    if not text:
+        return None
+    match = pattern.search(str(text))
+    return int(match.group(1)) if match else None
+
+
+# -- readers -------------------------------------------------------------------
+
+def open_text(path: Path, encoding: str = 'utf-8', errors: str = 'strict'):
+    """Open a text file, transparently decompressing ``.gz``."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt', encoding=encoding, errors=errors, newline='')
+    return open(path, 'r', encoding=encoding, errors=errors, newline='')
+
+
+def read_csv(path: Path, encoding: str = 'utf-8', errors: str = 'strict',
+             limit: Optional[int] = None) -> Iterator[dict]:
+    """Rows of a CSV file with a header line, as dicts."""
+    print(f"Reading {path}...")
+    with open_text(path, encoding, errors) as f:
+        yield from islice(csv.DictReader(f), limit)
+
+
+def read_tsv(path: Path, header_prefix: Optional[str] = None,
+             encoding: str = 'utf-8', errors: str = 'replace',
+             limit: Optional[int] = None) -> Iterator[List[str]]:
+    """
+    Lines of a tab-separated file (optionally .gz), split into fields.
+
+    Args:
+        header_prefix: Skip the first line if it starts with this
+        limit: Stop after this many data lines
+    """
+    print(f"Loading {path}...")
+    with open_text(path, encoding, errors) as f:
+        lines = iter(f)
+        first = next(lines, None)
+        if first is None:
+            return
+        if not (header_prefix and first.startswith(header_prefix)):
+            lines = _prepend(first, lines)
+        for line in islice(lines, limit):
+            yield line.rstrip('\r\n').split('\t')
+
+
+def read_json(path: Path, encoding: str = 'utf-8',
+              limit: Optional[int] = None) -> Iterator[dict]:
+    """Records of a JSON array file, or of a JSON Lines file (.jsonl / .ndjson)."""
+    print(f"Reading {path}...")
+    name = str(path).removesuffix('.gz')
+    with open_text(path, encoding) as f:
+        if name.endswith(('.jsonl', '.ndjson')):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            data = json.load(f)
+            records = iter(data if isinstance(data, list) else data.get('records', []))
+        yield from islice(records, limit)
+
+
+def _prepend(first, rest: Iterator) -> Iterator:
+    yield first
+    yield from rest
+
+
+# -- deduplication -------------------------------------------------------------
+
+class IdBitmap:
+    """Set of integer IDs stored as a bitmap (1 bit per ID; negatives in a set)."""
+
+    def __init__(self, capacity: int = 1 << 22):
+        self.bits = bytearray((capacity + 7) // 8)
+        self.negative = set()
+
+    def add(self, value: int) -> bool:
+        """Add ``value``; return False if it was already present."""
+        if value < 0:
+            if value in self.negative:
+                return False
+            self.negative.add(value)
+            return True
+        byte, bit = divmod(value, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(bytearray(max(byte + 1 - len(self.bits), len(self.bits))))
+        mask = 1 << bit
+        if self.bits[byte] & mask:
+            return False
+        self.bits[byte] |= mask
+        return True
+
+
+class KeySet:
+    """Seen-key set: a bitmap for integer keys, a plain set for anything else."""
+
+    def __init__(self):
+        self.bitmap = IdBitmap()
+        self.other = set()
+
+    def add(self, key) -> bool:
+        if isinstance(key, int):
+            return self.bitmap.add(key)
+        if key in self.other:
+            return False
+        self.other.add(key)
+        return True
+
+
+def iter_batches(items: Iterable[dict], size: int) -> Iterator[list]:
+    """Group a stream into lists of ``size`` items."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# -- upload --------------------------------------------------------------------
+
+@dataclass
+class RetryPolicy:
+    attempts: int = 3          # Tries per request before giving up on it
+    base_delay: float = 1.0    # Seconds before the first retry, doubled each time
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        return min(self.base_delay * (2 ** attempt), self.max_delay)
+
+
+@dataclass
+class LoadStats:
+    read: int = 0          # Source records seen
+    skipped: int = 0       # Records the transformer rejected or failed on
+    filtered: int = 0      # Records dropped by the keep predicate
+    duplicates: int = 0    # Rows dropped for a repeated key
+    uploaded: int = 0
+    errors: int = 0        # Rows the database rejected
+    started: float = field(default_factory=time.time)
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    def rate(self, rows: int) -> float:
+        return rows / max(self.elapsed, 1e-9)
+
+
+def is_row_error(exc: Exception) -> bool:
+    """Whether a failed upsert was rejected for its data (a PostgREST ``APIError`` with a row-level SQLSTATE)."""
+    code = getattr(exc, 'code', None)
+    return isinstance(code, str) and code[:2] in ROW_ERROR_CLASSES
+
+
+class Checkpoint:
+    """
+    Number of leading batches known to be committed, persisted as JSON.
+
+    Batches are numbered in source order, so a restart skips the committed
+    prefix and re-sends the rest (upserts make re-sending safe). The
+    checkpoint only applies to the same source file and loader options.
+    """
+
+    def __init__(self, path: Path, signature: dict):
+        self.path = path
+        self.signature = signature
+        self.committed_batches = 0
+        self.uploaded = 0
+        self.errors = 0
+
+    def load(self) -> bool:
+        if not self.path.exists():
+            return False
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get('signature') != self.signature:
+            print(f"Ignoring checkpoint {self.path.name}: source or options changed")
+            return False
+        self.committed_batches = data['committed_batches']
+        self.uploaded = data['uploaded']
+        self.errors = data['errors']
+        return True
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({
+                'signature': self.signature,
+                'committed_batches': self.committed_batches,
+                'uploaded': self.uploaded,
+                'errors': self.errors,
+                'updated_at': datetime.now().isoformat(),
+            }, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+class BulkLoader:
+    """Streams transformed rows into one Supabase table."""
+
+    def __init__(self, table: str, key: str,
+                 transform: Callable[[Any], Optional[dict]],
+                 client_factory: Callable,
+                 source: Optional[Path] = None,
+                 keep: Optional[Callable[[dict], bool]] = None,
+                 batch_size: int = 1000,
+                 workers: int = 8,
+                 retry: RetryPolicy = None,
+                 resume: bool = True,
+                 options: Optional[dict] = None,
+                 progress_every: int = 50000,
+                 state_dir: Path = STATE_DIR):
+        """
+        Args:
+            table: Target table
+            key: Primary key column (upsert conflict target and dedupe key)
+            transform: Source record -> row dict, or None to skip it
+            client_factory: Returns a Supabase client (one per upload thread)
+            source: Source file, used to tie the checkpoint to its input
+            keep: Optional predicate; rows failing it are counted as filtered
+            batch_size: Rows per upsert request
+            workers: Concurrent upsert requests
+            retry: Per-batch retry policy
+            resume: Continue from a matching checkpoint if present
+            options: Loader options that change the row stream (limits,
+                     filters); a checkpoint taken with other options is ignored
+            progress_every: Print progress every N source records / rows
+        """
+        self.table = table
+        self.key = key
+        self.transform = transform
+        self.client_factory = client_factory
+        self.keep = keep
+        self.batch_size = batch_size
+        self.workers = workers
+        self.retry = retry or RetryPolicy()
+        self.resume = resume
+        self.progress_every = progress_every
+        self.failed_path = state_dir / f"{table}.failed.jsonl"
+
+        source = Path(source) if source else None
+        self.checkpoint = Checkpoint(state_dir / f"{table}.checkpoint.json", {
+            'source': str(source) if source else None,
+            'size': source.stat().st_size if source and source.exists() else None,
+            'batch_size': batch_size,
+            'options': options or {},
+        })
+
+        self.stats = LoadStats()
+        self._local = threading.local()
+
+    # -- transform stage --------------------------------------------------
+
+    def rows(self, records: Iterable[Any], limit: Optional[int] = None) -> Iterator[dict]:
+        """
+        Transform and filter source records.
+
+        Args:
+            records: Source records (dicts, field lists, ...)
+            limit: Stop after this many kept rows
+        """
+        stats = self.stats
+        kept = 0
+        for record in records:
+            stats.read += 1
+            if stats.read % self.progress_every == 0:
+                print(f"  Processed {stats.read:,} rows, kept {kept:,}...")
+
+            try:
+                row = self.transform(record)
+            except Exception as e:
+                stats.skipped += 1
+                if stats.skipped <= 10:
+                    print(f"  Error processing row {stats.read - 1}: {str(e)[:100]}")
+                continue
+
+            if not row or row.get(self.key) in (None, ''):
+                stats.skipped += 1
+                continue
+            if self.keep and not self.keep(row):
+                stats.filtered += 1
+                continue
+
+            yield row
+            kept += 1
+            if limit and kept >= limit:
+                return
+
+    def unique(self, rows: Iterable[dict]) -> Iterator[dict]:
+        """Drop rows whose key was already seen (keep first occurrence)."""
+        seen = KeySet()
+        for row in rows:
+            if seen.add(row[self.key]):
+                yield row
+            else:
+                self.stats.duplicates += 1
+
+    # -- upload stage -----------------------------------------------------
+
+    def _client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.client_factory()
+        return self._local.client
+
+    def _send(self, batch: list):
+        attempts = self.retry.attempts
+        for attempt in range(attempts):
+            try:
+                self._client().table(self.table).upsert(batch, on_conflict=self.key).execute()
+                return
+            except Exception as e:
+                # The same rows would be rejected again
+                if is_row_error(e) or attempt == attempts - 1:
+                    raise
+                time.sleep(self.retry.delay(attempt))
+
+    def upload_batch(self, batch: list) -> Tuple[int, list]:
+        """
+        Upsert a batch; if the database rejects its rows, bisect it until the bad rows are isolated.
+
+        Errors that are not about the rows (network, auth, server) are raised
+        once the retries are used up, leaving the batch uncommitted.
+
+        Returns:
+            (rows uploaded, [(key, error message), ...] for rejected rows)
+        """
+        try:
+            self._send(batch)
+            return len(batch), []
+        except Exception as e:
+            if not is_row_error(e):
+                raise
+            if len(batch) == 1:
+                return 0, [(batch[0][self.key], str(e)[:200])]
+
+        mid = len(batch) // 2
+        left_ok, left_failed = self.upload_batch(batch[:mid])
+        right_ok, right_failed = self.upload_batch(batch[mid:])
+        return left_ok + right_ok, left_failed + right_failed
+
+    def upload(self, rows: Iterable[dict]) -> LoadStats:
+        """Deduplicate, batch and upsert ``rows`` concurrently, with checkpointing."""
+        stats = self.stats
+        checkpoint = self.checkpoint
+        if not self.resume:
+            checkpoint.clear()
+        elif checkpoint.load():
+            print(f"Resuming after {checkpoint.committed_batches:,} committed batches "
+                  f"({checkpoint.uploaded:,} rows uploaded)")
+        stats.uploaded, stats.errors = checkpoint.uploaded, checkpoint.errors
+
+        print(f"\nUploading to {self.table} (batch size {self.batch_size}, "
+              f"{self.workers} workers, upsert on {self.key})...")
+
+        sent = 0
+        error_samples = []
+        batches_per_report = max(1, self.progress_every // self.batch_size)
+
+        def finish(future):
+            nonlocal sent
+            ok, failed = future.result()
+            checkpoint.committed_batches += 1
+            checkpoint.uploaded = stats.uploaded = stats.uploaded + ok
+            checkpoint.errors = stats.errors = stats.errors + len(failed)
+            sent += ok + len(failed)
+            if failed:
+                self.failed_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.failed_path, 'a') as f:
+                    for key, message in failed:
+                        f.write(json.dumps({self.key: key, 'error': message}, default=str) + '\n')
+                error_samples.extend(f"{self.key}={k}: {m[:100]}"
+                                     for k, m in failed[:max(0, 5 - len(error_samples))])
+            if checkpoint.committed_batches % batches_per_report == 0:
+                checkpoint.save()
+                print(f"  Uploaded {stats.uploaded:,} ({stats.rate(sent):,.0f} rows/s)")
+
+        pending = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for number, batch in enumerate(iter_batches(self.unique(rows), self.batch_size)):
+                    if number < checkpoint.committed_batches:
+                        continue
+                    pending.append(pool.submit(self.upload_batch, batch))
+                    # Bound in-flight batches; complete in order so the
+                    # checkpoint always describes a contiguous prefix
+                    while len(pending) >= self.workers * 2:
+                        finish(pending.popleft())
+                while pending:
+                    finish(pending.popleft())
+        except Exception as e:
+            # Batches after the failed one stay uncommitted and are re-sent on resume
+            for future in pending:
+                future.cancel()
+            print(f"\nUpload stopped after {checkpoint.committed_batches:,} committed batches: {str(e)[:200]}")
+            raise
+        finally:
+            checkpoint.save()
+
+        print(f"\nDone! Uploaded: {stats.uploaded:,}, Errors: {stats.errors:,} "
+              f"in {stats.elapsed:.0f}s ({stats.rate(sent):,.0f} rows/s)")
+        print(f"  Read {stats.read:,}, skipped {stats.skipped:,}, filtered {stats.filtered:,}, "
+              f"duplicate keys {stats.duplicates:,}")
+        if error_samples:
+            print(f"\nSample errors (all rejected rows in {self.failed_path}):")
+            for err in error_samples:
+                print(f"  {err}")
+
+        return stats
+
+    def run(self, records: Iterable[Any], limit: Optional[int] = None) -> LoadStats:
+        """Transform, filter and upload source records."""
+        return self.upload(self.rows(records, limit))
+
+
+def add_loader_arguments(parser: argparse.ArgumentParser, workers: int = 8):
+    """Command-line options shared by the loaders."""
+    parser.add_argument('--restart', action='store_true',
+                        help='Ignore the upload checkpoint and start over')
+    parser.add_argument('--workers', type=int, default=workers,
+                        help='Concurrent upload requests')
@@ -10,7 +10,7 @@ A hybrid approach inspired by LEAD (arxiv.org/html/2511.07168):
 Key insight: Apply LLM only to hard cases, achieving both accuracy and efficiency.
 
 Usage:
-    python bph_ia_agent_match.py [--mode fast|hybrid|full] [--sample N]
+    python bph_ia_agent_match.py [--mode fast|hybrid|full] [--sample N] [--index hnsw]
 
 Modes:
     fast   - Embeddings + fuzzy only (no LLM)
@@ -20,6 +20,7 @@ Modes:
 
 import os
 import re
+import sys
 import json
 import argparse
 import asyncio
@@ -33,12 +34,19 @@ import unicodedata
 
 import numpy as np
 import httpx
-from anthropic import Anthropic
 from supabase import create_client, Client
 from rapidfuzz import fuzz
+from rapidfuzz.process import cpdist
 from sentence_transformers import SentenceTransformer
 import faiss
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+from table_snapshot import load_table
+from embedding_store import EmbeddingStore
+from faiss_indexes import INDEX_TYPES, load_or_build_index
+from response_cache import default_cache
+from llm_queue import LLM_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, AdjudicationQueue
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "agent_matching"
 CACHE_DIR = Path(__file__).parent.parent / "data" / "embedding_cache"
@@ -55,6 +63,10 @@ EMBEDDING_THRESHOLD_MEDIUM = 0.75  # Candidate match requiring additional signal
 EMBEDDING_THRESHOLD_LOW = 0.60   # Low confidence, LLM evaluation recommended
 FUZZY_THRESHOLD = 80             # Token set ratio threshold
 
+# Batch candidate generation
+SEARCH_BLOCK = 4096              # Queries per FAISS search call
+CANDIDATE_CHUNK = 10000          # BPH works whose candidates are held in memory at once
+
 
 @dataclass
 class BPHWork:
@@ -132,7 +144,9 @@ def extract_surname(name: str) -> str:
 class BibliographicMatcher:
     """Hybrid matcher combining embeddings, fuzzy matching, and LLM reasoning."""
 
-    def __init__(self, use_llm: bool = True, llm_mode: str = 'hybrid'):
+    def __init__(self, use_llm: bool = True, llm_mode: str = 'hybrid',
+                 llm_concurrency: int = LLM_CONCURRENCY,
+                 llm_requests_per_minute: float = LLM_REQUESTS_PER_MINUTE):
         self.supabase = get_supabase_client()
         self.use_llm = use_llm
         self.llm_mode = llm_mode  # 'hybrid' or 'full'
@@ -143,36 +157,31 @@ class BibliographicMatcher:
 
         # Initialize Claude client if using LLM
         if use_llm:
-            self.anthropic = Anthropic()
-            print("Claude client initialized")
+            self.adjudicator = AdjudicationQueue(
+                CLAUDE_MODEL, concurrency=llm_concurrency,
+                requests_per_minute=llm_requests_per_minute, cache=default_cache(),
+            )
+            print(f"Claude adjudication queue initialized ({llm_concurrency} concurrent, "
+                  f"{llm_requests_per_minute:g} requests/min)")
 
         # Data storage
         self.bph_works: List[BPHWork] = []
         self.ia_works: List[IAWork] = []
-        self.ia_embeddings: Optional[np.ndarray] = None
-        self.faiss_index: Optional[faiss.IndexFlatIP] = None
+        self.embedding_store = EmbeddingStore(CACHE_DIR / "store", EMBEDDING_MODEL)
+        self.faiss_index: Optional[faiss.Index] = None
+        self._ia_signal_cache = None
 
     def load_data(self, year_min: int = 1400, year_max: int = 1700,
                   bph_limit: Optional[int] = None, ia_limit: Optional[int] = None):
-        """Load BPH and IA data from Supabase."""
+        """Load BPH and IA data from the local snapshots (refreshed from Supabase)."""
         # Load BPH works
         print(f"Loading BPH Latin works ({year_min}-{year_max})...")
-        all_bph = []
-        offset = 0
-
-        while True:
-            result = self.supabase.table('bph_works').select(
-                'id, title, author, year, publisher, place, ubn'
-            ).eq('detected_language', 'Latin').gte('year', year_min).lte('year', year_max).range(
-                offset, offset + 999
-            ).execute()
-
-            if not result.data:
-                break
-            all_bph.extend(result.data)
-            offset += 1000
-            if bph_limit and len(all_bph) >= bph_limit:
-                break
+        all_bph = load_table(
+            'bph_works', ['id', 'title', 'author', 'year', 'publisher', 'place', 'ubn'],
+            filters=[('detected_language', '==', 'Latin'),
+                     ('year', '>=', year_min), ('year', '<=', year_max)],
+            client_factory=lambda: self.supabase,
+        )
 
         self.bph_works = [
             BPHWork(
@@ -186,22 +195,10 @@ class BibliographicMatcher:
 
         # Load IA works
         print("Loading IA Latin works...")
-        all_ia = []
-        offset = 0
-
-        while True:
-            result = self.supabase.table('ia_latin_texts').select(
-                'identifier, title, creator, year, description'
-            ).range(offset, offset + 999).execute()
-
-            if not result.data:
-                break
-            all_ia.extend(result.data)
-            offset += 1000
-            if offset % 10000 == 0:
-                print(f"    {offset}...")
-            if ia_limit and len(all_ia) >= ia_limit:
-                break
+        all_ia = load_table(
+            'ia_latin_texts', ['identifier', 'title', 'creator', 'year', 'description'],
+            client_factory=lambda: self.supabase,
+        )
 
         self.ia_works = [
             IAWork(
@@ -211,124 +208,126 @@ class BibliographicMatcher:
             )
             for w in all_ia[:ia_limit] if w.get('title')
         ]
+        self._ia_signal_cache = None
         print(f"  Loaded {len(self.ia_works)} IA works")
 
-    def build_embeddings(self):
-        """Build or load cached embeddings for IA works."""
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        cache_path = CACHE_DIR / "ia_embeddings.npy"
-        ids_path = CACHE_DIR / "ia_ids.json"
-
-        current_ids = [w.identifier for w in self.ia_works]
-
-        # Check cache validity
-        if cache_path.exists() and ids_path.exists():
-            with open(ids_path) as f:
-                cached_ids = json.load(f)
-            if cached_ids == current_ids:
-                print("Loading IA embeddings from cache...")
-                self.ia_embeddings = np.load(cache_path)
-            else:
-                print("Cache invalid, regenerating embeddings...")
-
-        if self.ia_embeddings is None:
-            print(f"Creating embeddings for {len(self.ia_works)} IA works...")
-            titles = [w.title for w in self.ia_works]
-
-            # Batch encode
-            embeddings = []
-            batch_size = 256
-            for i in range(0, len(titles), batch_size):
-                batch = titles[i:i+batch_size]
-                batch_emb = self.embed_model.encode(batch, show_progress_bar=False)
-                embeddings.append(batch_emb)
-                if (i + batch_size) % 10000 == 0:
-                    print(f"    {min(i+batch_size, len(titles))}/{len(titles)}...")
-
-            self.ia_embeddings = np.vstack(embeddings).astype('float32')
-
-            # Cache
-            np.save(cache_path, self.ia_embeddings)
-            with open(ids_path, 'w') as f:
-                json.dump(current_ids, f)
-            print(f"  Cached embeddings to {cache_path}")
-
-        # Build FAISS index
-        print("Building FAISS index...")
-        faiss.normalize_L2(self.ia_embeddings)
-        self.faiss_index = faiss.IndexFlatIP(self.ia_embeddings.shape[1])
-        self.faiss_index.add(self.ia_embeddings)
-        print(f"  Index built with {self.faiss_index.ntotal} vectors")
-
-    def find_candidates(self, bph_work: BPHWork, k: int = 10) -> List[MatchCandidate]:
-        """Find candidate matches using embeddings and fuzzy matching."""
-        candidates = []
-
-        # Embedding search
-        query_emb = self.embed_model.encode([bph_work.title], convert_to_numpy=True)
-        faiss.normalize_L2(query_emb)
-        scores, indices = self.faiss_index.search(query_emb.astype('float32'), k)
+    def build_embeddings(self, index_kind: str = 'flat'):
+        """Embed IA titles (encoding only ones missing from the store) and load or build the index."""
+        print(f"Embedding {len(self.ia_works)} IA titles...")
+        rows = self.embedding_store.update([w.title for w in self.ia_works], self.embed_model)
+        print(f"  {len(self.embedding_store)} titles in embedding store {self.embedding_store.directory}")
+
+        self.faiss_index = load_or_build_index(self.embedding_store, rows, 'ia_agent', index_kind)
+
+    def _ia_signals(self):
+        """Normalized titles, surnames and years of the IA corpus, computed once."""
+        if self._ia_signal_cache is None:
+            self._ia_signal_cache = (
+                [normalize_text(w.title) for w in self.ia_works],
+                np.array([extract_surname(w.creator or '') for w in self.ia_works], dtype=object),
+                np.array([w.year or np.nan for w in self.ia_works], dtype=np.float64),
+            )
+        return self._ia_signal_cache
 
-        bph_norm = normalize_text(bph_work.title)
-        bph_surname = extract_surname(bph_work.author or '')
+    def find_candidates_batch(self, bph_works: List[BPHWork], k: int = 10) -> List[List[MatchCandidate]]:
+        """
+        Find candidate matches for many BPH works at once.
 
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < 0:
-                continue
+        BPH titles go through the embedding store (so their vectors are cached
+        across runs), FAISS is searched in blocks of SEARCH_BLOCK queries, and the
+        fuzzy, author and year signals are computed over the whole candidate
+        matrix rather than one pair at a time.
 
-            ia_work = self.ia_works[idx]
-            ia_norm = normalize_text(ia_work.title)
+        Args:
+            bph_works: Works to find candidates for
+            k: Nearest IA titles retrieved per work
 
-            # Calculate fuzzy score
-            fuzzy_score = fuzz.token_set_ratio(bph_norm, ia_norm)
+        Returns:
+            Candidates for each work, best embedding score first
+        """
+        if not bph_works:
+            return []
+        ia_norm, ia_surname, ia_year = self._ia_signals()
 
-            # Check author match
-            ia_surname = extract_surname(ia_work.creator or '')
-            author_match = (
-                bph_surname and ia_surname and
-                fuzz.ratio(bph_surname, ia_surname) >= 80
-            )
+        # Embedding search
+        rows = self.embedding_store.update([w.title for w in bph_works], self.embed_model)
+        scores = np.empty((len(bph_works), k), dtype=np.float32)
+        indices = np.empty((len(bph_works), k), dtype=np.int64)
+        for start in range(0, len(bph_works), SEARCH_BLOCK):
+            query_emb = self.embedding_store.gather(rows[start:start + SEARCH_BLOCK])
+            faiss.normalize_L2(query_emb)
+            end = start + len(query_emb)
+            scores[start:end], indices[start:end] = self.faiss_index.search(query_emb, k)
+
+        # One entry per (work, candidate) pair; approximate indexes may return -1
+        work_idx, rank = np.nonzero(indices >= 0)
+        ia_idx = indices[work_idx, rank]
+        pair_scores = scores[work_idx, rank]
+        if not len(work_idx):
+            return [[] for _ in bph_works]
+
+        bph_norm = [normalize_text(w.title) for w in bph_works]
+        bph_surname = np.array([extract_surname(w.author or '') for w in bph_works], dtype=object)
+        bph_year = np.array([w.year or np.nan for w in bph_works], dtype=np.float64)
+
+        # Fuzzy title score
+        fuzzy_scores = cpdist([bph_norm[i] for i in work_idx], [ia_norm[j] for j in ia_idx],
+                              scorer=fuzz.token_set_ratio, dtype=np.float64, workers=-1)
+
+        # Author match (both surnames known and similar)
+        pair_bph_surname, pair_ia_surname = bph_surname[work_idx], ia_surname[ia_idx]
+        author_match = (
+            (pair_bph_surname != '') & (pair_ia_surname != '') &
+            (cpdist(pair_bph_surname.tolist(), pair_ia_surname.tolist(),
+                    scorer=fuzz.ratio, dtype=np.float64, workers=-1) >= 80)
+        )
 
-            # Check year match (within 30 years)
-            year_match = (
-                bph_work.year and ia_work.year and
-                abs(bph_work.year - ia_work.year) <= 30
-            )
+        # Year match (within 30 years; unknown years never match)
+        with np.errstate(invalid='ignore'):
+            year_match = np.abs(bph_year[work_idx] - ia_year[ia_idx]) <= 30
+
+        # Determine confidence based on multiple signals
+        either = author_match | year_match
+        confidence = np.select(
+            [
+                # High: title + (author OR year) signal
+                (pair_scores >= EMBEDDING_THRESHOLD_HIGH) & either,
+                # High: title >= 0.75 + author + year all match
+                (pair_scores >= EMBEDDING_THRESHOLD_MEDIUM) & author_match & year_match,
+                # Medium: title >= 0.85 alone
+                pair_scores >= EMBEDDING_THRESHOLD_HIGH,
+                # Medium-low: title >= 0.75 with supporting signals
+                (pair_scores >= EMBEDDING_THRESHOLD_MEDIUM) & either,
+                # Low but potential: needs LLM evaluation
+                pair_scores >= EMBEDDING_THRESHOLD_LOW,
+            ],
+            ['high', 'high', 'medium', 'medium', 'needs_llm' if self.use_llm else 'low'],
+            default='low',
+        )
 
-            # Determine confidence based on multiple signals
-            # High: title + (author OR year) signal
-            if score >= EMBEDDING_THRESHOLD_HIGH and (author_match or year_match):
-                confidence = 'high'
-            # Medium: title + author + year all match
-            elif score >= EMBEDDING_THRESHOLD_MEDIUM and author_match and year_match:
-                confidence = 'high'
-            # Medium: title >= 0.85 alone
-            elif score >= EMBEDDING_THRESHOLD_HIGH:
-                confidence = 'medium'
-            # Medium-low: title >= 0.75 with supporting signals
-            elif score >= EMBEDDING_THRESHOLD_MEDIUM and (author_match or year_match):
-                confidence = 'medium'
-            # Low but potential: needs LLM evaluation
-            elif score >= EMBEDDING_THRESHOLD_LOW:
-                confidence = 'needs_llm' if self.use_llm else 'low'
-            else:
-                confidence = 'low'
-
-            candidates.append(MatchCandidate(
-                bph_work=bph_work,
-                ia_work=ia_work,
-                embedding_score=float(score),
-                fuzzy_score=fuzzy_score,
-                author_match=author_match,
-                year_match=year_match,
-                confidence=confidence,
+        candidates: List[List[MatchCandidate]] = [[] for _ in bph_works]
+        for p in range(len(work_idx)):
+            candidates[work_idx[p]].append(MatchCandidate(
+                bph_work=bph_works[work_idx[p]],
+                ia_work=self.ia_works[ia_idx[p]],
+                embedding_score=float(pair_scores[p]),
+                fuzzy_score=float(fuzzy_scores[p]),
+                author_match=bool(author_match[p]),
+                year_match=bool(year_match[p]),
+                confidence=str(confidence[p]),
             ))
 
-        return sorted(candidates, key=lambda c: c.embedding_score, reverse=True)
+        for work_candidates in candidates:
+            work_candidates.sort(key=lambda c: c.embedding_score, reverse=True)
+        return candidates
 
-    def llm_evaluate(self, candidate: MatchCandidate) -> MatchResult:
-        """Use Claude to evaluate an ambiguous match candidate."""
-        prompt = f"""You are an expert bibliographer evaluating whether two catalog records refer to the same book.
+    def find_candidates(self, bph_work: BPHWork, k: int = 10) -> List[MatchCandidate]:
+        """Find candidate matches for a single work using embeddings and fuzzy matching."""
+        return self.find_candidates_batch([bph_work], k)[0]
+
+    def llm_prompt(self, candidate: MatchCandidate) -> str:
+        """Prompt asking Claude to adjudicate a match candidate."""
+        return f"""You are an expert bibliographer evaluating whether two catalog records refer to the same book.
 
 ## BPH Catalog Record (Bibliotheca Philosophica Hermetica)
 - Title: {candidate.bph_work.title}
@@ -369,50 +368,53 @@ Respond in this exact JSON format:
     "reasoning": "Brief explanation of your decision"
 }}"""
 
-        try:
-            response = self.anthropic.messages.create(
-                model=CLAUDE_MODEL,
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            # Parse response
-            text = response.content[0].text
-            # Extract JSON from response
-            json_match = re.search(r'\{[^}]+\}', text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                result = {"verdict": "DIFFERENT", "confidence": "low", "reasoning": "Could not parse response"}
-
-            is_match = result['verdict'] in ['SAME_EDITION', 'SAME_WORK']
-            match_type = result['verdict'].lower().replace('_', '_')
-
-            return MatchResult(
-                bph_work=candidate.bph_work,
-                ia_work=candidate.ia_work if is_match else None,
-                is_match=is_match,
-                confidence=result['confidence'],
-                match_type=match_type,
-                reasoning=result['reasoning'],
-                method='llm'
-            )
-
-        except Exception as e:
-            print(f"  LLM evaluation failed: {e}")
+    def llm_result(self, candidate: MatchCandidate, verdict: Dict[str, Any]) -> MatchResult:
+        """Turn an adjudication verdict (or error) into a MatchResult."""
+        if 'error' in verdict:
             return MatchResult(
                 bph_work=candidate.bph_work,
                 ia_work=None,
                 is_match=False,
                 confidence='low',
                 match_type='error',
-                reasoning=f"LLM error: {str(e)}",
+                reasoning=f"LLM error: {verdict['error']}",
                 method='llm_error'
             )
 
-    def match_work(self, bph_work: BPHWork) -> MatchResult:
-        """Match a single BPH work using the hybrid approach."""
-        candidates = self.find_candidates(bph_work)
+        is_match = verdict['verdict'] in ['SAME_EDITION', 'SAME_WORK']
+        return MatchResult(
+            bph_work=candidate.bph_work,
+            ia_work=candidate.ia_work if is_match else None,
+            is_match=is_match,
+            confidence=verdict['confidence'],
+            match_type=verdict['verdict'].lower(),
+            reasoning=verdict['reasoning'],
+            method='llm'
+        )
+
+    def llm_evaluate_batch(self, candidates: List[MatchCandidate]) -> List[MatchResult]:
+        """Adjudicate many candidates concurrently through the LLM queue."""
+        verdicts = self.adjudicator.run([self.llm_prompt(c) for c in candidates])
+        return [self.llm_result(c, v) for c, v in zip(candidates, verdicts)]
+
+    def llm_evaluate(self, candidate: MatchCandidate) -> MatchResult:
+        """Use Claude to evaluate an ambiguous match candidate."""
+        return self.llm_evaluate_batch([candidate])[0]
+
+    def match_work(self, bph_work: BPHWork,
+                   candidates: Optional[List[MatchCandidate]] = None,
+                   deferred: Optional[List[MatchCandidate]] = None) -> Optional[MatchResult]:
+        """
+        Match a single BPH work using the hybrid approach.
+
+        Args:
+            bph_work: Work to match
+            candidates: Precomputed candidates (found here if not given)
+            deferred: If given, a candidate needing the LLM is appended here and
+                      None returned, so the caller can adjudicate in bulk
+        """
+        if candidates is None:
+            candidates = self.find_candidates(bph_work)
 
         if not candidates:
             return MatchResult(
@@ -444,6 +446,9 @@ Respond in this exact JSON format:
 
         # Needs LLM evaluation
         if best.confidence == 'needs_llm' or self.llm_mode == 'full':
+            if deferred is not None:
+                deferred.append(best)
+                return None
             return self.llm_evaluate(best)
 
         # Low confidence - no match
@@ -464,17 +469,29 @@ Respond in this exact JSON format:
         results = []
         llm_calls = 0
 
-        for i, bph_work in enumerate(self.bph_works):
-            result = self.match_work(bph_work)
-            results.append(result)
-
-            if result.method == 'llm':
-                llm_calls += 1
+        for start in range(0, len(self.bph_works), CANDIDATE_CHUNK):
+            chunk = self.bph_works[start:start + CANDIDATE_CHUNK]
+            print(f"  Generating candidates for works {start + 1}-{start + len(chunk)}...")
+            chunk_candidates = self.find_candidates_batch(chunk)
+
+            deferred: List[MatchCandidate] = []
+            pending = []
+            for bph_work, candidates in zip(chunk, chunk_candidates):
+                result = self.match_work(bph_work, candidates, deferred)
+                if result is None:
+                    pending.append(len(results))
+                results.append(result)
+
+            if deferred:
+                print(f"  Sending {len(deferred)} ambiguous candidates to {CLAUDE_MODEL}...")
+                for slot, result in zip(pending, self.llm_evaluate_batch(deferred)):
+                    results[slot] = result
+                llm_calls += len(deferred)
 
             # Progress
-            if (i + 1) % 100 == 0:
-                matched = sum(1 for r in results if r.is_match)
-                print(f"  {i+1}/{len(self.bph_works)} - Matched: {matched} ({100*matched/(i+1):.1f}%), LLM calls: {llm_calls}")
+            done = len(results)
+            matched = sum(1 for r in results if r.is_match)
+            print(f"  {done}/{len(self.bph_works)} - Matched: {matched} ({100*matched/done:.1f}%), LLM calls: {llm_calls}")
 
         return results
 
@@ -567,6 +584,12 @@ def main():
     parser.add_argument('--year-max', type=int, default=1700)
     parser.add_argument('--sample', type=int, default=None, help='Sample size for BPH works')
     parser.add_argument('--ia-sample', type=int, default=None, help='Limit IA corpus size for faster testing')
+    parser.add_argument('--index', choices=INDEX_TYPES, default='flat',
+                        help='FAISS index type (approximate types scale to millions of titles)')
+    parser.add_argument('--llm-concurrency', type=int, default=LLM_CONCURRENCY,
+                        help='Maximum concurrent Claude requests')
+    parser.add_argument('--llm-rpm', type=float, default=LLM_REQUESTS_PER_MINUTE,
+                        help='Claude requests per minute limit')
     args = parser.parse_args()
 
     print("=" * 70)
@@ -580,9 +603,11 @@ def main():
     use_llm = args.mode != 'fast'
     llm_mode = args.mode if args.mode != 'fast' else 'hybrid'
 
-    matcher = BibliographicMatcher(use_llm=use_llm, llm_mode=llm_mode)
+    matcher = BibliographicMatcher(use_llm=use_llm, llm_mode=llm_mode,
+                                   llm_concurrency=args.llm_concurrency,
+                                   llm_requests_per_minute=args.llm_rpm)
     matcher.load_data(args.year_min, args.year_max, bph_limit=args.sample, ia_limit=args.ia_sample)
-    matcher.build_embeddings()
+    matcher.build_embeddings(args.index)
 
     results = matcher.run_matching()
     save_results(results, OUTPUT_DIR)
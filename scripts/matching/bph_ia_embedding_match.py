@@ -11,10 +11,16 @@ Key advantages over fuzzy matching:
 - Captures semantic similarity, not just character overlap
 - Handles synonyms and paraphrases
 - Works well when titles are embedded in longer strings
+
+Usage:
+    python bph_ia_embedding_match.py [--index flat|hnsw|ivf-flat|ivf-pq]
+    python bph_ia_embedding_match.py --benchmark   # recall/latency per index type
 """
 
 import os
+import sys
 import json
+import argparse
 import numpy as np
 from datetime import datetime
 from pathlib import Path
@@ -41,6 +47,11 @@ except ImportError:
     subprocess.run(["pip", "install", "faiss-cpu"], check=True)
     import faiss
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+from table_snapshot import load_table
+from embedding_store import EmbeddingStore
+from faiss_indexes import INDEX_TYPES, benchmark, load_or_build_index
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "embedding_matching"
 CACHE_DIR = Path(__file__).parent.parent / "data" / "embedding_cache"
@@ -59,132 +70,52 @@ def get_supabase_client() -> Client:
 
 
 def load_bph_latin_works(limit: int = None) -> list:
-    """Load BPH Latin works from Supabase."""
-    client = get_supabase_client()
-
+    """Load BPH Latin works from the local snapshot (refreshed from Supabase)."""
     print("Loading BPH Latin works...")
 
-    all_works = []
-    offset = 0
-    batch_size = 1000
-
-    while True:
-        result = client.table('bph_works').select(
-            'id, title, author, year, ubn'
-        ).eq('detected_language', 'Latin').range(offset, offset + batch_size - 1).execute()
-
-        if not result.data:
-            break
-
-        all_works.extend(result.data)
-        offset += batch_size
-
-        if limit and len(all_works) >= limit:
-            all_works = all_works[:limit]
-            break
+    all_works = load_table(
+        'bph_works', ['id', 'title', 'author', 'year', 'ubn'],
+        filters=[('detected_language', '==', 'Latin')],
+        client_factory=get_supabase_client,
+    )
+    if limit:
+        all_works = all_works[:limit]
 
     print(f"  Loaded {len(all_works)} Latin works from BPH")
     return all_works
 
 
 def load_ia_latin_works() -> list:
-    """Load Internet Archive Latin works from Supabase."""
-    client = get_supabase_client()
-
+    """Load Internet Archive Latin works from the local snapshot."""
     print("Loading IA Latin works...")
 
-    all_works = []
-    offset = 0
-    batch_size = 1000
-
-    while True:
-        result = client.table('ia_latin_texts').select(
-            'identifier, title, creator, year'
-        ).range(offset, offset + batch_size - 1).execute()
-
-        if not result.data:
-            break
-
-        all_works.extend(result.data)
-        offset += batch_size
-
-        if offset % 10000 == 0:
-            print(f"    {offset}...")
+    all_works = load_table(
+        'ia_latin_texts', ['identifier', 'title', 'creator', 'year'],
+        client_factory=get_supabase_client,
+    )
 
     print(f"  Loaded {len(all_works)} Latin works from IA")
     return all_works
 
 
 def get_or_create_embeddings(works: list, model: SentenceTransformer, cache_name: str) -> np.ndarray:
-    """Get embeddings from cache or create them."""
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    cache_path = CACHE_DIR / f"{cache_name}_embeddings.npy"
-    ids_path = CACHE_DIR / f"{cache_name}_ids.json"
-
-    # Check if cache exists and is valid
-    if cache_path.exists() and ids_path.exists():
-        with open(ids_path) as f:
-            cached_ids = json.load(f)
-
-        # Get current IDs
-        if cache_name == 'ia':
-            current_ids = [w.get('identifier', '') for w in works]
-        else:
-            current_ids = [w.get('id', '') for w in works]
-
-        if cached_ids == current_ids:
-            print(f"  Loading {cache_name} embeddings from cache...")
-            return np.load(cache_path)
-
-    # Create embeddings
-    print(f"  Creating {cache_name} embeddings ({len(works)} titles)...")
-    titles = [w.get('title', '') or '' for w in works]
-
-    # Encode in batches
-    batch_size = 256
-    all_embeddings = []
-
-    for i in range(0, len(titles), batch_size):
-        batch = titles[i:i+batch_size]
-        embeddings = model.encode(batch, show_progress_bar=False, convert_to_numpy=True)
-        all_embeddings.append(embeddings)
-
-        if (i + batch_size) % 10000 == 0:
-            print(f"    Encoded {min(i + batch_size, len(titles))}/{len(titles)}...")
-
-    embeddings = np.vstack(all_embeddings).astype('float32')
-
-    # Cache
-    np.save(cache_path, embeddings)
-    if cache_name == 'ia':
-        ids = [w.get('identifier', '') for w in works]
-    else:
-        ids = [w.get('id', '') for w in works]
-    with open(ids_path, 'w') as f:
-        json.dump(ids, f)
-
-    print(f"  Cached {cache_name} embeddings to {cache_path}")
+    """Get title embeddings, encoding only titles not yet in the embedding store."""
+    print(f"  Embedding {cache_name} titles ({len(works)} works)...")
+    store = EmbeddingStore(CACHE_DIR / "store", MODEL_NAME)
+    embeddings = store.encode([w.get('title', '') or '' for w in works], model)
+    print(f"  {len(store)} titles in embedding store {store.directory}")
     return embeddings
 
 
-def build_faiss_index(embeddings: np.ndarray) -> faiss.IndexFlatIP:
-    """Build a FAISS index for fast similarity search."""
-    print("Building FAISS index...")
-
-    # Normalize for cosine similarity
-    faiss.normalize_L2(embeddings)
-
-    # Create index
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)  # Inner product = cosine sim for normalized vectors
-    index.add(embeddings)
-
-    print(f"  Built index with {index.ntotal} vectors")
-    return index
+def build_faiss_index(works: list, model: SentenceTransformer, kind: str = 'flat') -> faiss.Index:
+    """Load the IA title index of the given type from disk, or build and save it."""
+    store = EmbeddingStore(CACHE_DIR / "store", MODEL_NAME)
+    rows = store.update([w.get('title', '') or '' for w in works], model)
+    return load_or_build_index(store, rows, 'ia', kind)
 
 
 def find_matches(bph_works: list, ia_works: list, bph_embeddings: np.ndarray,
-                 index: faiss.IndexFlatIP, k: int = 5) -> list:
+                 index: faiss.Index, k: int = 5) -> list:
     """Find top-k matches for each BPH work using semantic similarity."""
     print("\nFinding semantic matches...")
 
@@ -208,7 +139,7 @@ def find_matches(bph_works: list, ia_works: list, bph_embeddings: np.ndarray,
 
             matches = []
             for sim, idx in zip(sims, idxs):
-                if sim >= SIMILARITY_THRESHOLD:
+                if idx >= 0 and sim >= SIMILARITY_THRESHOLD:
                     matches.append({
                         'ia_work': ia_works[idx],
                         'score': float(sim),
@@ -234,6 +165,15 @@ def find_matches(bph_works: list, ia_works: list, bph_embeddings: np.ndarray,
 
 
 def main():
+    parser = argparse.ArgumentParser(description='BPH-IA semantic matching with embeddings')
+    parser.add_argument('--index', choices=INDEX_TYPES, default='flat',
+                        help='FAISS index type (approximate types scale to millions of titles)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare recall and latency of all index types instead of matching')
+    parser.add_argument('--benchmark-queries', type=int, default=2000,
+                        help='Number of BPH titles used as benchmark queries')
+    args = parser.parse_args()
+
     print("=" * 70)
     print("BPH-IA SEMANTIC MATCHING WITH EMBEDDINGS")
     print("=" * 70)
@@ -252,10 +192,14 @@ def main():
     # Get or create embeddings
     print("\nPreparing embeddings...")
     bph_embeddings = get_or_create_embeddings(bph_works, model, 'bph')
-    ia_embeddings = get_or_create_embeddings(ia_works, model, 'ia')
 
-    # Build FAISS index
-    index = build_faiss_index(ia_embeddings)
+    if args.benchmark:
+        ia_embeddings = get_or_create_embeddings(ia_works, model, 'ia')
+        benchmark(ia_embeddings, bph_embeddings[:args.benchmark_queries])
+        return
+
+    # Load or build FAISS index
+    index = build_faiss_index(ia_works, model, args.index)
 
     # Find matches
     results = find_matches(bph_works, ia_works, bph_embeddings, index)
@@ -301,6 +245,7 @@ def main():
         'metadata': {
             'timestamp': timestamp,
             'model': MODEL_NAME,
+            'index': args.index,
             'similarity_threshold': SIMILARITY_THRESHOLD,
             'bph_latin_works': total,
             'ia_latin_works': len(ia_works),
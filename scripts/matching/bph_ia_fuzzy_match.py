@@ -13,11 +13,19 @@ The key insight from manual verification:
 
 import os
 import re
+import sys
 import json
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
+from candidate_index import CandidateIndex
+from fuzzy_scoring import score_one
+from title_lsh import TitleLSHIndex
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+from table_snapshot import load_table
+
 try:
     from rapidfuzz import fuzz, process
 except ImportError:
@@ -41,6 +49,11 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXV
 FUZZY_THRESHOLD = 80  # Minimum similarity score for fuzzy match
 SUBSTRING_MIN_LENGTH = 15  # Minimum title length for substring matching
 
+# MinHash LSH over title words (near-duplicate titles, e.g. "Opera" vs "Opuscula")
+LSH_BANDS = 16
+LSH_ROWS = 4
+LSH_CACHE = OUTPUT_DIR / "ia_title_lsh.npz"
+
 
 def get_supabase_client() -> Client:
     return create_client(SUPABASE_URL, SUPABASE_KEY)
@@ -76,123 +89,76 @@ def extract_significant_words(title: str, min_length: int = 4) -> set:
 
 
 def load_bph_latin_works(limit: int = None) -> list:
-    """Load BPH Latin works from Supabase."""
-    client = get_supabase_client()
-
+    """Load BPH Latin works from the local snapshot (refreshed from Supabase)."""
     print("Loading BPH Latin works...")
 
-    # Get works where detected_language is Latin
-    all_works = []
-    offset = 0
-    batch_size = 1000
-
-    while True:
-        result = client.table('bph_works').select(
-            'id, title, author, year, ubn'
-        ).eq('detected_language', 'Latin').range(offset, offset + batch_size - 1).execute()
-
-        if not result.data:
-            break
-
-        all_works.extend(result.data)
-        offset += batch_size
-
-        if limit and len(all_works) >= limit:
-            all_works = all_works[:limit]
-            break
+    all_works = load_table(
+        'bph_works', ['id', 'title', 'author', 'year', 'ubn'],
+        filters=[('detected_language', '==', 'Latin')],
+        client_factory=get_supabase_client,
+    )
+    if limit:
+        all_works = all_works[:limit]
 
     print(f"  Loaded {len(all_works)} Latin works from BPH")
     return all_works
 
 
 def load_ia_latin_works() -> list:
-    """Load Internet Archive Latin works from Supabase."""
-    client = get_supabase_client()
-
+    """Load Internet Archive Latin works from the local snapshot."""
     print("Loading IA Latin works...")
 
-    all_works = []
-    offset = 0
-    batch_size = 1000
-
-    while True:
-        result = client.table('ia_latin_texts').select(
-            'identifier, title, creator, year'
-        ).range(offset, offset + batch_size - 1).execute()
-
-        if not result.data:
-            break
-
-        all_works.extend(result.data)
-        offset += batch_size
-
-        # Progress
-        if offset % 10000 == 0:
-            print(f"    {offset}...")
+    all_works = load_table(
+        'ia_latin_texts', ['identifier', 'title', 'creator', 'year'],
+        client_factory=get_supabase_client,
+    )
 
     print(f"  Loaded {len(all_works)} Latin works from IA")
     return all_works
 
 
-def build_ia_indices(ia_works: list) -> dict:
-    """Build multiple indices for efficient matching."""
+def build_ia_indices(ia_works: list) -> CandidateIndex:
+    """Build the candidate index used by every matching strategy."""
     print("Building IA indices...")
 
-    indices = {
-        'by_normalized_title': {},  # normalized title -> [works]
-        'by_author': defaultdict(list),  # author surname -> [works]
-        'by_words': defaultdict(list),  # significant word -> [works]
-        'all_titles': [],  # list of (normalized_title, work)
-    }
-
-    for work in ia_works:
-        title = work.get('title', '')
-        creator = work.get('creator', '')
-
-        # Normalized title
-        norm_title = normalize_title(title)
-        if norm_title:
-            if norm_title not in indices['by_normalized_title']:
-                indices['by_normalized_title'][norm_title] = []
-            indices['by_normalized_title'][norm_title].append(work)
-            indices['all_titles'].append((norm_title, work))
-
-        # Author index (extract surname)
-        if creator:
-            # Try to get the surname (last name)
-            surnames = re.findall(r'\b([A-Z][a-z]+)\b', creator)
-            for surname in surnames:
-                indices['by_author'][surname.lower()].append(work)
+    index = CandidateIndex(
+        ia_works,
+        normalize=normalize_title,
+        keywords=extract_significant_words,
+    )
 
-        # Word index
-        for word in extract_significant_words(title):
-            indices['by_words'][word].append(work)
+    index.attach_lsh(TitleLSHIndex.load_or_build(
+        LSH_CACHE,
+        [str(work.get('identifier')) for work in ia_works],
+        index.norm_titles,
+        bands=LSH_BANDS,
+        rows=LSH_ROWS,
+    ))
 
-    print(f"  Indexed {len(indices['by_normalized_title'])} unique normalized titles")
-    print(f"  Indexed {len(indices['by_author'])} author surnames")
-    print(f"  Indexed {len(indices['by_words'])} significant words")
+    stats = index.stats()
+    print(f"  Indexed {stats['titles']} normalized titles")
+    print(f"  Indexed {stats['surnames']} author surnames")
+    print(f"  Indexed {stats['words']} significant words")
 
-    return indices
+    return index
 
 
-def match_exact_prefix(bph_title: str, ia_indices: dict, prefix_len: int = 50) -> list:
+def match_exact_prefix(bph_title: str, ia_index: CandidateIndex, prefix_len: int = 50) -> list:
     """Original prefix matching approach."""
     norm_bph = normalize_title(bph_title)
     prefix = norm_bph[:prefix_len]
 
-    matches = []
-    for norm_ia, work in ia_indices['all_titles']:
-        if norm_ia.startswith(prefix):
-            matches.append({
-                'method': 'exact_prefix',
-                'score': 100,
-                'ia_work': work
-            })
-
-    return matches[:5]
+    return [
+        {
+            'method': 'exact_prefix',
+            'score': 100,
+            'ia_work': ia_index.work(row)
+        }
+        for row in ia_index.prefix_rows(prefix, limit=5)
+    ]
 
 
-def match_substring(bph_title: str, ia_indices: dict) -> list:
+def match_substring(bph_title: str, ia_index: CandidateIndex) -> list:
     """Check if BPH title appears as substring in IA title."""
     norm_bph = normalize_title(bph_title)
 
@@ -206,75 +172,74 @@ def match_substring(bph_title: str, ia_indices: dict) -> list:
         return []
 
     # Find candidates that share at least 2 significant words
-    candidates = defaultdict(int)
-    for word in bph_words:
-        for work in ia_indices['by_words'].get(word, []):
-            candidates[work['identifier']] += 1
-
-    # Filter to those with 2+ shared words
-    strong_candidates = [
-        work_id for work_id, count in candidates.items()
-        if count >= min(2, len(bph_words))
-    ]
+    candidates = ia_index.word_candidates(bph_words)
+    min_shared = min(2, len(bph_words))
+    strong_candidates = sorted(
+        row for row, count in candidates.items() if count >= min_shared
+    )
 
     matches = []
-    for norm_ia, work in ia_indices['all_titles']:
-        if work['identifier'] not in strong_candidates:
-            continue
-
+    for row in strong_candidates:
         # Check if BPH title appears in IA title
-        if norm_bph in norm_ia:
+        if norm_bph in ia_index.norm_titles[row]:
             matches.append({
                 'method': 'substring',
                 'score': 95,
-                'ia_work': work
+                'ia_work': ia_index.work(row)
             })
+            if len(matches) == 5:
+                break
+
+    return matches
 
-    return matches[:5]
 
+def match_fuzzy(bph_title: str, ia_index: CandidateIndex, lsh_rows=()) -> list:
+    """
+    Fuzzy matching using rapidfuzz.
 
-def match_fuzzy(bph_title: str, ia_indices: dict) -> list:
-    """Fuzzy matching using rapidfuzz."""
+    Candidates are IA titles sharing a significant word, plus ``lsh_rows``
+    (near-duplicate titles from the LSH index, which catch titles whose
+    shared words are all stopwords or short).
+    """
     norm_bph = normalize_title(bph_title)
 
     if len(norm_bph) < 10:
         return []
 
-    # Use word index to narrow candidates
+    # Use word index to narrow candidates (at least 1 shared word)
     bph_words = extract_significant_words(bph_title)
+    candidate_rows = set(ia_index.word_candidates(bph_words))
+    candidate_rows.update(int(row) for row in lsh_rows)
+    candidate_rows = sorted(candidate_rows)
 
-    candidates = defaultdict(int)
-    for word in bph_words:
-        for work in ia_indices['by_words'].get(word, []):
-            candidates[work['identifier']] += 1
-
-    # Get candidates with at least 1 shared word
-    candidate_works = []
-    for norm_ia, work in ia_indices['all_titles']:
-        if work['identifier'] in candidates:
-            candidate_works.append((norm_ia, work))
-
-    if not candidate_works:
+    if not candidate_rows:
         return []
 
-    # Fuzzy match against candidates only
-    matches = []
-    for norm_ia, work in candidate_works:
-        # Use token_set_ratio for better handling of word order differences
-        score = fuzz.token_set_ratio(norm_bph, norm_ia)
-        if score >= FUZZY_THRESHOLD:
-            matches.append({
-                'method': 'fuzzy',
-                'score': score,
-                'ia_work': work
-            })
+    # Fuzzy match against candidates only, in one batched call
+    # (token_set_ratio handles word order differences)
+    scores = score_one(
+        norm_bph,
+        [ia_index.norm_titles[row] for row in candidate_rows],
+        scorer=fuzz.token_set_ratio,
+        score_cutoff=FUZZY_THRESHOLD,
+    )
+
+    matches = [
+        {
+            'method': 'fuzzy',
+            'score': score,
+            'ia_work': ia_index.work(row)
+        }
+        for row, score in zip(candidate_rows, scores.tolist())
+        if score >= FUZZY_THRESHOLD
+    ]
 
     # Sort by score and take top 5
     matches.sort(key=lambda x: x['score'], reverse=True)
     return matches[:5]
 
 
-def match_author_title(bph_work: dict, ia_indices: dict) -> list:
+def match_author_title(bph_work: dict, ia_index: CandidateIndex) -> list:
     """Match by author + partial title."""
     author = bph_work.get('author', '')
     title = bph_work.get('title', '')
@@ -287,51 +252,55 @@ def match_author_title(bph_work: dict, ia_indices: dict) -> list:
     if not surnames:
         return []
 
-    matches = []
-    for surname in surnames:
-        surname_lower = surname.lower()
-        if surname_lower not in ia_indices['by_author']:
-            continue
-
-        # Check each work by this author
-        for work in ia_indices['by_author'][surname_lower]:
-            ia_title = work.get('title', '')
-            norm_bph = normalize_title(title)
-            norm_ia = normalize_title(ia_title)
-
-            # Check for significant overlap
-            score = fuzz.token_set_ratio(norm_bph, norm_ia)
-            if score >= 60:  # Lower threshold since we have author match
-                matches.append({
-                    'method': 'author_title',
-                    'score': score,
-                    'ia_work': work
-                })
+    norm_bph = normalize_title(title)
+
+    # Works by any of these surnames (repeats kept, as before)
+    rows = [row for surname in surnames for row in ia_index.author_rows(surname.lower())]
+    if not rows:
+        return []
+
+    # Check for significant overlap; lower threshold since we have author match
+    scores = score_one(
+        norm_bph,
+        [ia_index.norm_titles[row] for row in rows],
+        scorer=fuzz.token_set_ratio,
+        score_cutoff=60,
+    )
+
+    matches = [
+        {
+            'method': 'author_title',
+            'score': score,
+            'ia_work': ia_index.work(row)
+        }
+        for row, score in zip(rows, scores.tolist())
+        if score >= 60
+    ]
 
     matches.sort(key=lambda x: x['score'], reverse=True)
     return matches[:5]
 
 
-def find_matches(bph_work: dict, ia_indices: dict) -> dict:
+def find_matches(bph_work: dict, ia_index: CandidateIndex, lsh_rows=()) -> dict:
     """Apply all matching strategies and return best matches."""
     title = bph_work.get('title', '')
 
     all_matches = []
 
     # Strategy 1: Exact prefix (original method)
-    prefix_matches = match_exact_prefix(title, ia_indices)
+    prefix_matches = match_exact_prefix(title, ia_index)
     all_matches.extend(prefix_matches)
 
     # Strategy 2: Substring matching
-    substring_matches = match_substring(title, ia_indices)
+    substring_matches = match_substring(title, ia_index)
     all_matches.extend(substring_matches)
 
     # Strategy 3: Fuzzy matching
-    fuzzy_matches = match_fuzzy(title, ia_indices)
+    fuzzy_matches = match_fuzzy(title, ia_index, lsh_rows)
     all_matches.extend(fuzzy_matches)
 
     # Strategy 4: Author + title
-    author_matches = match_author_title(bph_work, ia_indices)
+    author_matches = match_author_title(bph_work, ia_index)
     all_matches.extend(author_matches)
 
     # Deduplicate by IA identifier
@@ -368,7 +337,7 @@ def main():
     ia_works = load_ia_latin_works()
 
     # Build indices
-    ia_indices = build_ia_indices(ia_works)
+    ia_index = build_ia_indices(ia_works)
 
     # Match BPH works
     print("\n" + "=" * 70)
@@ -378,9 +347,14 @@ def main():
     results = []
     method_counts = defaultdict(int)
 
+    # Near-duplicate title candidates for every BPH work in one batch
+    lsh_candidates = ia_index.similar_title_rows(
+        [normalize_title(w.get('title', '')) for w in bph_works]
+    )
+
     matched = 0
     for i, bph_work in enumerate(bph_works):
-        result = find_matches(bph_work, ia_indices)
+        result = find_matches(bph_work, ia_index, lsh_candidates[i])
         results.append(result)
 
         if result['found']:
@@ -11,24 +11,32 @@ This is more efficient and scalable than the embedding-based approach.
 
 Usage:
     python bph_ia_search_match.py [--mode fast|hybrid|full] [--sample N]
+    python bph_ia_search_match.py --concurrency 16 --delay 0.25   # 16 searches in flight, <=4 req/s
 """
 
 import os
 import re
+import sys
 import json
 import argparse
+import asyncio
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, asdict
+from collections import deque
 import unicodedata
 
 import httpx
-from anthropic import Anthropic
 from supabase import create_client, Client
 from rapidfuzz import fuzz
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+from table_snapshot import load_table
+from response_cache import DAY, cached, default_cache
+from llm_queue import LLM_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, AdjudicationQueue, TokenBucket
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "search_matching"
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://ykhxaecbbxaaqlujuzde.supabase.co")
@@ -45,6 +53,9 @@ FUZZY_THRESHOLD_LOW = 70     # Low confidence, needs LLM
 # Internet Archive API
 IA_SEARCH_URL = "https://archive.org/advancedsearch.php"
 IA_METADATA_URL = "https://archive.org/metadata"
+IA_SEARCH_TTL = 30 * DAY  # Cached search responses are refreshed monthly
+IA_REQUESTS_PER_SECOND = 2.0  # Politeness budget shared by all concurrent searches
+IA_CONCURRENCY = 8            # Searches in flight (and pooled connections)
 
 
 @dataclass
@@ -157,9 +168,9 @@ def build_search_query(bph_work: BPHWork) -> str:
     return ' '.join(query_parts)
 
 
-def search_internet_archive(query: str, language: str = "lat", max_results: int = 20) -> List[Dict]:
-    """Search Internet Archive for matching works."""
-    params = {
+def ia_search_params(query: str, language: str = "lat", max_results: int = 20) -> Dict:
+    """advancedsearch.php parameters for a query (also the response cache key)."""
+    return {
         'q': f'{query} AND language:{language}',
         'fl[]': ['identifier', 'title', 'creator', 'date', 'description', 'language'],
         'sort[]': 'downloads desc',
@@ -168,30 +179,26 @@ def search_internet_archive(query: str, language: str = "lat", max_results: int
         'output': 'json'
     }
 
-    try:
+
+def search_internet_archive(query: str, language: str = "lat", max_results: int = 20) -> List[Dict]:
+    """Search Internet Archive for matching works."""
+    params = ia_search_params(query, language, max_results)
+
+    def fetch():
         response = httpx.get(IA_SEARCH_URL, params=params, timeout=30.0)
         response.raise_for_status()
         data = response.json()
         return data.get('response', {}).get('docs', [])
+
+    try:
+        return cached('ia_search', params, fetch, ttl=IA_SEARCH_TTL)
     except Exception as e:
         print(f"  IA search error: {e}")
         return []
 
 
-def search_ia_for_work(bph_work: BPHWork) -> List[IAWork]:
-    """Search Internet Archive for candidates matching a BPH work."""
-    query = build_search_query(bph_work)
-
-    if not query.strip():
-        return []
-
-    # Search with language filter
-    results = search_internet_archive(query, language="lat", max_results=15)
-
-    # If no results, try broader search without language filter
-    if not results:
-        results = search_internet_archive(query, language="*", max_results=10)
-
+def parse_ia_docs(results: List[Dict]) -> List[IAWork]:
+    """Convert advancedsearch docs to IAWork candidates."""
     candidates = []
     for doc in results:
         # Parse creator (can be string or list)
@@ -219,6 +226,108 @@ def search_ia_for_work(bph_work: BPHWork) -> List[IAWork]:
     return candidates
 
 
+def search_ia_for_work(bph_work: BPHWork) -> List[IAWork]:
+    """Search Internet Archive for candidates matching a BPH work."""
+    query = build_search_query(bph_work)
+
+    if not query.strip():
+        return []
+
+    # Search with language filter
+    results = search_internet_archive(query, language="lat", max_results=15)
+
+    # If no results, try broader search without language filter
+    if not results:
+        results = search_internet_archive(query, language="*", max_results=10)
+
+    return parse_ia_docs(results)
+
+
+class IASearchClient:
+    """
+    Async advancedsearch client for searching many works concurrently.
+
+    All requests share one pooled httpx.AsyncClient (HTTP/2 when the h2
+    package is installed, keep-alive HTTP/1.1 otherwise) and one global
+    requests-per-second budget, so concurrency never exceeds IA politeness.
+    Responses go through the same cache as search_internet_archive().
+    """
+
+    def __init__(self, requests_per_second: float = IA_REQUESTS_PER_SECOND,
+                 concurrency: int = IA_CONCURRENCY):
+        self.requests_per_second = requests_per_second
+        self.concurrency = concurrency
+        self.requests = 0
+        self.cache = default_cache()
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self):
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        self.client = httpx.AsyncClient(
+            http2=http2, timeout=30.0,
+            limits=httpx.Limits(max_connections=self.concurrency,
+                                max_keepalive_connections=self.concurrency),
+        )
+        self.limiter = TokenBucket(self.requests_per_second * 60)
+        self.slots = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def search(self, query: str, language: str = "lat", max_results: int = 20) -> List[Dict]:
+        """Async search_internet_archive()."""
+        params = ia_search_params(query, language, max_results)
+        key = self.cache.key('ia_search', params) if self.cache else None
+        if key:
+            docs = self.cache.get(key)
+            if docs is not None:
+                return docs
+
+        # Identical queries already in flight share one request
+        flight = json.dumps(params, sort_keys=True)
+        if flight in self.in_flight:
+            return await asyncio.shield(self.in_flight[flight])
+        self.in_flight[flight] = asyncio.ensure_future(self._fetch(params, key))
+        try:
+            return await asyncio.shield(self.in_flight[flight])
+        finally:
+            self.in_flight.pop(flight, None)
+
+    async def _fetch(self, params: Dict[str, Any], key: Optional[str]) -> List[Dict]:
+        try:
+            async with self.slots:
+                await self.limiter.acquire()
+                self.requests += 1
+                response = await self.client.get(IA_SEARCH_URL, params=params)
+                response.raise_for_status()
+                docs = response.json().get('response', {}).get('docs', [])
+        except Exception as e:
+            print(f"  IA search error: {e}")
+            return []
+
+        if key:
+            self.cache.set(key, docs, 'ia_search', IA_SEARCH_TTL)
+        return docs
+
+    async def search_for_work(self, bph_work: BPHWork) -> List[IAWork]:
+        """Async search_ia_for_work()."""
+        query = build_search_query(bph_work)
+
+        if not query.strip():
+            return []
+
+        results = await self.search(query, language="lat", max_results=15)
+        if not results:
+            results = await self.search(query, language="*", max_results=10)
+
+        return parse_ia_docs(results)
+
+
 def evaluate_candidate(bph_work: BPHWork, ia_work: IAWork) -> Dict[str, Any]:
     """Evaluate how well an IA work matches a BPH work."""
     # Title similarity (fuzzy match)
@@ -277,43 +386,34 @@ def evaluate_candidate(bph_work: BPHWork, ia_work: IAWork) -> Dict[str, Any]:
 class SearchMatcher:
     """Matcher that searches IA for each BPH work."""
 
-    def __init__(self, use_llm: bool = False, llm_mode: str = 'hybrid'):
+    def __init__(self, use_llm: bool = False, llm_mode: str = 'hybrid',
+                 llm_concurrency: int = LLM_CONCURRENCY,
+                 llm_requests_per_minute: float = LLM_REQUESTS_PER_MINUTE):
         self.use_llm = use_llm
         self.llm_mode = llm_mode
-        self.anthropic = Anthropic() if use_llm else None
+        self.adjudicator = AdjudicationQueue(
+            CLAUDE_MODEL, concurrency=llm_concurrency,
+            requests_per_minute=llm_requests_per_minute, cache=default_cache(),
+        ) if use_llm else None
         self.bph_works: List[BPHWork] = []
         self.results: List[MatchResult] = []
 
     def load_bph_works(self, year_min: int = 1400, year_max: int = 1700, limit: Optional[int] = None):
-        """Load BPH Latin works from Supabase."""
-        client = get_supabase_client()
+        """Load BPH Latin works from the local snapshot (refreshed from Supabase)."""
         print(f"Loading BPH Latin works ({year_min}-{year_max})...")
 
-        all_works = []
-        offset = 0
-        batch_size = 1000
-
-        while True:
-            query = client.table('bph_works').select(
-                'id, title, author, year, publisher, place, ubn'
-            ).eq('detected_language', 'Latin')
-
-            if year_min:
-                query = query.gte('year', year_min)
-            if year_max:
-                query = query.lte('year', year_max)
-
-            result = query.order('id').range(offset, offset + batch_size - 1).execute()
-
-            if not result.data:
-                break
-
-            all_works.extend(result.data)
-            offset += batch_size
+        filters = [('detected_language', '==', 'Latin')]
+        if year_min:
+            filters.append(('year', '>=', year_min))
+        if year_max:
+            filters.append(('year', '<=', year_max))
 
-            if limit and len(all_works) >= limit:
-                all_works = all_works[:limit]
-                break
+        all_works = load_table(
+            'bph_works', ['id', 'title', 'author', 'year', 'publisher', 'place', 'ubn'],
+            filters=filters, client_factory=get_supabase_client,
+        )
+        if limit:
+            all_works = all_works[:limit]
 
         self.bph_works = [
             BPHWork(
@@ -326,9 +426,9 @@ class SearchMatcher:
         ]
         print(f"  Loaded {len(self.bph_works)} BPH works")
 
-    def llm_evaluate(self, bph_work: BPHWork, ia_work: IAWork, eval_result: Dict) -> MatchResult:
-        """Use Claude to evaluate an ambiguous match."""
-        prompt = f"""You are an expert bibliographer evaluating whether two catalog records refer to the same book.
+    def llm_prompt(self, bph_work: BPHWork, ia_work: IAWork, eval_result: Dict) -> str:
+        """Prompt asking Claude to adjudicate an ambiguous match."""
+        return f"""You are an expert bibliographer evaluating whether two catalog records refer to the same book.
 
 ## BPH Catalog Record (Bibliotheca Philosophica Hermetica)
 - Title: {bph_work.title}
@@ -363,56 +463,61 @@ Respond in this exact JSON format:
     "reasoning": "Brief explanation"
 }}"""
 
-        try:
-            response = self.anthropic.messages.create(
-                model=CLAUDE_MODEL,
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            content = response.content[0].text
-            # Extract JSON from response
-            json_match = re.search(r'\{[^{}]*\}', content, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                result = {"verdict": "DIFFERENT", "confidence": "low", "reasoning": "Could not parse response"}
-
-            is_match = result['verdict'] in ['SAME_EDITION', 'SAME_WORK']
-            match_type = result['verdict'].lower()
-
-            return MatchResult(
-                bph_work=bph_work,
-                ia_work=ia_work if is_match else None,
-                is_match=is_match,
-                confidence=result['confidence'],
-                match_type=match_type,
-                reasoning=result['reasoning'],
-                title_similarity=eval_result['title_similarity'],
-                author_match=eval_result['author_match'],
-                year_match=eval_result['year_match'],
-                method='llm'
-            )
-        except Exception as e:
-            print(f"  LLM evaluation failed: {e}")
+    def llm_result(self, bph_work: BPHWork, ia_work: IAWork, eval_result: Dict,
+                   verdict: Dict[str, Any]) -> MatchResult:
+        """Turn an adjudication verdict (or error) into a MatchResult."""
+        if 'error' in verdict:
             return MatchResult(
                 bph_work=bph_work,
                 ia_work=None,
                 is_match=False,
                 confidence='low',
                 match_type='error',
-                reasoning=f"LLM error: {str(e)}",
+                reasoning=f"LLM error: {verdict['error']}",
                 title_similarity=eval_result['title_similarity'],
                 author_match=eval_result['author_match'],
                 year_match=eval_result['year_match'],
                 method='llm_error'
             )
 
-    def match_work(self, bph_work: BPHWork) -> MatchResult:
-        """Find the best match for a BPH work by searching IA."""
-        # Search Internet Archive
-        candidates = search_ia_for_work(bph_work)
+        is_match = verdict['verdict'] in ['SAME_EDITION', 'SAME_WORK']
+        return MatchResult(
+            bph_work=bph_work,
+            ia_work=ia_work if is_match else None,
+            is_match=is_match,
+            confidence=verdict['confidence'],
+            match_type=verdict['verdict'].lower(),
+            reasoning=verdict['reasoning'],
+            title_similarity=eval_result['title_similarity'],
+            author_match=eval_result['author_match'],
+            year_match=eval_result['year_match'],
+            method='llm'
+        )
+
+    def llm_evaluate_batch(self, cases: List[tuple]) -> List[MatchResult]:
+        """Adjudicate many (bph_work, ia_work, eval_result) cases concurrently."""
+        verdicts = self.adjudicator.run([self.llm_prompt(*case) for case in cases])
+        return [self.llm_result(*case, verdict) for case, verdict in zip(cases, verdicts)]
+
+    def llm_evaluate(self, bph_work: BPHWork, ia_work: IAWork, eval_result: Dict) -> MatchResult:
+        """Use Claude to evaluate an ambiguous match."""
+        return self.llm_evaluate_batch([(bph_work, ia_work, eval_result)])[0]
+
+    def match_work(self, bph_work: BPHWork, deferred: Optional[List[tuple]] = None) -> Optional[MatchResult]:
+        """
+        Find the best match for a BPH work by searching IA.
 
+        Args:
+            bph_work: Work to match
+            deferred: If given, a case needing the LLM is appended here as
+                      (bph_work, ia_work, eval_result) and None returned, so the
+                      caller can adjudicate in bulk
+        """
+        return self.match_candidates(bph_work, search_ia_for_work(bph_work), deferred)
+
+    def match_candidates(self, bph_work: BPHWork, candidates: List[IAWork],
+                         deferred: Optional[List[tuple]] = None) -> Optional[MatchResult]:
+        """Pick the best of a work's IA search candidates (see match_work)."""
         if not candidates:
             return MatchResult(
                 bph_work=bph_work,
@@ -463,7 +568,7 @@ Respond in this exact JSON format:
         # Medium confidence - accept with lower confidence or use LLM
         if best_eval['confidence'] == 'medium':
             if self.use_llm and self.llm_mode == 'full':
-                return self.llm_evaluate(bph_work, best_ia, best_eval)
+                return self._adjudicate(bph_work, best_ia, best_eval, deferred)
 
             return MatchResult(
                 bph_work=bph_work,
@@ -480,7 +585,7 @@ Respond in this exact JSON format:
 
         # Low confidence - use LLM if available
         if best_eval['confidence'] == 'low' and self.use_llm:
-            return self.llm_evaluate(bph_work, best_ia, best_eval)
+            return self._adjudicate(bph_work, best_ia, best_eval, deferred)
 
         # No match
         return MatchResult(
@@ -496,46 +601,98 @@ Respond in this exact JSON format:
             method='search'
         )
 
-    def run_matching(self, delay: float = 0.5, save_callback=None, save_interval: int = 100) -> List[MatchResult]:
+    def _adjudicate(self, bph_work: BPHWork, ia_work: IAWork, eval_result: Dict,
+                    deferred: Optional[List[tuple]]) -> Optional[MatchResult]:
+        if deferred is None:
+            return self.llm_evaluate(bph_work, ia_work, eval_result)
+        deferred.append((bph_work, ia_work, eval_result))
+        return None
+
+    def run_matching(self, delay: float = 0.5, save_callback=None, save_interval: int = 100,
+                     concurrency: int = IA_CONCURRENCY) -> List[MatchResult]:
         """Run matching on all BPH works.
 
+        IA searches for upcoming works run concurrently while earlier works
+        are evaluated, adjudicated and saved in order.
+
         Args:
-            delay: Seconds between IA searches
+            delay: Minimum seconds between IA requests, across all searches
             save_callback: Optional function to call for incremental saves
             save_interval: How often to call save_callback (every N works)
+            concurrency: IA searches in flight
         """
         print("\n" + "=" * 70)
         print("RUNNING SEARCH-BASED MATCHING")
         print(f"Mode: {self.llm_mode}, LLM enabled: {self.use_llm}")
+        requests_per_second = 1.0 / delay if delay > 0 else 1000.0
+        print(f"IA searches: {concurrency} concurrent, at most {requests_per_second:g} requests/s")
         if save_callback:
             print(f"Saving to Supabase every {save_interval} works")
         print("=" * 70)
 
+        return asyncio.run(self._run_matching(requests_per_second, concurrency, save_callback, save_interval))
+
+    async def _run_matching(self, requests_per_second: float, concurrency: int,
+                            save_callback, save_interval: int) -> List[MatchResult]:
         results = []
         llm_calls = 0
         last_save_idx = 0
-
-        for i, bph_work in enumerate(self.bph_works):
-            result = self.match_work(bph_work)
-            results.append(result)
-
-            if result.method == 'llm':
-                llm_calls += 1
-
-            # Progress
-            if (i + 1) % 10 == 0:
-                matched = sum(1 for r in results if r.is_match)
-                print(f"  {i+1}/{len(self.bph_works)} - Matched: {matched} ({100*matched/(i+1):.1f}%), LLM calls: {llm_calls}")
-
-            # Incremental save
-            if save_callback and (i + 1) % save_interval == 0:
-                batch = results[last_save_idx:]
-                print(f"  Saving batch {last_save_idx+1}-{i+1} to Supabase...")
-                save_callback(batch)
-                last_save_idx = i + 1
-
-            # Rate limiting for IA API
-            time.sleep(delay)
+        started = time.time()
+
+        # LLM cases wait here and are adjudicated together every save_interval works
+        deferred: List[tuple] = []
+        pending: List[int] = []
+
+        async def flush_llm():
+            nonlocal llm_calls
+            if not deferred:
+                return
+            print(f"  Sending {len(deferred)} ambiguous candidates to {CLAUDE_MODEL}...")
+            verdicts = await self.adjudicator.arun([self.llm_prompt(*case) for case in deferred])
+            for slot, case, verdict in zip(pending, deferred, verdicts):
+                results[slot] = self.llm_result(*case, verdict)
+            llm_calls += len(deferred)
+            deferred.clear()
+            pending.clear()
+
+        async with IASearchClient(requests_per_second, concurrency) as ia:
+            # Searches are started a few windows ahead and consumed in order
+            lookahead = max(concurrency * 4, save_interval)
+            searches = deque()
+            upcoming = iter(self.bph_works)
+
+            for i, bph_work in enumerate(self.bph_works):
+                while len(searches) < lookahead:
+                    next_work = next(upcoming, None)
+                    if next_work is None:
+                        break
+                    searches.append(asyncio.create_task(ia.search_for_work(next_work)))
+
+                candidates = await searches.popleft()
+                result = self.match_candidates(bph_work, candidates, deferred)
+                if result is None:
+                    pending.append(len(results))
+                results.append(result)
+
+                if (i + 1) % save_interval == 0:
+                    await flush_llm()
+
+                # Progress
+                if (i + 1) % 10 == 0:
+                    matched = sum(1 for r in results if r is not None and r.is_match)
+                    rate = (i + 1) / max(time.time() - started, 1e-9)
+                    print(f"  {i+1}/{len(self.bph_works)} - Matched: {matched} ({100*matched/(i+1):.1f}%), "
+                          f"LLM calls: {llm_calls} (+{len(deferred)} queued), "
+                          f"{rate:.1f} works/s, {ia.requests} IA requests")
+
+                # Incremental save (searches keep running meanwhile)
+                if save_callback and (i + 1) % save_interval == 0:
+                    batch = results[last_save_idx:]
+                    print(f"  Saving batch {last_save_idx+1}-{i+1} to Supabase...")
+                    await asyncio.to_thread(save_callback, batch)
+                    last_save_idx = i + 1
+
+            await flush_llm()
 
         # Save any remaining results
         if save_callback and last_save_idx < len(results):
@@ -703,13 +860,20 @@ def main():
     parser.add_argument('--year-min', type=int, default=1400)
     parser.add_argument('--year-max', type=int, default=1700)
     parser.add_argument('--sample', type=int, default=None, help='Sample size for BPH works')
-    parser.add_argument('--delay', type=float, default=0.5, help='Delay between IA searches (seconds)')
+    parser.add_argument('--delay', type=float, default=0.5,
+                        help='Minimum seconds between IA requests, shared by all concurrent searches')
+    parser.add_argument('--concurrency', type=int, default=IA_CONCURRENCY,
+                        help='IA searches in flight (default: %(default)s)')
     parser.add_argument('--save-to-supabase', action='store_true',
                         help='Save matches to Supabase bph_works table')
     parser.add_argument('--min-confidence', choices=['high', 'medium', 'low'], default='high',
                         help='Minimum confidence level to save to Supabase')
     parser.add_argument('--save-interval', type=int, default=100,
-                        help='Save to Supabase every N works (default: 100)')
+                        help='Save to Supabase (and adjudicate queued LLM cases) every N works (default: 100)')
+    parser.add_argument('--llm-concurrency', type=int, default=LLM_CONCURRENCY,
+                        help='Maximum concurrent Claude requests')
+    parser.add_argument('--llm-rpm', type=float, default=LLM_REQUESTS_PER_MINUTE,
+                        help='Claude requests per minute limit')
     args = parser.parse_args()
 
     print("=" * 70)
@@ -725,7 +889,9 @@ def main():
     use_llm = args.mode != 'fast'
     llm_mode = args.mode if args.mode != 'fast' else 'hybrid'
 
-    matcher = SearchMatcher(use_llm=use_llm, llm_mode=llm_mode)
+    matcher = SearchMatcher(use_llm=use_llm, llm_mode=llm_mode,
+                            llm_concurrency=args.llm_concurrency,
+                            llm_requests_per_minute=args.llm_rpm)
     matcher.load_bph_works(args.year_min, args.year_max, args.sample)
 
     # Create save callback if saving to Supabase
@@ -736,6 +902,7 @@ def main():
 
     results = matcher.run_matching(
         delay=args.delay,
+        concurrency=args.concurrency,
         save_callback=save_callback,
         save_interval=args.save_interval
     )
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Candidate-generation index for title matching.
+
+Every record gets an integer row ID. Word and surname postings are sorted
+arrays of row IDs, prefix lookups use a sorted array of normalized titles
+(binary search instead of a full scan), and identifiers map back to rows.
+Matching strategies ask the index for a small candidate set and only score
+those rows, instead of walking every title for every query.
+
+Usage:
+    index = CandidateIndex(ia_works, normalize=normalize_title,
+                           keywords=extract_significant_words)
+    rows = index.prefix_rows("de occulta philosophia", limit=5)
+    counts = index.word_candidates({"occulta", "philosophia"})
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import nsmallest
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+def default_surnames(name: str) -> List[str]:
+    """Capitalized words of an author string, lowercased."""
+    if not name:
+        return []
+    return [s.lower() for s in re.findall(r'\b([A-Z][a-z]+)\b', name)]
+
+
+class CandidateIndex:
+    """
+    Inverted index over a list of work dicts.
+
+    Row IDs are positions in ``works``; all lookups return row IDs in
+    ascending order so results are stable and match the input order.
+    """
+
+    def __init__(self, works: list,
+                 normalize: Callable[[str], str],
+                 keywords: Callable[[str], Set[str]],
+                 surnames: Callable[[str], List[str]] = default_surnames,
+                 title_key: str = 'title',
+                 author_key: str = 'creator',
+                 id_key: str = 'identifier'):
+        self.works = works
+        self.id_key = id_key
+
+        # Per-row normalized titles (may be empty)
+        self.norm_titles: List[str] = []
+        self.row_by_id: Dict[str, int] = {}
+
+        word_postings = defaultdict(set)
+        author_postings = defaultdict(set)
+
+        for row, work in enumerate(works):
+            title = work.get(title_key) or ''
+            self.norm_titles.append(normalize(title))
+
+            identifier = work.get(id_key)
+            if identifier is not None and identifier not in self.row_by_id:
+                self.row_by_id[identifier] = row
+
+            for word in keywords(title):
+                word_postings[word].add(row)
+
+            for surname in surnames(work.get(author_key) or ''):
+                author_postings[surname].add(row)
+
+        # Freeze postings into compact sorted int arrays
+        self.word_postings: Dict[str, array] = {
+            w: array('I', sorted(rows)) for w, rows in word_postings.items()
+        }
+        self.author_postings: Dict[str, array] = {
+            s: array('I', sorted(rows)) for s, rows in author_postings.items()
+        }
+
+        # Sorted array of (title, row) for prefix range lookups
+        titled = sorted(
+            (t, row) for row, t in enumerate(self.norm_titles) if t
+        )
+        self._sorted_titles = [t for t, _ in titled]
+        self._sorted_rows = array('I', (row for _, row in titled))
+
+        # Optional MinHash LSH index over norm_titles (see attach_lsh)
+        self.lsh = None
+
+    def __len__(self) -> int:
+        return len(self.works)
+
+    @property
+    def title_count(self) -> int:
+        """Number of rows with a non-empty normalized title."""
+        return len(self._sorted_titles)
+
+    def work(self, row: int) -> dict:
+        return self.works[row]
+
+    def row_for(self, identifier: str) -> Optional[int]:
+        return self.row_by_id.get(identifier)
+
+    def prefix_rows(self, prefix: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Rows whose normalized title starts with ``prefix``.
+
+        Args:
+            prefix: Normalized title prefix
+            limit: Return only the ``limit`` lowest row IDs
+
+        Returns:
+            Sorted list of row IDs
+        """
+        lo = bisect_left(self._sorted_titles, prefix)
+        # Every string with this prefix sorts before prefix + U+10FFFF
+        hi = bisect_left(self._sorted_titles, prefix + '\U0010ffff', lo)
+        rows = self._sorted_rows[lo:hi]
+        if limit is not None and len(rows) > limit:
+            return nsmallest(limit, rows)
+        return sorted(rows)
+
+    def word_candidates(self, words: Iterable[str]) -> Dict[int, int]:
+        """
+        Count shared words per row.
+
+        Args:
+            words: Significant words of the query title
+
+        Returns:
+            Dict of row ID -> number of query words found in that row
+        """
+        counts = defaultdict(int)
+        for word in words:
+            for row in self.word_postings.get(word, ()):
+                counts[row] += 1
+        return counts
+
+    def author_rows(self, surname: str) -> array:
+        """Rows whose author contains ``surname`` (lowercased)."""
+        return self.author_postings.get(surname, array('I'))
+
+    def attach_lsh(self, lsh):
+        """
+        Use a TitleLSHIndex built over ``norm_titles`` (row for row) for
+        near-duplicate title lookups.
+        """
+        if len(lsh) != len(self.works):
+            raise ValueError(f"LSH index has {len(lsh)} rows, expected {len(self.works)}")
+        self.lsh = lsh
+
+    def similar_title_rows(self, norm_titles: List[str]) -> list:
+        """
+        Rows sharing an LSH bucket with each query title, in one batch.
+
+        Returns:
+            One sorted array of row IDs per query (empty without an LSH index)
+        """
+        if self.lsh is None:
+            return [() for _ in norm_titles]
+        return self.lsh.query_batch(norm_titles)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'rows': len(self.works),
+            'titles': self.title_count,
+            'words': len(self.word_postings),
+            'surnames': len(self.author_postings),
+        }
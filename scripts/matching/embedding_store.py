@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Persistent, append-only store of title embeddings.
+
+The old caches saved one .npy per corpus plus its ID list and threw the
+whole file away when a single ID changed. Here every vector is keyed by a
+content hash of (model name, normalized title), so:
+- only titles never seen before are encoded
+- identical titles (reprints, multi-volume sets) are encoded once
+- the same store serves the IA corpus, BPH queries and every script
+
+Layout of a store directory:
+    meta.json     model name, dimension, dtype
+    vectors.bin   row-major matrix, appended to in place (memory-mapped on read)
+    keys.log      one hex key per line; line i describes row i
+
+Vectors are appended before their keys; after a crash the next open cuts
+both files back to the last row that has a key and a complete vector.
+One writer at a time is assumed.
+
+Usage:
+    store = EmbeddingStore(CACHE_DIR / "store", MODEL_NAME)
+    vectors = store.encode(titles, model)   # float32, shape (len(titles), dim)
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+def normalize_title(title: str) -> str:
+    """The exact text that gets embedded: whitespace-collapsed title."""
+    return ' '.join((title or '').split())
+
+
+class EmbeddingStore:
+    """Content-addressed embedding matrix with an append log."""
+
+    def __init__(self, directory: Path, model_name: str, dtype: str = 'float32'):
+        """
+        Args:
+            directory: Store directory (created on first write)
+            model_name: Embedding model; part of every key
+            dtype: On-disk precision, 'float32' or 'float16' (half the size;
+                   vectors are always returned as float32)
+        """
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.meta_path = self.directory / "meta.json"
+        self.vectors_path = self.directory / "vectors.bin"
+        self.keys_path = self.directory / "keys.log"
+
+        self.dim = None
+        self.row_of: Dict[str, int] = {}
+        self.vectors = np.zeros((0, 0), dtype=self.dtype)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def key(self, title: str) -> str:
+        text = f"{self.model_name}\x1f{normalize_title(title)}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    # -- persistence --------------------------------------------------------
+
+    def _load(self):
+        if not self.meta_path.exists():
+            return
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        if meta['model'] != self.model_name or meta['dtype'] != self.dtype.name:
+            raise ValueError(f"Embedding store {self.directory} holds {meta['model']} "
+                             f"({meta['dtype']}), not {self.model_name} ({self.dtype.name})")
+        self.dim = meta['dim']
+
+        keys = []
+        if self.keys_path.exists():
+            with open(self.keys_path) as f:
+                keys = [line.rstrip('\n') for line in f if line.endswith('\n')]
+
+        row_bytes = self.dim * self.dtype.itemsize
+        stored_rows = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+        rows = min(len(keys), stored_rows)
+
+        if rows != len(keys) or rows != stored_rows:
+            # Interrupted append: cut both files back to the last complete row
+            print(f"    Embedding store: discarding torn tail after row {rows}")
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(rows * row_bytes)
+            tmp = self.keys_path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                f.write(''.join(f"{key}\n" for key in keys[:rows]))
+            os.replace(tmp, self.keys_path)
+
+        self.row_of = {key: row for row, key in enumerate(keys[:rows])}
+        self._map(rows)
+
+    def _map(self, rows: int):
+        """Memory-map the first ``rows`` rows of the matrix (no copy)."""
+        if rows:
+            self.vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode='r', shape=(rows, self.dim))
+        else:
+            self.vectors = np.zeros((0, self.dim or 0), dtype=self.dtype)
+
+    def _append(self, keys: List[str], vectors: np.ndarray):
+        """Append rows to the matrix, then their keys to the log."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self.meta_path, 'w') as f:
+                json.dump({'model': self.model_name, 'dim': self.dim, 'dtype': self.dtype.name}, f)
+
+        rows = len(self.row_of)
+        with open(self.vectors_path, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.keys_path, 'a') as f:
+            f.write(''.join(f"{key}\n" for key in keys))
+
+        for i, key in enumerate(keys):
+            self.row_of[key] = rows + i
+        self._map(rows + len(keys))
+
+    # -- lookup -------------------------------------------------------------
+
+    def rows_for(self, titles: Sequence[str]) -> np.ndarray:
+        """Store row of each title (-1 where not stored)."""
+        return np.fromiter((self.row_of.get(self.key(t), -1) for t in titles),
+                           dtype=np.int64, count=len(titles))
+
+    def update(self, titles: Sequence[str], model, batch_size: int = 256,
+               progress_every: int = 10000) -> np.ndarray:
+        """
+        Encode and store the titles not yet in the store.
+
+        Args:
+            titles: Titles (normalized here before hashing and encoding)
+            model: Object with a sentence-transformers style encode()
+            batch_size: Titles per encode() call
+            progress_every: New titles encoded between writes to disk
+
+        Returns:
+            Store row of each title
+        """
+        keys = [self.key(t) for t in titles]
+
+        missing: Dict[str, str] = {}
+        for key, title in zip(keys, titles):
+            if key not in self.row_of and key not in missing:
+                missing[key] = normalize_title(title)
+
+        if missing:
+            print(f"    Encoding {len(missing)} new titles "
+                  f"({len(titles) - len(missing)} from store)...")
+            new_keys = list(missing)
+            texts = [missing[k] for k in new_keys]
+            # Persist every chunk so an interrupted run keeps its work
+            chunk_size = max(batch_size, progress_every)
+            for start in range(0, len(texts), chunk_size):
+                chunk = model.encode(texts[start:start + chunk_size], batch_size=batch_size,
+                                     show_progress_bar=False, convert_to_numpy=True)
+                self._append(new_keys[start:start + chunk_size], np.asarray(chunk))
+                print(f"    Encoded {min(start + chunk_size, len(texts))}/{len(texts)}...")
+
+        return np.fromiter((self.row_of[k] for k in keys), dtype=np.int64, count=len(keys))
+
+    def gather(self, rows: np.ndarray) -> np.ndarray:
+        """Copy the given store rows out as a new, writable float32 array."""
+        if not len(rows):
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self.vectors[rows], dtype=np.float32)
+
+    def fingerprint(self, rows: np.ndarray) -> str:
+        """
+        Identify the exact matrix gather(rows) would return.
+
+        Rows are append-only and content-addressed, so the row list (plus the
+        model) fixes the vectors; derived artifacts such as FAISS indexes are
+        cached under this hash.
+        """
+        digest = hashlib.sha1(f"{self.model_name}\x1f{self.dtype.name}\x1f".encode('utf-8'))
+        digest.update(np.ascontiguousarray(rows, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    def encode(self, titles: Sequence[str], model, batch_size: int = 256,
+               progress_every: int = 10000) -> np.ndarray:
+        """
+        Vectors for ``titles``, encoding only those not yet in the store.
+
+        Args:
+            titles: Titles (normalized here before hashing and encoding)
+            model: Object with a sentence-transformers style encode()
+            batch_size: Titles per encode() call
+            progress_every: New titles encoded between writes to disk
+
+        Returns:
+            New float32 array of shape (len(titles), dim), safe to modify
+        """
+        return self.gather(self.update(titles, model, batch_size, progress_every))
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+FAISS index types for title matching, cached on disk.
+
+All indexes use inner product over L2-normalized vectors (= cosine):
+    flat      exact IndexFlatIP; 4*dim bytes per vector, the recall baseline
+    hnsw      HNSW graph over the full vectors; no training, fastest queries
+    ivf-flat  k-means cells with full vectors; scans IVF_NPROBE cells per query
+    ivf-pq    k-means cells with product-quantized codes; dim/8 bytes per
+              vector, so million-title corpora fit comfortably in RAM
+
+Built indexes are written to INDEX_DIR together with the embedding store
+fingerprint of the corpus and the FAISS factory string; a re-run over the
+same titles just reads the index back instead of rebuilding it.
+
+Usage:
+    rows = store.update(titles, model)
+    index = load_or_build_index(store, rows, 'ia', kind='ivf-pq')
+
+    benchmark(corpus_vectors, query_vectors)   # recall/latency vs flat
+"""
+
+import json
+import math
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import faiss
+
+INDEX_DIR = Path(__file__).parent.parent / "data" / "embedding_cache" / "indexes"
+INDEX_TYPES = ('flat', 'hnsw', 'ivf-flat', 'ivf-pq')
+
+HNSW_M = 32                  # graph neighbours per node
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+IVF_NPROBE = 16              # cells scanned per query
+TRAIN_PER_CELL = 64          # k-means training points per IVF cell
+ADD_CHUNK = 100000
+
+
+def factory_string(kind: str, n: int, dim: int) -> str:
+    """FAISS index_factory description for ``kind`` sized to ``n`` vectors."""
+    if kind == 'flat':
+        return "Flat"
+    if kind == 'hnsw':
+        return f"HNSW{HNSW_M}"
+
+    # ~4*sqrt(n) cells, but at least 39 training points per cell
+    cells = max(1, min(int(4 * math.sqrt(n)), n // 39, 65536))
+    if kind == 'ivf-flat':
+        return f"IVF{cells},Flat"
+    if kind == 'ivf-pq':
+        # 8-dim subvectors; 8-bit codes need 256 centroids worth of points
+        subquantizers = next(m for m in (dim // 8, dim // 4, dim // 2, dim) if m and dim % m == 0)
+        bits = 8 if n >= 256 * 39 else 4
+        return f"IVF{cells},PQ{subquantizers}x{bits}"
+    raise ValueError(f"Unknown index type {kind!r}; expected one of {', '.join(INDEX_TYPES)}")
+
+
+def configure_search(index: faiss.Index, nprobe: int = IVF_NPROBE,
+                     ef_search: int = HNSW_EF_SEARCH) -> faiss.Index:
+    """Apply query-time parameters (they are not all kept by write_index)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    if hasattr(index, 'hnsw'):
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+def build_index(vectors: np.ndarray, kind: str = 'flat', seed: int = 0) -> faiss.Index:
+    """
+    Build an index over L2-normalized float32 vectors.
+
+    Args:
+        vectors: Corpus matrix, already normalized
+        kind: One of INDEX_TYPES
+        seed: Seed for the IVF training sample
+
+    Returns:
+        Populated index, configured for search
+    """
+    n, dim = vectors.shape
+    description = factory_string(kind, n, dim)
+    index = faiss.index_factory(dim, description, faiss.METRIC_INNER_PRODUCT)
+    if hasattr(index, 'hnsw'):
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+
+    if not index.is_trained:
+        ivf = faiss.try_extract_index_ivf(index)
+        sample_size = min(n, ivf.nlist * TRAIN_PER_CELL)
+        sample = vectors[np.random.default_rng(seed).choice(n, sample_size, replace=False)]
+        print(f"  Training {description} on {sample_size} vectors...")
+        index.train(sample)
+
+    for start in range(0, n, ADD_CHUNK):
+        index.add(vectors[start:start + ADD_CHUNK])
+        if n > ADD_CHUNK:
+            print(f"    Indexed {min(start + ADD_CHUNK, n)}/{n}...")
+
+    return configure_search(index)
+
+
+def index_paths(name: str, kind: str, index_dir: Path = INDEX_DIR):
+    return index_dir / f"{name}.{kind}.faiss", index_dir / f"{name}.{kind}.json"
+
+
+def load_or_build_index(store, rows: np.ndarray, name: str, kind: str = 'flat',
+                        index_dir: Path = INDEX_DIR) -> faiss.Index:
+    """
+    Read the cached index for these store rows, or build and save it.
+
+    Args:
+        store: EmbeddingStore holding the corpus vectors
+        rows: Store row of each corpus entry (index position i = rows[i])
+        name: Corpus name used in the file name, e.g. 'ia'
+        kind: One of INDEX_TYPES
+
+    Returns:
+        Index whose ids are positions in ``rows``
+    """
+    index_path, meta_path = index_paths(name, kind, index_dir)
+    fingerprint = store.fingerprint(rows)
+    description = factory_string(kind, len(rows), store.dim or 0)
+
+    if index_path.exists() and meta_path.exists():
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('fingerprint') == fingerprint and meta.get('factory') == description:
+            print(f"Loading {kind} index for {name} from {index_path}...")
+            index = configure_search(faiss.read_index(str(index_path)))
+            print(f"  Loaded index with {index.ntotal} vectors")
+            return index
+        print(f"  Cached {kind} index for {name} is stale, rebuilding...")
+
+    print(f"Building {kind} index ({description}) for {len(rows)} {name} vectors...")
+    start = time.time()
+    vectors = store.gather(rows)
+    faiss.normalize_L2(vectors)
+    index = build_index(vectors, kind)
+    del vectors
+    elapsed = time.time() - start
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_suffix('.tmp')
+    faiss.write_index(index, str(tmp_path))
+    os.replace(tmp_path, index_path)
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'fingerprint': fingerprint,
+            'factory': description,
+            'model': store.model_name,
+            'ntotal': index.ntotal,
+            'build_seconds': round(elapsed, 1),
+            'built_at': datetime.now().isoformat(),
+        }, f, indent=2)
+
+    print(f"  Built index with {index.ntotal} vectors in {elapsed:.1f}s, saved to {index_path}")
+    return index
+
+
+def benchmark(vectors: np.ndarray, queries: np.ndarray, kinds: Sequence[str] = INDEX_TYPES,
+              k: int = 10) -> List[Dict]:
+    """
+    Compare index types against exact search on the same corpus.
+
+    Args:
+        vectors: Corpus matrix (normalized here on a copy)
+        queries: Query matrix (normalized here on a copy)
+        kinds: Index types to measure
+        k: Neighbours per query
+
+    Returns:
+        One dict per index type with build time, query latency, recall and size
+    """
+    vectors = np.array(vectors, dtype=np.float32)
+    queries = np.array(queries, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    faiss.normalize_L2(queries)
+
+    print(f"\nBenchmarking {len(kinds)} index types: {len(vectors)} vectors, "
+          f"{len(queries)} queries, k={k}")
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    results = []
+    for kind in kinds:
+        start = time.time()
+        index = build_index(vectors, kind)
+        build_seconds = time.time() - start
+
+        start = time.time()
+        _, found = index.search(queries, k)
+        query_ms = 1000 * (time.time() - start) / max(len(queries), 1)
+
+        overlap = [len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth)]
+        results.append({
+            'kind': kind,
+            'factory': factory_string(kind, *vectors.shape),
+            'build_seconds': build_seconds,
+            'query_ms': query_ms,
+            'recall_at_1': float(np.mean(found[:, 0] == truth[:, 0])),
+            f'recall_at_{k}': float(np.mean(overlap)) / k,
+            'megabytes': len(faiss.serialize_index(index)) / 1e6,
+        })
+
+    print(f"\n{'Index':<10} {'Factory':<22} {'Build s':>8} {'ms/query':>9} "
+          f"{'R@1':>6} {f'R@{k}':>6} {'MB':>8}")
+    for r in results:
+        print(f"{r['kind']:<10} {r['factory']:<22} {r['build_seconds']:>8.1f} {r['query_ms']:>9.3f} "
+              f"{r['recall_at_1']:>6.3f} {r[f'recall_at_{k}']:>6.3f} {r['megabytes']:>8.1f}")
+    return results
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Batched fuzzy scoring on top of rapidfuzz.process.
+
+Matchers used to call fuzz.ratio / fuzz.token_set_ratio one pair at a time
+in Python loops. These helpers score a block of query strings against a
+block of candidate strings in a single native call, spread over all cores
+(workers=-1), and chunk very large blocks so the score matrix stays small.
+
+Scores are on rapidfuzz's 0-100 scale and returned as float64 so that
+threshold comparisons behave exactly like the per-pair calls they replace.
+Entries below ``score_cutoff`` are returned as 0.
+
+Usage:
+    from fuzzy_scoring import score_block, score_pairs, first_above
+    scores = score_block(bph_titles, ia_titles, scorer=fuzz.ratio)
+"""
+
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Below this many cells a thread pool costs more than it saves
+PARALLEL_MIN_CELLS = 20_000
+
+# Upper bound on cells per cdist call (~80 MB of float64)
+MAX_BLOCK_CELLS = 10_000_000
+
+
+def _workers(cells: int, workers: int) -> int:
+    return workers if cells >= PARALLEL_MIN_CELLS else 1
+
+
+def score_block(queries: Sequence[str], choices: Sequence[str],
+                scorer: Callable = fuzz.ratio,
+                score_cutoff: Optional[float] = None,
+                workers: int = -1) -> np.ndarray:
+    """
+    Score every query against every choice.
+
+    Args:
+        queries: Query strings (already normalized)
+        choices: Candidate strings (already normalized)
+        scorer: rapidfuzz scorer, e.g. fuzz.ratio or fuzz.token_set_ratio
+        score_cutoff: Scores below this are returned as 0
+        workers: Threads for rapidfuzz (-1 = all cores)
+
+    Returns:
+        float64 array of shape (len(queries), len(choices))
+    """
+    if not len(queries) or not len(choices):
+        return np.zeros((len(queries), len(choices)), dtype=np.float64)
+
+    return process.cdist(
+        queries, choices,
+        scorer=scorer,
+        score_cutoff=score_cutoff,
+        dtype=np.float64,
+        workers=_workers(len(queries) * len(choices), workers),
+    )
+
+
+def score_one(query: str, choices: Sequence[str],
+              scorer: Callable = fuzz.ratio,
+              score_cutoff: Optional[float] = None,
+              workers: int = -1) -> np.ndarray:
+    """Score a single query against a block of choices (1-D result)."""
+    return score_block([query], choices, scorer, score_cutoff, workers)[0]
+
+
+def row_chunks(n_rows: int, n_cols: int,
+               max_cells: int = MAX_BLOCK_CELLS) -> Iterator[slice]:
+    """Slices over ``n_rows`` so each (rows x n_cols) block has at most ``max_cells``."""
+    rows_per_block = max(1, max_cells // max(1, n_cols))
+    for start in range(0, n_rows, rows_per_block):
+        yield slice(start, min(start + rows_per_block, n_rows))
+
+
+def iter_score_blocks(queries: Sequence[str], choices: Sequence[str],
+                      scorer: Callable = fuzz.ratio,
+                      score_cutoff: Optional[float] = None,
+                      workers: int = -1,
+                      max_cells: int = MAX_BLOCK_CELLS) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Score queries against choices in row chunks of at most ``max_cells``.
+
+    Yields:
+        (start_row, scores) where scores covers queries[start_row:start_row + len(scores)]
+    """
+    for rows in row_chunks(len(queries), len(choices), max_cells):
+        yield rows.start, score_block(queries[rows], choices, scorer, score_cutoff, workers)
+
+
+def score_pairs(left: Sequence[str], right: Sequence[str],
+                scorer: Callable = fuzz.ratio,
+                workers: int = -1) -> np.ndarray:
+    """
+    Score left[i] against right[i] for every i.
+
+    Uses process.cpdist where available (rapidfuzz >= 3.6) and falls back
+    to a plain loop on older versions.
+
+    Returns:
+        float64 array of shape (len(left),)
+    """
+    if len(left) != len(right):
+        raise ValueError("score_pairs needs sequences of equal length")
+    if not len(left):
+        return np.zeros(0, dtype=np.float64)
+
+    if hasattr(process, 'cpdist'):
+        return process.cpdist(
+            left, right,
+            scorer=scorer,
+            dtype=np.float64,
+            workers=_workers(len(left), workers),
+        )
+    return np.fromiter((scorer(a, b) for a, b in zip(left, right)),
+                       dtype=np.float64, count=len(left))
+
+
+def first_above(queries: Sequence[str], choices: Sequence[str], threshold: float,
+                scorer: Callable = fuzz.ratio,
+                workers: int = -1) -> List[Tuple[int, float]]:
+    """
+    For each query, the first choice (in choice order) scoring >= threshold.
+
+    Returns:
+        List of (choice_index, score) per query; (-1, 0.0) when none qualifies
+    """
+    results: List[Tuple[int, float]] = []
+    for _, scores in iter_score_blocks(queries, choices, scorer,
+                                       score_cutoff=threshold, workers=workers):
+        hits = scores >= threshold
+        has_hit = hits.any(axis=1)
+        first = hits.argmax(axis=1)
+        for i in range(len(scores)):
+            if has_hit[i]:
+                results.append((int(first[i]), float(scores[i, first[i]])))
+            else:
+                results.append((-1, 0.0))
+    return results
+
+
+def best_above(scores: np.ndarray, threshold: float) -> Tuple[int, float]:
+    """
+    Index and value of the first maximum in a 1-D score row, if >= threshold.
+
+    Mirrors the ``if score > best and score >= threshold`` loops it replaces:
+    ties go to the earliest candidate.
+
+    Returns:
+        (index, score), or (-1, 0.0) when nothing reaches the threshold
+    """
+    if not len(scores):
+        return -1, 0.0
+    idx = int(np.argmax(scores))
+    best = float(scores[idx])
+    if best >= threshold and best > 0:
+        return idx, best
+    return -1, 0.0
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited LLM adjudication of match candidates.
+
+The matchers used to call messages.create() one candidate at a time, so an
+LLM-heavy run spent nearly all its time waiting on the API. AdjudicationQueue
+takes a list of prompts and sends them from an asyncio event loop:
+- at most ``concurrency`` requests in flight
+- token buckets keep requests/minute and (estimated) input tokens/minute
+  under the account limits
+- 429, 5xx and connection errors are retried with exponential backoff,
+  honouring the API's retry-after header; a 429 pauses the whole queue
+- verdicts come back in the order the prompts were given
+- with a response cache, prompts already judged by the same model are not
+  sent again
+
+For tests, run the stub server and point the SDK at it:
+    python llm_queue.py --stub --port 8765 --error-rate 0.1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub \\
+        python bph_ia_agent_match.py --mode full --sample 500
+
+Usage:
+    queue = AdjudicationQueue(CLAUDE_MODEL)
+    verdicts = queue.run(prompts)   # [{'verdict', 'confidence', 'reasoning'} | {'error'}]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+# Defaults sized for a mid-tier Anthropic account; override per run
+LLM_CONCURRENCY = 16
+LLM_REQUESTS_PER_MINUTE = 1000
+LLM_INPUT_TOKENS_PER_MINUTE = 400000
+LLM_MAX_TOKENS = 500
+
+RETRY_ATTEMPTS = 6
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+UNPARSED_VERDICT = {"verdict": "DIFFERENT", "confidence": "low", "reasoning": "Could not parse response"}
+
+
+def parse_verdict(text: str) -> Dict:
+    """Extract the JSON verdict object from a model response."""
+    json_match = re.search(r'\{[^{}]*\}', text, re.DOTALL)
+    if not json_match:
+        return dict(UNPARSED_VERDICT)
+    try:
+        result = json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return dict(UNPARSED_VERDICT)
+    if not all(field in result for field in UNPARSED_VERDICT):
+        return dict(UNPARSED_VERDICT)
+    return result
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``rate`` per second."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 1.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for ``seconds`` (after a 429)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        # Waiters queue on the lock, so tokens are granted first come, first served
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = max(self.paused_until - now, (amount - self.level) / self.rate)
+                if wait <= 0:
+                    self.level -= amount
+                    return
+                await asyncio.sleep(wait)
+
+
+class AdjudicationQueue:
+    """Send many single-turn prompts concurrently within API rate limits."""
+
+    def __init__(self, model: str, max_tokens: int = LLM_MAX_TOKENS,
+                 concurrency: int = LLM_CONCURRENCY,
+                 requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 input_tokens_per_minute: Optional[float] = LLM_INPUT_TOKENS_PER_MINUTE,
+                 attempts: int = RETRY_ATTEMPTS, base_url: Optional[str] = None,
+                 cache=None, progress_every: int = 100):
+        """
+        Args:
+            model: Claude model name
+            max_tokens: Response budget per request
+            concurrency: Maximum requests in flight
+            requests_per_minute: Request rate limit
+            input_tokens_per_minute: Input token rate limit (None to disable)
+            attempts: Tries per prompt before giving up
+            base_url: API endpoint (defaults to ANTHROPIC_BASE_URL or the real API)
+            cache: Optional response_cache.ResponseCache; verdicts are stored
+                   under (model, prompt, max_tokens) and reused on later runs
+                   (failed calls and unparseable replies are not stored)
+            progress_every: Print progress every N completed prompts
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.input_tokens_per_minute = input_tokens_per_minute
+        self.attempts = attempts
+        self.base_url = base_url
+        self.cache = cache
+        self.progress_every = progress_every
+
+        self.calls = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.failures = 0
+
+    def run(self, prompts: Sequence[str]) -> List[Dict]:
+        """
+        Adjudicate all prompts.
+
+        Returns:
+            One dict per prompt, in order: the parsed verdict, or {'error': message}
+        """
+        return asyncio.run(self.arun(prompts))
+
+    async def arun(self, prompts: Sequence[str]) -> List[Dict]:
+        """run() for callers already inside an event loop."""
+        if not prompts:
+            return []
+        return await self._run(list(prompts))
+
+    async def _run(self, prompts: List[str]) -> List[Dict]:
+        from anthropic import AsyncAnthropic
+
+        self.calls = self.cache_hits = self.retries = self.failures = 0
+        self._started = time.time()
+
+        verdicts: List[Optional[Dict]] = [None] * len(prompts)
+        keys: List[Optional[str]] = [None] * len(prompts)
+        if self.cache is not None:
+            for i, prompt in enumerate(prompts):
+                keys[i] = self.cache.key('llm_verdict', {'prompt': prompt, 'max_tokens': self.max_tokens}, self.model)
+                verdicts[i] = self.cache.get(keys[i])
+            self.cache_hits = sum(v is not None for v in verdicts)
+
+        todo = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if todo:
+            self._requests = TokenBucket(self.requests_per_minute)
+            self._tokens = TokenBucket(self.input_tokens_per_minute) if self.input_tokens_per_minute else None
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._done = 0
+            self._total = len(todo)
+
+            # Retries are handled here so a 429 can throttle every worker at once
+            async with AsyncAnthropic(base_url=self.base_url, max_retries=0) as client:
+                fresh = await asyncio.gather(*(self._adjudicate(client, prompts[i]) for i in todo))
+
+            for i, verdict in zip(todo, fresh):
+                verdicts[i] = verdict
+                # A malformed or truncated reply is asked again next run, not cached
+                if keys[i] is not None and 'error' not in verdict and verdict != UNPARSED_VERDICT:
+                    self.cache.set(keys[i], verdict, 'llm_verdict')
+
+        elapsed = time.time() - self._started
+        print(f"    Adjudicated {len(prompts)} candidates in {elapsed:.1f}s "
+              f"({len(prompts) / max(elapsed, 1e-9):.1f}/s, {self.cache_hits} cached, "
+              f"{self.retries} retries, {self.failures} failed)")
+        return verdicts
+
+    async def _adjudicate(self, client, prompt: str) -> Dict:
+        async with self._slots:
+            try:
+                verdict = await self._call(client, prompt)
+            except Exception as e:
+                self.failures += 1
+                print(f"  LLM evaluation failed: {e}")
+                verdict = {'error': str(e)}
+
+        self._done += 1
+        if self._done % self.progress_every == 0 and self._done < self._total:
+            rate = self._done / max(time.time() - self._started, 1e-9)
+            print(f"    LLM {self._done}/{self._total} ({rate:.1f}/s)")
+        return verdict
+
+    async def _call(self, client, prompt: str) -> Dict:
+        import anthropic
+
+        for attempt in range(1, self.attempts + 1):
+            await self._requests.acquire()
+            if self._tokens:
+                await self._tokens.acquire(estimate_tokens(prompt))
+            try:
+                self.calls += 1
+                response = await client.messages.create(
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                return parse_verdict(response.content[0].text)
+            except anthropic.APIStatusError as e:
+                if e.status_code not in RETRY_STATUS or attempt == self.attempts:
+                    raise
+                delay = self._backoff(attempt, e.response.headers.get('retry-after'))
+                if e.status_code == 429:
+                    self._requests.pause(delay)
+            except anthropic.APIConnectionError:
+                if attempt == self.attempts:
+                    raise
+                delay = self._backoff(attempt)
+
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Server-requested delay if given, else jittered exponential backoff."""
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+        delay = min(RETRY_BASE_DELAY * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+        return delay * random.uniform(0.5, 1.0)
+
+
+# -- stub server --------------------------------------------------------------
+
+def stub_handler(latency: float, error_rate: float, verdict: str):
+    """Request handler imitating POST /v1/messages."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('content-length', 0))) or b'{}')
+            time.sleep(latency)
+
+            roll = random.random()
+            if roll < error_rate / 2:
+                return self._send(429, {"type": "error", "error": {"type": "rate_limit_error", "message": "stub"}},
+                                  {'retry-after': '1'})
+            if roll < error_rate:
+                return self._send(529, {"type": "error", "error": {"type": "overloaded_error", "message": "stub"}})
+
+            text = json.dumps({"verdict": verdict, "confidence": "medium", "reasoning": "Stub verdict"})
+            prompt = ''.join(m.get('content', '') for m in body.get('messages', []) if isinstance(m.get('content'), str))
+            self._send(200, {
+                "id": "msg_stub", "type": "message", "role": "assistant",
+                "model": body.get('model', 'stub'),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn", "stop_sequence": None,
+                "usage": {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)},
+            })
+
+        def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('content-type', 'application/json')
+            self.send_header('content-length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(port: int = 0, latency: float = 0.5, error_rate: float = 0.0,
+                      verdict: str = "SAME_WORK") -> ThreadingHTTPServer:
+    """
+    Serve canned verdicts on 127.0.0.1 in a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one; see server.server_address)
+        latency: Seconds each response takes, like a real model call
+        error_rate: Fraction of requests answered with 429 or 529
+        verdict: Verdict every successful response returns
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), stub_handler(latency, error_rate, verdict))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub Anthropic Messages API for adjudication tests')
+    parser.add_argument('--stub', action='store_true', required=True, help='Run the stub server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 429/529 responses')
+    parser.add_argument('--verdict', choices=['SAME_EDITION', 'SAME_WORK', 'DIFFERENT'], default='SAME_WORK')
+    args = parser.parse_args()
+
+    server = start_stub_server(args.port, args.latency, args.error_rate, args.verdict)
+    print(f"Stub Messages API on http://127.0.0.1:{server.server_address[1]} "
+          f"(latency {args.latency}s, error rate {args.error_rate})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
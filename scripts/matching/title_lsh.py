@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+MinHash LSH index for near-duplicate title lookup.
+
+Prefix blocking misses titles that differ only in their first word
+("Opera omnia Ficini" vs "Opuscula omnia Ficini"). Here each normalized
+title becomes a set of word shingles, hashed into a MinHash signature of
+``bands * rows`` values; titles that agree on every row of any band land in
+the same bucket. Two titles with word-set Jaccard similarity s share a
+bucket with probability 1 - (1 - s**rows) ** bands.
+
+The index is shared by the matchers and the deduplicator:
+- query_batch(titles): candidate rows for many query titles at once
+- buckets(): groups of rows sharing a band, for blocking within one corpus
+- band_keys(titles): per-band string keys, e.g. for Splink block_on columns
+- save()/load()/load_or_build(): persisted as a single .npz file
+
+Titles are expected to be normalized already (lowercase, no punctuation).
+
+Usage:
+    lsh = TitleLSHIndex.load_or_build(cache_path, ids, norm_titles, bands=16, rows=4)
+    candidates = lsh.query_batch([normalize_title(t) for t in bph_titles])
+"""
+
+import hashlib
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Mersenne prime for the permutation hashes
+_PRIME = np.uint64((1 << 61) - 1)
+
+# Multiplier used to fold a band's rows into one 64-bit key
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+# Titles per chunk when computing signatures (bounds temporary memory)
+_SIGNATURE_CHUNK = 20_000
+
+
+def word_shingles(title: str, size: int = 1) -> set:
+    """Set of word n-grams of a normalized title."""
+    words = title.split()
+    if size <= 1:
+        return set(words)
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class TitleLSHIndex:
+    """MinHash signatures plus per-band sorted hash tables."""
+
+    def __init__(self, bands: int = 16, rows: int = 4, shingle_size: int = 1,
+                 seed: int = 42, max_bucket_size: Optional[int] = 500):
+        """
+        Args:
+            bands: Number of LSH bands (more bands = higher recall)
+            rows: Signature rows per band (more rows = stricter buckets)
+            shingle_size: Words per shingle (1 = word set)
+            seed: Seed for the permutation coefficients
+            max_bucket_size: Buckets larger than this are ignored by queries
+                             (they behave like stopwords); None = no limit
+        """
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.max_bucket_size = max_bucket_size
+
+        rng = np.random.RandomState(seed)
+        num_perm = bands * rows
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        self.ids: List[str] = []
+        self.fingerprint = ''
+        self.band_hashes = np.zeros((0, bands), dtype=np.uint64)
+        self._order = np.zeros((0, bands), dtype=np.int64)
+        self._sorted = np.zeros((0, bands), dtype=np.uint64)
+
+    @property
+    def num_perm(self) -> int:
+        return self.bands * self.rows
+
+    def __len__(self) -> int:
+        return len(self.band_hashes)
+
+    # -- hashing ------------------------------------------------------------
+
+    def signatures(self, titles: Sequence[str]) -> np.ndarray:
+        """
+        MinHash signatures, shape (len(titles), bands * rows).
+
+        Titles without any shingle get an all-max signature and are never
+        bucketed with anything.
+        """
+        out = np.full((len(titles), self.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+
+        for start in range(0, len(titles), _SIGNATURE_CHUNK):
+            chunk = titles[start:start + _SIGNATURE_CHUNK]
+            hashes, owners = [], []
+            for i, title in enumerate(chunk):
+                for shingle in word_shingles(title or '', self.shingle_size):
+                    hashes.append(zlib.crc32(shingle.encode('utf-8')))
+                    owners.append(i)
+            if not hashes:
+                continue
+
+            hashes = np.asarray(hashes, dtype=np.uint64)
+            owners = np.asarray(owners, dtype=np.int64)
+            permuted = (hashes[:, None] * self._a + self._b) % _PRIME
+
+            # Shingles are grouped by owner, so reduceat gives per-title minima
+            starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+            out[start + owners[starts]] = np.minimum.reduceat(permuted, starts, axis=0)
+
+        return out
+
+    def _band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """Fold each band's rows into one uint64, shape (n, bands)."""
+        n = len(signatures)
+        folded = signatures.reshape(n, self.bands, self.rows)
+        keys = np.zeros((n, self.bands), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for r in range(self.rows):
+                keys = keys * _BAND_MIX + folded[:, :, r]
+        # Titles without shingles never share a bucket
+        empty = (signatures == np.iinfo(np.uint64).max).all(axis=1)
+        keys[empty] = 0
+        return keys
+
+    def band_keys(self, titles: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Per-band string keys, shape (n, bands); None for empty titles.
+
+        Args:
+            titles: Titles to key; defaults to the indexed corpus
+        """
+        if titles is None:
+            hashes = self.band_hashes
+        else:
+            hashes = self._band_hashes(self.signatures(list(titles)))
+        keys = np.array([[f"{b}:{h:x}" for b, h in enumerate(row)] for row in hashes.tolist()],
+                        dtype=object).reshape(len(hashes), self.bands)
+        keys[hashes == 0] = None
+        return keys
+
+    # -- building -----------------------------------------------------------
+
+    def build(self, ids: Sequence[str], titles: Sequence[str]) -> 'TitleLSHIndex':
+        """Index ``titles``; row i of the index is ``ids[i]``."""
+        self.ids = list(ids)
+        self.fingerprint = self.corpus_fingerprint(ids, titles)
+        self.band_hashes = self._band_hashes(self.signatures(list(titles)))
+        self._build_tables()
+        return self
+
+    def _build_tables(self):
+        self._order = np.argsort(self.band_hashes, axis=0, kind='stable')
+        self._sorted = np.take_along_axis(self.band_hashes, self._order, axis=0)
+
+    @staticmethod
+    def corpus_fingerprint(ids: Sequence[str], titles: Sequence[str]) -> str:
+        digest = hashlib.sha1()
+        for identifier, title in zip(ids, titles):
+            digest.update(f"{identifier}\x1f{title}\x1e".encode('utf-8'))
+        return digest.hexdigest()
+
+    # -- querying -----------------------------------------------------------
+
+    def query(self, title: str) -> np.ndarray:
+        """Sorted row IDs sharing at least one bucket with ``title``."""
+        return self.query_batch([title])[0]
+
+    def query_batch(self, titles: Sequence[str]) -> List[np.ndarray]:
+        """
+        Candidate rows for each query title.
+
+        Returns:
+            One sorted int64 array of row IDs per title
+        """
+        if not len(self):
+            return [np.zeros(0, dtype=np.int64) for _ in titles]
+
+        query_hashes = self._band_hashes(self.signatures(list(titles)))
+
+        # Locate every (query, band) bucket with one searchsorted per band
+        lo = np.empty_like(query_hashes, dtype=np.int64)
+        hi = np.empty_like(query_hashes, dtype=np.int64)
+        for band in range(self.bands):
+            lo[:, band] = np.searchsorted(self._sorted[:, band], query_hashes[:, band], side='left')
+            hi[:, band] = np.searchsorted(self._sorted[:, band], query_hashes[:, band], side='right')
+
+        sizes = hi - lo
+        usable = (sizes > 0) & (query_hashes != 0)
+        if self.max_bucket_size is not None:
+            usable &= sizes <= self.max_bucket_size
+
+        results = []
+        for q in range(len(titles)):
+            parts = [self._order[lo[q, band]:hi[q, band], band]
+                     for band in np.flatnonzero(usable[q])]
+            if parts:
+                results.append(np.unique(np.concatenate(parts)))
+            else:
+                results.append(np.zeros(0, dtype=np.int64))
+        return results
+
+    def buckets(self, min_size: int = 2) -> Iterator[np.ndarray]:
+        """
+        Row groups sharing a band bucket within the indexed corpus.
+
+        Unlike queries, oversized buckets are yielded too; callers decide
+        how to handle them (e.g. sorted-neighbourhood windows).
+        """
+        for band in range(self.bands):
+            column = self._sorted[:, band]
+            if not len(column):
+                continue
+            boundaries = np.flatnonzero(np.r_[True, column[1:] != column[:-1], True])
+            for lo, hi in zip(boundaries[:-1], boundaries[1:]):
+                if hi - lo >= min_size and column[lo] != 0:
+                    yield self._order[lo:hi, band]
+
+    def estimate_jaccard(self, title_a: str, title_b: str) -> float:
+        """Fraction of agreeing signature rows (MinHash Jaccard estimate)."""
+        sig = self.signatures([title_a, title_b])
+        return float((sig[0] == sig[1]).mean())
+
+    # -- persistence --------------------------------------------------------
+
+    def params(self) -> dict:
+        return {
+            'bands': self.bands,
+            'rows': self.rows,
+            'shingle_size': self.shingle_size,
+            'seed': self.seed,
+        }
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                band_hashes=self.band_hashes,
+                ids=np.asarray(self.ids, dtype=object),
+                params=np.asarray([self.bands, self.rows, self.shingle_size, self.seed]),
+                fingerprint=np.asarray(self.fingerprint),
+            )
+
+    @classmethod
+    def load(cls, path: Path, max_bucket_size: Optional[int] = 500) -> 'TitleLSHIndex':
+        with np.load(path, allow_pickle=True) as data:
+            bands, rows, shingle_size, seed = (int(v) for v in data['params'])
+            index = cls(bands=bands, rows=rows, shingle_size=shingle_size,
+                        seed=seed, max_bucket_size=max_bucket_size)
+            index.band_hashes = data['band_hashes']
+            index.ids = data['ids'].tolist()
+            index.fingerprint = str(data['fingerprint'])
+        index._build_tables()
+        return index
+
+    @classmethod
+    def load_or_build(cls, path: Path, ids: Sequence[str], titles: Sequence[str],
+                      **params) -> 'TitleLSHIndex':
+        """
+        Reuse the index saved at ``path`` if it covers exactly this corpus
+        with the same parameters; otherwise build and save a new one.
+        """
+        path = Path(path)
+        fresh = cls(**params)
+        if path.exists():
+            try:
+                cached = cls.load(path, max_bucket_size=fresh.max_bucket_size)
+                if (cached.params() == fresh.params() and
+                        cached.fingerprint == cls.corpus_fingerprint(ids, titles)):
+                    return cached
+            except (OSError, ValueError, KeyError):
+                pass
+
+        fresh.build(ids, titles)
+        fresh.save(path)
+        return fresh
@@ -6,12 +6,23 @@ creates lightweight high-contrast JPEGs for easier reading, and can scale
 processing to selected page ranges. OCR/translation are handled separately,
 but the script emits JSON metadata plus a human-readable run log so downstream
 automation can coordinate prompts and track provenance.
+
+Pages can be rendered on a process pool (``--workers``): the range is split
+into contiguous chunks, each rendered by a worker with its own PyMuPDF
+document handle. Workers are started with ``spawn`` rather than ``fork``, as
+the render may run inside a multithreaded worker process, and are capped at the
+CPU count. Per-page render/process/save timings are recorded in the metadata
+records.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
@@ -31,6 +42,9 @@ class PageArtifact:
     processed_image: str
     ocr_text: str
     translation_text: str
+    render_seconds: float = 0.0
+    process_seconds: float = 0.0
+    save_seconds: float = 0.0
 
 
 def ensure_dir(path: Path) -> None:
@@ -38,6 +52,94 @@ def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+def render_page(
+    doc: "fitz.Document",
+    page_number: int,
+    matrix: "fitz.Matrix",
+    source_dir: Path,
+    processed_dir: Path,
+    max_dim: int,
+) -> PageArtifact:
+    """Render one page (0-based ``page_number``) to PNG + optimized JPEG."""
+
+    started = time.perf_counter()
+    page = doc.load_page(page_number)
+    pix = page.get_pixmap(matrix=matrix, alpha=False)
+    rendered = time.perf_counter()
+
+    basename = f"page_{page_number + 1:04d}"
+    source_filename = f"{basename}_source.png"
+    processed_filename = f"{basename}_processed.jpg"
+    ocr_filename = f"{basename}_ocr.md"
+    translation_filename = f"{basename}_translation.md"
+
+    # Process with Pillow for contrast/size improvements without overblowing,
+    # straight from the pixmap buffer rather than re-reading the PNG
+    mode = "RGB" if pix.n >= 3 else "L"
+    image = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+    grayscale = ImageOps.grayscale(image)
+    balanced = ImageOps.autocontrast(grayscale, cutoff=1)
+    enhancer = ImageEnhance.Contrast(balanced)
+    processed = enhancer.enhance(1.15)
+    width, height = processed.size
+    if max(width, height) > max_dim:
+        processed.thumbnail((max_dim, max_dim), resample=Image.LANCZOS)
+    processed_at = time.perf_counter()
+
+    source_path = source_dir / source_filename
+    source_path.write_bytes(pix.tobytes("png"))
+
+    processed_path = processed_dir / processed_filename
+    processed.save(
+        processed_path,
+        format="JPEG",
+        quality=92,
+        subsampling=0,
+        optimize=True,
+    )
+    saved = time.perf_counter()
+
+    return PageArtifact(
+        page_number=page_number + 1,
+        source_image=str(source_path.relative_to(source_dir.parent)),
+        processed_image=str(processed_path.relative_to(processed_dir.parent)),
+        ocr_text=str(
+            (source_dir.parent / "ocr_text" / ocr_filename).relative_to(
+                source_dir.parent
+            )
+        ),
+        translation_text=str(
+            (
+                source_dir.parent
+                / "translations"
+                / translation_filename
+            ).relative_to(source_dir.parent)
+        ),
+        render_seconds=round(rendered - started, 4),
+        process_seconds=round(processed_at - rendered, 4),
+        save_seconds=round(saved - processed_at, 4),
+    )
+
+
+def render_page_chunk(
+    pdf_path: Path,
+    page_numbers: List[int],
+    dpi: int,
+    source_dir: Path,
+    processed_dir: Path,
+    max_dim: int,
+) -> List[PageArtifact]:
+    """Process-pool task: render a chunk of pages with a worker-local document handle."""
+
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    with fitz.open(pdf_path) as doc:
+        return [
+            render_page(doc, page_number, matrix, source_dir, processed_dir, max_dim)
+            for page_number in page_numbers
+        ]
+
+
 def render_pdf_pages(
     pdf_path: Path,
     source_dir: Path,
@@ -46,8 +148,14 @@ def render_pdf_pages(
     end_page: int,
     dpi: int = 300,
     max_dim: int = 1900,
+    workers: int = 1,
 ) -> List[PageArtifact]:
-    """Render PDF pages to PNG + optimized JPEGs and return metadata records."""
+    """Render PDF pages to PNG + optimized JPEGs and return metadata records.
+
+    With ``workers`` > 1 the pages are split into contiguous chunks and
+    rendered on a process pool of at most ``workers`` (and no more than the
+    CPU count) spawned processes; records are returned in page order.
+    """
 
     if start_page < 1:
         raise ValueError("start_page must be >= 1")
@@ -58,65 +166,50 @@ def render_pdf_pages(
     if start_page > end:
         raise ValueError("start_page beyond document length")
 
-    zoom = dpi / 72.0
-    matrix = fitz.Matrix(zoom, zoom)
+    page_numbers = list(range(start_page - 1, end))
 
-    records: List[PageArtifact] = []
-    for page_number in tqdm(
-        range(start_page - 1, end), desc="Rendering pages", unit="page"
-    ):
-        page = doc.load_page(page_number)
-        pix = page.get_pixmap(matrix=matrix, alpha=False)
-
-        basename = f"page_{page_number + 1:04d}"
-        source_filename = f"{basename}_source.png"
-        processed_filename = f"{basename}_processed.jpg"
-        ocr_filename = f"{basename}_ocr.md"
-        translation_filename = f"{basename}_translation.md"
-
-        source_path = source_dir / source_filename
-        source_path.write_bytes(pix.tobytes("png"))
-
-        # Process with Pillow for contrast/size improvements without overblowing
-        image = Image.open(source_path)
-        grayscale = ImageOps.grayscale(image)
-        balanced = ImageOps.autocontrast(grayscale, cutoff=1)
-        enhancer = ImageEnhance.Contrast(balanced)
-        processed = enhancer.enhance(1.15)
-        width, height = processed.size
-        if max(width, height) > max_dim:
-            processed.thumbnail((max_dim, max_dim), resample=Image.LANCZOS)
-
-        processed_path = processed_dir / processed_filename
-        processed.save(
-            processed_path,
-            format="JPEG",
-            quality=92,
-            subsampling=0,
-            optimize=True,
-        )
+    if workers <= 1 or len(page_numbers) < 2:
+        zoom = dpi / 72.0
+        matrix = fitz.Matrix(zoom, zoom)
 
-        records.append(
-            PageArtifact(
-                page_number=page_number + 1,
-                source_image=str(source_path.relative_to(source_dir.parent)),
-                processed_image=str(processed_path.relative_to(processed_dir.parent)),
-                ocr_text=str(
-                    (source_dir.parent / "ocr_text" / ocr_filename).relative_to(
-                        source_dir.parent
-                    )
-                ),
-                translation_text=str(
-                    (
-                        source_dir.parent
-                        / "translations"
-                        / translation_filename
-                    ).relative_to(source_dir.parent)
-                ),
+        records: List[PageArtifact] = []
+        for page_number in tqdm(page_numbers, desc="Rendering pages", unit="page"):
+            records.append(
+                render_page(doc, page_number, matrix, source_dir, processed_dir, max_dim)
             )
-        )
+
+        doc.close()
+        return records
 
     doc.close()
+
+    # Several chunks per worker keeps the pool balanced when page cost varies
+    workers = min(workers, os.cpu_count() or 1, len(page_numbers))
+    chunk_size = max(1, -(-len(page_numbers) // (workers * 4)))
+    chunks = [
+        page_numbers[i:i + chunk_size]
+        for i in range(0, len(page_numbers), chunk_size)
+    ]
+
+    records = []
+    # Forking a multithreaded parent (e.g. translation_worker) can deadlock
+    # the children on locks held by other threads; spawn starts them clean
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as pool, tqdm(
+        total=len(page_numbers), desc=f"Rendering pages ({workers} workers)", unit="page"
+    ) as progress:
+        futures = [
+            pool.submit(
+                render_page_chunk, pdf_path, chunk, dpi, source_dir, processed_dir, max_dim
+            )
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            chunk_records = future.result()
+            records.extend(chunk_records)
+            progress.update(len(chunk_records))
+
+    records.sort(key=lambda record: record.page_number)
     return records
 
 
@@ -130,6 +223,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--end", type=int, default=1)
     parser.add_argument("--dpi", type=int, default=300)
     parser.add_argument("--max-dim", type=int, default=1900)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Render processes (default: one per core; 1 renders in-process)",
+    )
     parser.add_argument(
         "--metadata-json",
         type=Path,
@@ -173,6 +272,7 @@ def main() -> None:
         end_page=args.end,
         dpi=args.dpi,
         max_dim=args.max_dim,
+        workers=args.workers,
     )
 
     run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -217,6 +317,7 @@ def write_run_log(
         f"Pages: {args.start} - {args.end}",
         f"DPI: {args.dpi}",
         f"Max dimension: {args.max_dim}",
+        f"Workers: {args.workers}",
     ]
 
     if run_notes:
@@ -234,6 +335,14 @@ def write_run_log(
     if not metadata_records:
         lines.append("- (no pages processed)")
     else:
+        render_total = sum(
+            record.render_seconds + record.process_seconds + record.save_seconds
+            for record in metadata_records
+        )
+        lines.append(
+            f"- {len(metadata_records)} pages, "
+            f"{render_total / len(metadata_records):.2f}s per page (render + process + save)"
+        )
         for record in metadata_records:
             lines.append(
                 f"- Page {record.page_number:04d}: "
@@ -2,10 +2,21 @@
 """Supabase-connected worker for the digitizer pipeline.
 
 This script polls the `digitizer_jobs` table for queued uploads, downloads the
-PDF from Supabase storage, runs the local processing script, and pushes the
-output PNG/JPG/Markdown files back to Supabase. Use it inside GitHub Actions or
+PDF from Supabase storage, renders the requested pages in-process with
+`de_mysteriis_processing.render_pdf_pages`, and pushes the output
+PNG/JPG/Markdown files back to Supabase. Use it inside GitHub Actions or
 another long-running worker.  Requires the Python dependencies already used in
 this repo (PyMuPDF, Pillow, tqdm, supabase-py).
+
+Jobs are claimed with a conditional update (`queued` -> `processing` only if
+the row is still queued), so several workers can poll the same table without
+processing a job twice. Page assets are uploaded on a bounded thread pool and
+the `digitizer_pages` rows are upserted in batches.
+
+Usage:
+    python digitizer_worker.py                      # poll until interrupted
+    python digitizer_worker.py --once --start 1 --end 10
+    python digitizer_worker.py --render-workers 4 --upload-workers 8
 """
 
 from __future__ import annotations
@@ -13,12 +24,19 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import shutil
+import socket
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from pathlib import Path
 from typing import Dict, List
 
 from supabase import Client, create_client
 
+from de_mysteriis_processing import ensure_dir, render_pdf_pages
+
 REQUIRED_ENV = [
     "SUPABASE_URL",
     "SUPABASE_SERVICE_ROLE_KEY",
@@ -27,8 +45,20 @@ REQUIRED_ENV = [
     "SUPABASE_PAGE_TEXT_BUCKET",
 ]
 
-DIGITIZER_SCRIPT = Path("scripts/de_mysteriis_processing.py")
 BASE_DIR = Path("data/marsilio_ficino_de_mysteriis")
+DPI = 350
+POLL_INTERVAL = 15
+CLAIM_CANDIDATES = 5
+UPLOAD_WORKERS = 8
+UPSERT_BATCH = 50
+
+# Record field -> digitizer_pages column, and which bucket the file goes to
+ASSETS = [
+    ("source_image", "source_url", "SUPABASE_PAGE_IMAGES_BUCKET"),
+    ("processed_image", "processed_url", "SUPABASE_PAGE_IMAGES_BUCKET"),
+    ("ocr_text", "ocr_url", "SUPABASE_PAGE_TEXT_BUCKET"),
+    ("translation_text", "translation_url", "SUPABASE_PAGE_TEXT_BUCKET"),
+]
 
 
 def ensure_env() -> None:
@@ -41,11 +71,32 @@ def get_client() -> Client:
     return create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_ROLE_KEY"])
 
 
-def fetch_next_job(client: Client) -> Dict | None:
-    response = client.table("digitizer_jobs").select("*").eq("status", "queued").order("created_at").limit(1).execute()
-    if not response.data:
-        return None
-    return response.data[0]
+def claim_next_job(client: Client) -> Dict | None:
+    """Atomically move the oldest queued job to `processing` and return it.
+
+    The update only matches while the row is still `queued`, so when two
+    workers race for the same job exactly one gets it back; the loser moves on
+    to the next candidate.
+    """
+    response = (
+        client.table("digitizer_jobs")
+        .select("id")
+        .eq("status", "queued")
+        .order("created_at")
+        .limit(CLAIM_CANDIDATES)
+        .execute()
+    )
+    for candidate in response.data or []:
+        claimed = (
+            client.table("digitizer_jobs")
+            .update({"status": "processing", "error": None})
+            .eq("id", candidate["id"])
+            .eq("status", "queued")
+            .execute()
+        )
+        if claimed.data:
+            return claimed.data[0]
+    return None
 
 
 def download_pdf(client: Client, job: Dict, target_path: Path) -> None:
@@ -54,101 +105,171 @@ def download_pdf(client: Client, job: Dict, target_path: Path) -> None:
     target_path.write_bytes(storage_res)
 
 
-def run_processing(pdf_path: Path, start: int, end: int) -> None:
-    cmd = [
-        "python",
-        str(DIGITIZER_SCRIPT),
-        "--pdf",
-        str(pdf_path),
-        "--base-dir",
-        str(BASE_DIR),
-        "--start",
-        str(start),
-        "--end",
-        str(end),
-        "--dpi",
-        "350",
-        "--run-notes",
-        "Supabase worker batch",
-    ]
-    os.system(" ".join(cmd))
-
-
-def upload_page_assets(client: Client, job_id: str, page_number: int) -> None:
-    meta_file = BASE_DIR / "page_metadata.jsonl"
-    targets = []
-    for line in meta_file.read_text().splitlines():
-        record = json.loads(line)
-        if record["page_number"] == page_number:
-            targets.append(record)
-    if not targets:
-        return
-
-    images_bucket = os.environ["SUPABASE_PAGE_IMAGES_BUCKET"]
-    text_bucket = os.environ["SUPABASE_PAGE_TEXT_BUCKET"]
-
-    for record in targets:
-        source_path = BASE_DIR / record["source_image"]
-        processed_path = BASE_DIR / record["processed_image"]
-        ocr_path = BASE_DIR / record["ocr_text"]
-        translation_path = BASE_DIR / record["translation_text"]
-
-        def upload_file(bucket: str, file_path: Path) -> str:
-            storage_path = f"jobs/{job_id}/page_{page_number:04d}/{file_path.name}"
-            client.storage.from_(bucket).upload(storage_path, file_path.read_bytes(), file_options={"cacheControl": "3600", "upsert": True})
-            url = client.storage.from_(bucket).get_public_url(storage_path)
-            return url
-
-        source_url = upload_file(images_bucket, source_path)
-        processed_url = upload_file(images_bucket, processed_path)
-        ocr_url = upload_file(text_bucket, ocr_path)
-        translation_url = upload_file(text_bucket, translation_path)
-
-        client.table("digitizer_pages").upsert(
-            {
-                "job_id": job_id,
-                "page_number": page_number,
-                "source_url": source_url,
-                "processed_url": processed_url,
-                "ocr_url": ocr_url,
-                "translation_url": translation_url,
-            }
-        ).execute()
+def run_processing(pdf_path: Path, job_dir: Path, start: int, end: int, workers: int) -> Dict[int, Dict]:
+    """Render pages in-process and return their metadata indexed by page number.
+
+    Records are also appended to `page_metadata.jsonl` in the job directory,
+    matching what `de_mysteriis_processing.py --metadata-json` writes.
+    """
+    source_dir = job_dir / "source_images"
+    processed_dir = job_dir / "processed_images"
+    ensure_dir(source_dir)
+    ensure_dir(processed_dir)
+
+    records = render_pdf_pages(
+        pdf_path=pdf_path,
+        source_dir=source_dir,
+        processed_dir=processed_dir,
+        start_page=start,
+        end_page=end,
+        dpi=DPI,
+        workers=workers,
+    )
+
+    with (job_dir / "page_metadata.jsonl").open("a", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+    return {record.page_number: asdict(record) for record in records}
+
+
+def upload_file(client: Client, bucket: str, job_id: str, page_number: int, file_path: Path) -> str:
+    storage_path = f"jobs/{job_id}/page_{page_number:04d}/{file_path.name}"
+    client.storage.from_(bucket).upload(
+        storage_path, file_path.read_bytes(), file_options={"cacheControl": "3600", "upsert": True}
+    )
+    return client.storage.from_(bucket).get_public_url(storage_path)
+
+
+def upload_job_assets(
+    client: Client,
+    job_id: str,
+    job_dir: Path,
+    page_index: Dict[int, Dict],
+    pool: ThreadPoolExecutor,
+) -> int:
+    """Upload every page's files through ``pool`` and upsert `digitizer_pages` in batches.
+
+    OCR/translation files are optional: render-only batches have none yet, and
+    their URL columns are left empty.
+
+    Returns:
+        Number of page rows written
+    """
+    futures = {}
+    for page_number, record in page_index.items():
+        for field, column, bucket_env in ASSETS:
+            file_path = job_dir / record[field]
+            if file_path.exists():
+                futures[(page_number, column)] = pool.submit(
+                    upload_file, client, os.environ[bucket_env], job_id, page_number, file_path
+                )
+
+    rows: List[Dict] = []
+    for page_number in sorted(page_index):
+        row = {"job_id": job_id, "page_number": page_number}
+        for _, column, _ in ASSETS:
+            future = futures.get((page_number, column))
+            row[column] = future.result() if future else None
+        rows.append(row)
+
+    for i in range(0, len(rows), UPSERT_BATCH):
+        client.table("digitizer_pages").upsert(rows[i:i + UPSERT_BATCH]).execute()
+    return len(rows)
 
 
 def mark_job(client: Client, job_id: str, status: str, error: str | None = None) -> None:
     client.table("digitizer_jobs").update({"status": status, "error": error}).eq("id", job_id).execute()
 
 
-def main(range_start: int, range_end: int) -> None:
-    ensure_env()
-    client = get_client()
-    job = fetch_next_job(client)
-    if not job:
-        print("No queued jobs.")
-        return
-
+def process_job(
+    client: Client,
+    job: Dict,
+    range_start: int,
+    range_end: int,
+    base_dir: Path,
+    render_workers: int,
+    pool: ThreadPoolExecutor,
+) -> None:
     print(f"Processing job {job['id']} ({job['original_name']})")
     tmp_dir = Path(tempfile.mkdtemp())
     pdf_path = tmp_dir / job["original_name"]
+    job_dir = base_dir / "jobs" / str(job["id"])
     try:
+        started = time.perf_counter()
         download_pdf(client, job, pdf_path)
-        run_processing(pdf_path, range_start, range_end)
-        for page_number in range(range_start, range_end + 1):
-            upload_page_assets(client, job["id"], page_number)
+        page_index = run_processing(pdf_path, job_dir, range_start, range_end, render_workers)
+        rendered = time.perf_counter()
+        pages = upload_job_assets(client, job["id"], job_dir, page_index, pool)
         mark_job(client, job["id"], "completed")
+        print(
+            f"  {pages} pages: render {rendered - started:.1f}s, "
+            f"upload {time.perf_counter() - rendered:.1f}s"
+        )
     except Exception as exc:  # noqa: BLE001
         print("Digitizer worker error", exc)
         mark_job(client, job["id"], "failed", str(exc))
     finally:
-        for child in tmp_dir.iterdir():
-            child.unlink()
-        tmp_dir.rmdir()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main(
+    range_start: int,
+    range_end: int,
+    base_dir: Path = BASE_DIR,
+    render_workers: int = 1,
+    upload_workers: int = UPLOAD_WORKERS,
+    poll_interval: float = POLL_INTERVAL,
+    once: bool = False,
+) -> None:
+    ensure_env()
+    client = get_client()
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Digitizer worker {worker_id} (render workers: {render_workers}, upload workers: {upload_workers})")
+
+    with ThreadPoolExecutor(max_workers=upload_workers) as pool:
+        while True:
+            try:
+                job = claim_next_job(client)
+                if job:
+                    process_job(client, job, range_start, range_end, base_dir, render_workers, pool)
+                elif once:
+                    print("No queued jobs.")
+                else:
+                    time.sleep(poll_interval)
+            except KeyboardInterrupt:
+                print("\nShutting down...")
+                return
+            except Exception as exc:  # noqa: BLE001
+                # A transient Supabase/network failure must not stop the worker
+                print("Digitizer worker error", exc)
+                if not once:
+                    time.sleep(poll_interval)
+            if once:
+                return
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Run digitizer worker batch")
+    parser = argparse.ArgumentParser(description="Run the digitizer worker")
     parser.add_argument("--start", type=int, default=1, help="Start page")
     parser.add_argument("--end", type=int, default=10, help="End page")
+    parser.add_argument("--base-dir", type=Path, default=BASE_DIR, help="Directory for rendered pages")
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Render processes per job (1 renders in-process)",
+    )
+    parser.add_argument("--upload-workers", type=int, default=UPLOAD_WORKERS, help="Concurrent storage uploads")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="Seconds between polls when idle")
+    parser.add_argument("--once", action="store_true", help="Process at most one job and exit")
     args = parser.parse_args()
-    main(args.start, args.end)
+    main(
+        args.start,
+        args.end,
+        args.base_dir,
+        args.render_workers,
+        args.upload_workers,
+        args.poll_interval,
+        args.once,
+    )
@@ -198,7 +198,7 @@ class LatinBibliographyPipeline:
                 df = collector.collect_data(max_records=max_records)
 
                 if not df.empty:
-                    all_dataframes.append(df)
+                    all_dataframes.append(df.to_pandas())
                     self.stats['collection_stats'][collector_name] = {
                         'total_records': len(df),
                         'latin_records': len(df),  # All records should be Latin after filtering
@@ -2,16 +2,32 @@
 """
 Base class for catalogue data collectors.
 Provides common functionality for harvesting bibliographic records.
+
+Collected records are streamed to an append-only Parquet dataset, one part
+file per batch, partitioned by catalogue:
+
+    {output_dir}/dataset/catalogue={name}/part-{run}-{batch}.parquet
+
+Usage:
+    df = collector.collect_data()          # LazyFrame over this run's parts
+    print(len(df))                         # row count from Parquet metadata
+    frame = df.to_pandas()                 # loads the records
+
+    df = load_collected(Path("data/raw/vd16/dataset"), "VD16")   # all runs
 """
 
 import abc
+import threading
 import time
+import uuid
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 import json
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
 
 # Set up logging
@@ -26,6 +42,141 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+DATASET_DIR = 'dataset'
+PARQUET_COMPRESSION = 'zstd'
+
+
+class LazyFrame:
+    """
+    Parquet-backed collection result, loaded into pandas on first use.
+
+    ``len()`` and ``empty`` only read the Parquet footers; any other
+    DataFrame attribute (``to_csv``, ``columns``, indexing, ...) loads the
+    records once and delegates to the resulting DataFrame.
+    """
+
+    def __init__(self, files: Optional[List[Path]] = None, tables: Optional[List[pa.Table]] = None):
+        """
+        Args:
+            files: Parquet part files
+            tables: In-memory Arrow tables (when batches are not saved)
+        """
+        self.files = list(files or [])
+        self.tables = list(tables or [])
+        self._frame: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        return (sum(pq.ParquetFile(f).metadata.num_rows for f in self.files)
+                + sum(t.num_rows for t in self.tables))
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def to_arrow(self) -> pa.Table:
+        """
+        All parts as one Arrow table (columns missing from a part are null).
+
+        Column types are inferred per batch, so one part may hold a column as
+        int64 and another as string. Types that widen (int64 -> double) are
+        promoted; a column whose types cannot be reconciled becomes string in
+        every part.
+        """
+        tables = [pq.read_table(f) for f in self.files] + self.tables
+        if not tables:
+            return pa.table({})
+        return pa.concat_tables(_unify_column_types(tables), promote_options='permissive')
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Load the records (cached after the first call)."""
+        if self._frame is None:
+            table = self.to_arrow()
+            frame = table.to_pandas()
+            # List columns come back as numpy arrays; keep them as Python lists
+            for name in table.column_names:
+                if pa.types.is_list(table.schema.field(name).type):
+                    frame[name] = table.column(name).to_pylist()
+            self._frame = frame
+        return self._frame
+
+    def __getitem__(self, key):
+        return self.to_pandas()[key]
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.to_pandas(), name)
+
+
+def _unify_column_types(tables: List[pa.Table]) -> List[pa.Table]:
+    """Cast columns whose types conflict across ``tables`` to string."""
+    types: Dict[str, set] = {}
+    for table in tables:
+        for field in table.schema:
+            if not pa.types.is_null(field.type):
+                types.setdefault(field.name, set()).add(field.type)
+
+    conflicting = set()
+    for name, field_types in types.items():
+        if len(field_types) < 2:
+            continue
+        try:
+            pa.unify_schemas([pa.schema([pa.field(name, t)]) for t in field_types],
+                             promote_options='permissive')
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            conflicting.add(name)
+    if not conflicting:
+        return tables
+
+    unified = []
+    for table in tables:
+        for name in conflicting.intersection(table.column_names):
+            index = table.column_names.index(name)
+            # Same rendering as the mixed-type fallback in _records_to_table
+            values = [None if v is None else str(v) for v in table.column(name).to_pylist()]
+            table = table.set_column(index, name, pa.array(values, pa.string()))
+        unified.append(table)
+    return unified
+
+
+def load_collected(dataset_dir: Path, catalogue: Optional[str] = None) -> LazyFrame:
+    """
+    Open the Parquet dataset written by ``collect_data`` across all runs.
+
+    Args:
+        dataset_dir: The ``dataset`` directory of a collector's output dir
+        catalogue: Only this catalogue's partition (None for all)
+
+    Returns:
+        LazyFrame over the matching part files
+    """
+    pattern = f"catalogue={catalogue}/*.parquet" if catalogue else "catalogue=*/*.parquet"
+    return LazyFrame(sorted(Path(dataset_dir).glob(pattern)))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token now (the level may go negative) so callers are served in order
+            self.level -= 1
+            wait = -self.level / self.rate if self.level < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
 class BaseCollector(abc.ABC):
     """
     Abstract base class for catalogue data collectors.
@@ -45,10 +196,9 @@ class BaseCollector(abc.ABC):
         self.output_dir = Path(config.get('output_dir', 'data/raw'))
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Rate limiting settings
+        # Rate limiting settings (one bucket shared by all of the collector's threads)
         self.requests_per_second = config.get('requests_per_second', 1)
-        self.min_delay = 1.0 / self.requests_per_second
-        self.last_request_time = 0
+        self.rate_limiter = TokenBucket(self.requests_per_second, config.get('burst', 1))
 
         # Session and headers
         self.session_headers = config.get('headers', {})
@@ -62,40 +212,99 @@ class BaseCollector(abc.ABC):
             'end_time': None
         }
 
-    def _rate_limit(self):
-        """Implement rate limiting between requests."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-
-        if time_since_last < self.min_delay:
-            sleep_time = self.min_delay - time_since_last
-            time.sleep(sleep_time)
+        # Resumable sources (OAI-PMH harvesters) checkpointed after each saved batch
+        self._harvesters: List[Any] = []
 
-        self.last_request_time = time.time()
+    def _rate_limit(self):
+        """Implement rate limiting between requests (safe to call from worker threads)."""
+        self.rate_limiter.acquire()
 
-    def _save_progress(self, records: List[Dict], batch_id: Optional[str] = None):
+    def _save_progress(self, records: List[Dict], batch_id: Optional[str] = None) -> Path:
         """
-        Save intermediate progress to avoid data loss.
+        Append a batch of records to the catalogue's Parquet dataset.
 
         Args:
             records: List of records to save
             batch_id: Optional batch identifier for filename
+
+        Returns:
+            Path of the written part file
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        batch_id = batch_id or "batch"
+        batch_id = batch_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        partition_dir = self.output_dir / DATASET_DIR / f"catalogue={self.name}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save as JSON for intermediate processing
-        json_file = self.output_dir / f"{self.name}_{batch_id}_{timestamp}.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(records, f, ensure_ascii=False, indent=2)
+        part_file = partition_dir / f"part-{batch_id}.parquet"
+        pq.write_table(self._records_to_table(records), part_file, compression=PARQUET_COMPRESSION)
 
-        # Also save as CSV for easier inspection
-        if records:
-            csv_file = self.output_dir / f"{self.name}_{batch_id}_{timestamp}.csv"
-            df = pd.DataFrame(records)
-            df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+        logger.info(f"Saved {len(records)} records to {part_file}")
+        return part_file
 
-        logger.info(f"Saved {len(records)} records to {json_file}")
+    @staticmethod
+    def _records_to_table(records: List[Dict]) -> pa.Table:
+        """
+        Convert normalized records to an Arrow table.
+
+        Nested dicts (e.g. ``raw_record``) are stored as JSON strings, and a
+        column whose values have mixed types falls back to strings.
+        """
+        def to_value(value):
+            if isinstance(value, dict) or (isinstance(value, list) and any(isinstance(v, dict) for v in value)):
+                return json.dumps(value, ensure_ascii=False, default=str)
+            return value
+
+        columns = {}
+        for key in dict.fromkeys(key for record in records for key in record):
+            values = [to_value(record.get(key)) for record in records]
+            try:
+                columns[key] = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                columns[key] = pa.array([None if v is None else str(v) for v in values])
+        return pa.table(columns)
+
+    def _harvest_oai_pmh(self, base_url: str, set_spec: Optional[str] = None,
+                         metadata_prefix: str = 'marcxml') -> Iterator[Dict]:
+        """
+        Stream records from an OAI-PMH endpoint with a resumable harvester.
+
+        The resumption token is kept in ``{name}_oai_state.json`` in the output
+        directory. It only moves forward once ``collect_data`` has written the
+        records before it (see ``_commit_progress``), so an interrupted harvest
+        picks up after the last saved batch without losing records. Config
+        keys: ``oai_from`` (explicit from= date), ``oai_until``,
+        ``oai_incremental`` (only changes since the last completed harvest)
+        and ``oai_resume`` (default True).
+
+        Args:
+            base_url: OAI-PMH endpoint
+            set_spec: Optional set to harvest
+            metadata_prefix: metadataPrefix to request
+
+        Yields:
+            Harvested records (see oai_pmh.OAIPMHHarvester.harvest)
+        """
+        from oai_pmh import OAIPMHHarvester
+
+        harvester = OAIPMHHarvester(
+            base_url,
+            metadata_prefix=metadata_prefix,
+            set_spec=set_spec,
+            state_file=self.output_dir / f"{self.name}_oai_state.json",
+            before_request=self._rate_limit,
+            auto_commit=False,
+        )
+        self._harvesters.append(harvester)
+        yield from harvester.harvest(
+            from_date=self.config.get('oai_from'),
+            until=self.config.get('oai_until'),
+            incremental=self.config.get('oai_incremental', False),
+            resume=self.config.get('oai_resume', True),
+        )
+
+    def _commit_progress(self):
+        """Let resumable sources save their position: all records taken so far are stored."""
+        for harvester in self._harvesters:
+            harvester.commit()
 
     def _normalize_record(self, record: Dict) -> Dict:
         """
@@ -153,13 +362,13 @@ class BaseCollector(abc.ABC):
         return 1450 <= year <= 1900
 
     @abc.abstractmethod
-    def search_latin_works(self, **kwargs) -> List[Dict]:
+    def search_latin_works(self, **kwargs) -> Iterable[Dict]:
         """
         Search for Latin works in the catalogue.
         Should implement catalogue-specific search logic.
 
         Returns:
-            List of raw records from the catalogue
+            List (or iterator, for streaming harvests) of raw records from the catalogue
         """
         pass
 
@@ -177,32 +386,55 @@ class BaseCollector(abc.ABC):
         pass
 
     def collect_data(self, max_records: Optional[int] = None,
-                    save_batches: bool = True, batch_size: int = 1000) -> pd.DataFrame:
+                    save_batches: bool = True, batch_size: int = 1000) -> LazyFrame:
         """
         Main method to collect data from the catalogue.
 
+        Records are consumed from ``search_latin_works`` as they arrive and
+        written out every ``batch_size`` Latin records, so memory does not
+        grow with the size of the catalogue.
+
         Args:
             max_records: Maximum number of records to collect (None for unlimited)
-            save_batches: Whether to save intermediate batches
+            save_batches: Write batches to the Parquet dataset (if False they
+                are kept in memory)
             batch_size: Number of records per batch
 
         Returns:
-            DataFrame containing all collected records
+            LazyFrame over the records collected in this run
         """
         logger.info(f"Starting data collection from {self.name}")
         self.stats['start_time'] = datetime.now()
 
-        all_records = []
-        batch_count = 0
-
+        # Unique per run so repeated runs only ever add part files
+        run_id = f"{self.stats['start_time'].strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        result = LazyFrame()
+        batch: List[Dict] = []
+        self._harvesters.clear()
+        collected = 0
+
+        def flush():
+            if not batch:
+                return
+            if save_batches:
+                result.files.append(self._save_progress(batch, f"{run_id}-{len(result.files) + 1:05d}"))
+                self._commit_progress()
+            else:
+                result.tables.append(self._records_to_table(batch))
+            batch.clear()
+
+        raw_records = None
         try:
             # Get initial search results
             raw_records = self.search_latin_works(**self.config.get('search_params', {}))
-            logger.info(f"Found {len(raw_records)} total records from initial search")
+            if isinstance(raw_records, list):
+                logger.info(f"Found {len(raw_records)} total records from initial search")
+            else:
+                logger.info("Streaming records from search")
 
             # Process records
             for i, raw_record in enumerate(tqdm(raw_records, desc=f"Processing {self.name}")):
-                if max_records and len(all_records) >= max_records:
+                if max_records and collected >= max_records:
                     logger.info(f"Reached maximum record limit: {max_records}")
                     break
 
@@ -214,43 +446,42 @@ class BaseCollector(abc.ABC):
                     if self._is_latin_work(normalized):
                         year = normalized.get('publication_year')
                         if year is None or self._validate_date_range(year):
-                            all_records.append(normalized)
+                            batch.append(normalized)
+                            collected += 1
                             self.stats['latin_records'] += 1
 
                     self.stats['total_records'] += 1
 
-                    # Save batches if enabled
-                    if save_batches and len(all_records) % batch_size == 0:
-                        batch_count += 1
-                        self._save_progress(all_records[-batch_size:], f"batch_{batch_count}")
+                    if len(batch) >= batch_size:
+                        flush()
 
                 except Exception as e:
                     logger.error(f"Error processing record {i}: {e}")
                     self.stats['errors'] += 1
                     continue
 
-            # Save final batch
-            if save_batches and all_records:
-                batch_count += 1
-                self._save_progress(all_records[-(len(all_records) % batch_size):], f"batch_{batch_count}")
+            # Save final (partial) batch
+            flush()
+            self._commit_progress()
 
         except Exception as e:
             logger.error(f"Error in data collection: {e}")
             raise
+        finally:
+            # Stop a streaming search (closes connections, worker pools)
+            if hasattr(raw_records, 'close'):
+                raw_records.close()
 
-        # Create final DataFrame
-        if all_records:
-            df = pd.DataFrame(all_records)
-            logger.info(f"Collected {len(df)} Latin works from {self.name}")
+        if collected:
+            logger.info(f"Collected {collected} Latin works from {self.name}")
         else:
-            df = pd.DataFrame()
             logger.warning("No Latin records collected")
 
         # Update statistics
         self.stats['end_time'] = datetime.now()
         self._save_stats()
 
-        return df
+        return result
 
     def _save_stats(self):
         """Save collection statistics to file."""
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Streaming OAI-PMH harvester.
+
+Walks a ListRecords result set page by page, stream-parsing each response with
+``lxml.etree.iterparse`` and clearing every ``<record>`` once it has been
+converted, so memory stays bounded no matter how large the set is. Records are
+yielded one at a time as plain dictionaries.
+
+After each page the resumption token and running record count are written to a
+small JSON state file, so an interrupted harvest continues from the last page
+instead of starting over. When a harvest completes, its response date is kept
+and can be used as ``from=`` for the next, incremental harvest.
+
+A caller that buffers records before storing them passes ``auto_commit=False``
+and calls ``commit()`` once everything yielded so far is durably written; the
+state file then never points past records that were not saved.
+
+Usage:
+    from oai_pmh import OAIPMHHarvester
+
+    harvester = OAIPMHHarvester("https://oai.bsb-muenchen.de/oai2", set_spec="VD16",
+                                state_file=Path("data/raw/vd16/VD16_oai_state.json"))
+    for record in harvester.harvest(incremental=True):
+        marc = record['metadata']   # controlfields / datafields
+
+    python oai_pmh.py https://oai.bsb-muenchen.de/oai2 --set VD17 --limit 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import requests
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+OAI_NS = "http://www.openarchives.org/OAI/2.0/"
+
+RECORD_TAG = f"{{{OAI_NS}}}record"
+TOKEN_TAG = f"{{{OAI_NS}}}resumptionToken"
+ERROR_TAG = f"{{{OAI_NS}}}error"
+RESPONSE_DATE_TAG = f"{{{OAI_NS}}}responseDate"
+
+MAX_RETRIES = 3
+RETRY_BACKOFF = 5.0
+
+
+class OAIPMHError(Exception):
+    """Error response from an OAI-PMH repository."""
+
+    def __init__(self, code: str, message: str = ''):
+        super().__init__(f"{code}: {message}" if message else code)
+        self.code = code
+
+
+def _local(tag: str) -> str:
+    """Tag name without its namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_marc_record(metadata: Optional[etree._Element]) -> Dict[str, Any]:
+    """
+    Convert the MARCXML record inside an OAI ``<metadata>`` element.
+
+    Args:
+        metadata: The ``<metadata>`` element (or a ``<marc:record>``)
+
+    Returns:
+        Dict with ``controlfields`` ({tag: text}), ``datafields`` (list of
+        {tag, ind1, ind2, subfields: [(code, text)]}) and ``xml`` (the
+        serialized MARC record)
+    """
+    record = {'controlfields': {}, 'datafields': [], 'xml': ''}
+    if metadata is None:
+        return record
+
+    marc = metadata if _local(metadata.tag) == 'record' else next(
+        (child for child in metadata if _local(child.tag) == 'record'), None)
+    if marc is None:
+        return record
+
+    for field in marc:
+        name = _local(field.tag)
+        if name == 'controlfield':
+            record['controlfields'][field.get('tag')] = (field.text or '').strip()
+        elif name == 'datafield':
+            record['datafields'].append({
+                'tag': field.get('tag'),
+                'ind1': field.get('ind1'),
+                'ind2': field.get('ind2'),
+                'subfields': [(sub.get('code'), (sub.text or '').strip())
+                              for sub in field if _local(sub.tag) == 'subfield'],
+            })
+    record['xml'] = etree.tostring(marc, encoding='unicode')
+    return record
+
+
+class OAIPMHHarvester:
+    """Resumable, streaming ListRecords harvester."""
+
+    def __init__(self, base_url: str, metadata_prefix: str = 'marcxml',
+                 set_spec: Optional[str] = None, state_file: Optional[Path] = None,
+                 session: Optional[requests.Session] = None,
+                 before_request: Optional[Callable[[], None]] = None,
+                 parse_metadata: Callable[[Optional[etree._Element]], Any] = parse_marc_record,
+                 timeout: int = 60, auto_commit: bool = True):
+        """
+        Args:
+            base_url: OAI-PMH endpoint
+            metadata_prefix: metadataPrefix to request
+            set_spec: Optional set to harvest
+            state_file: JSON file for the resumption token and counters (None: no resume)
+            session: requests Session to reuse connections
+            before_request: Called before every HTTP request (e.g. a rate limiter)
+            parse_metadata: Converts a record's ``<metadata>`` element
+            timeout: Per-request timeout in seconds
+            auto_commit: Save the state after every page (False: only on ``commit()``)
+        """
+        self.base_url = base_url
+        self.metadata_prefix = metadata_prefix
+        self.set_spec = set_spec
+        self.state_file = Path(state_file) if state_file else None
+        self.session = session or requests.Session()
+        self.before_request = before_request
+        self.parse_metadata = parse_metadata
+        self.timeout = timeout
+        self.auto_commit = auto_commit
+        self.state = self._load_state()
+        self._pending: Optional[Dict[str, Any]] = None
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_file and self.state_file.exists():
+            with open(self.state_file, encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state: Optional[Dict[str, Any]] = None):
+        """Write the state file atomically (temp file + rename)."""
+        if not self.state_file:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_file.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state if state is None else state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def _checkpoint(self):
+        """Record that every record up to here has been yielded."""
+        if self.auto_commit:
+            self._save_state()
+        else:
+            self._pending = dict(self.state)
+
+    def commit(self):
+        """
+        Save the last page boundary whose records have all been yielded.
+
+        Call once the records taken from ``harvest`` so far are stored; a
+        restart then resumes after them. A no-op with ``auto_commit``.
+        """
+        if self._pending is not None:
+            self._save_state(self._pending)
+            self._pending = None
+
+    def _initial_params(self, from_date: Optional[str], until: Optional[str]) -> Dict[str, str]:
+        params = {'verb': 'ListRecords', 'metadataPrefix': self.metadata_prefix}
+        if self.set_spec:
+            params['set'] = self.set_spec
+        if from_date:
+            params['from'] = from_date
+        if until:
+            params['until'] = until
+        return params
+
+    def _parse_record(self, element: etree._Element) -> Dict[str, Any]:
+        header = metadata = None
+        for child in element:
+            name = _local(child.tag)
+            if name == 'header':
+                header = child
+            elif name == 'metadata':
+                metadata = child
+
+        record = {'identifier': '', 'datestamp': '', 'deleted': False, 'sets': []}
+        if header is not None:
+            record['deleted'] = header.get('status') == 'deleted'
+            for child in header:
+                name = _local(child.tag)
+                if name == 'identifier':
+                    record['identifier'] = (child.text or '').strip()
+                elif name == 'datestamp':
+                    record['datestamp'] = (child.text or '').strip()
+                elif name == 'setSpec':
+                    record['sets'].append((child.text or '').strip())
+        record['metadata'] = self.parse_metadata(metadata)
+        return record
+
+    def _stream_page(self, params: Dict[str, str], page: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the records of one ListRecords response while parsing it.
+
+        Fills ``page`` with the response date and next resumption token.
+        """
+        if self.before_request:
+            self.before_request()
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+
+        try:
+            events = etree.iterparse(response.raw, events=('end',), huge_tree=True,
+                                     tag=(RECORD_TAG, TOKEN_TAG, ERROR_TAG, RESPONSE_DATE_TAG))
+            for _, element in events:
+                if element.tag == RECORD_TAG:
+                    yield self._parse_record(element)
+                elif element.tag == TOKEN_TAG:
+                    page['token'] = (element.text or '').strip() or None
+                    page['complete_list_size'] = element.get('completeListSize')
+                elif element.tag == RESPONSE_DATE_TAG:
+                    page['response_date'] = (element.text or '').strip()
+                elif element.tag == ERROR_TAG:
+                    raise OAIPMHError(element.get('code', 'unknown'), (element.text or '').strip())
+
+                # Drop the element and everything parsed before it
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        finally:
+            response.close()
+
+    def harvest(self, from_date: Optional[str] = None, until: Optional[str] = None,
+                incremental: bool = False, resume: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Harvest the set, yielding one record dict at a time.
+
+        The resumption token is saved after each page has been fully consumed
+        (with ``auto_commit=False``, at the next ``commit()``), so a restart
+        repeats at most the records since the last save.
+
+        Args:
+            from_date: Explicit ``from=`` datestamp (YYYY-MM-DD or full UTC)
+            until: Optional ``until=`` datestamp
+            incremental: Harvest only changes since the last completed harvest
+            resume: Continue an interrupted harvest from its saved token
+
+        Yields:
+            Dicts with identifier, datestamp, deleted, sets and parsed metadata
+        """
+        token = self.state.get('resumption_token') if resume else None
+        if token:
+            logger.info(f"Resuming OAI-PMH harvest at record {self.state.get('records', 0)}")
+            params = {'verb': 'ListRecords', 'resumptionToken': token}
+        else:
+            if incremental and not from_date and self.state.get('last_harvest_date'):
+                # Day granularity is supported by every repository; the overlap is harmless
+                from_date = self.state['last_harvest_date'][:10]
+                logger.info(f"Incremental OAI-PMH harvest from {from_date}")
+            params = self._initial_params(from_date, until)
+            self.state.update({
+                'base_url': self.base_url, 'set': self.set_spec, 'from': from_date,
+                'until': until, 'records': 0, 'pages': 0, 'resumption_token': None,
+                'harvest_started': None, 'started_at': datetime.now().isoformat(),
+                'completed_at': None,
+            })
+
+        while True:
+            page: Dict[str, Any] = {}
+            yielded = 0
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    for i, record in enumerate(self._stream_page(params, page)):
+                        if i < yielded:
+                            continue  # already handed out before a retry
+                        yielded += 1
+                        yield record
+                    break
+                except OAIPMHError as e:
+                    if e.code == 'noRecordsMatch':
+                        break
+                    if e.code == 'badResumptionToken':
+                        # Expired tokens cannot be reused; the next run starts afresh
+                        self.state['resumption_token'] = None
+                        self._save_state()
+                    raise
+                except (requests.RequestException, etree.XMLSyntaxError) as e:
+                    if attempt == MAX_RETRIES:
+                        raise
+                    wait = RETRY_BACKOFF * 2 ** attempt
+                    logger.warning(f"OAI-PMH page failed ({e}), retrying in {wait:.0f}s")
+                    time.sleep(wait)
+
+            if not self.state.get('harvest_started'):
+                self.state['harvest_started'] = page.get('response_date') or datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            self.state['records'] = self.state.get('records', 0) + yielded
+            self.state['pages'] = self.state.get('pages', 0) + 1
+            self.state['resumption_token'] = page.get('token')
+            if (page.get('complete_list_size') or '').isdigit():
+                self.state['complete_list_size'] = int(page['complete_list_size'])
+            self._checkpoint()
+
+            if not page.get('token'):
+                break
+            params = {'verb': 'ListRecords', 'resumptionToken': page['token']}
+
+        self.state['last_harvest_date'] = self.state['harvest_started']
+        self.state['completed_at'] = datetime.now().isoformat()
+        self._checkpoint()
+        logger.info(f"OAI-PMH harvest complete: {self.state['records']} records "
+                    f"in {self.state['pages']} pages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream records from an OAI-PMH endpoint")
+    parser.add_argument("url", help="OAI-PMH base URL")
+    parser.add_argument("--set", dest="set_spec", help="setSpec to harvest")
+    parser.add_argument("--prefix", default="marcxml", help="metadataPrefix")
+    parser.add_argument("--from", dest="from_date", help="Only records changed since this date")
+    parser.add_argument("--state", type=Path, help="State file for resuming")
+    parser.add_argument("--limit", type=int, default=10, help="Stop after this many records (0: all)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    harvester = OAIPMHHarvester(args.url, args.prefix, args.set_spec, args.state)
+    for count, record in enumerate(harvester.harvest(from_date=args.from_date), 1):
+        title = next((text for field in record['metadata']['datafields'] if field['tag'] == '245'
+                      for code, text in field['subfields'] if code == 'a'), '')
+        print(f"{record['identifier']}  {record['datestamp']}  {title[:70]}")
+        if args.limit and count >= args.limit:
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,21 @@
 """
 USTC collector for harvesting Latin works from Universal Short Title Catalogue.
 USTC: Universal Short Title Catalogue
+
+Record details are fetched concurrently on a thread pool over one pooled
+session, with the next search page prefetched while a page's details
+download; all requests share the collector's token bucket, so the overall
+rate still honours ``requests_per_second``. Fetched record IDs (and their
+records) are appended to ``{name}_details.jsonl`` in the output directory,
+so an interrupted crawl resumes without refetching them.
 """
 
+import json
 import requests
 import re
-import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
 import pandas as pd
@@ -34,8 +43,15 @@ class USTCCollector(BaseCollector):
         self.start_year = config.get('start_year', 1450)
         self.end_year = config.get('end_year', 1600)
 
-        # Session setup
+        # Concurrent detail fetching
+        self.detail_workers = config.get('detail_workers', 4)
+        self.details_file = self.output_dir / f"{self.name}_details.jsonl"
+
+        # Session setup (connection pool sized for the detail workers)
         self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=self.detail_workers + 1)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (compatible; LatinBibliographyBot/1.0)',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -44,29 +60,44 @@ class USTCCollector(BaseCollector):
             'Connection': 'keep-alive',
         })
 
-    def search_latin_works(self, **kwargs) -> List[Dict]:
+    def search_latin_works(self, **kwargs) -> Iterator[Dict]:
         """
         Search for Latin works in USTC.
         Uses web interface with pagination.
 
+        Records from an earlier, interrupted crawl are replayed from the
+        details file first; only record IDs not fetched before are requested.
+
         Returns:
-            List of raw records from USTC
+            Iterator over raw records from USTC
         """
         logger.info(f"Searching USTC for Latin works ({self.start_year}-{self.end_year})")
 
-        records = []
+        found = 0
         page = 1
         max_pages = self.config.get('max_pages', 100)
-
+        records_per_page = self.config.get('records_per_page', 20)
+
+        fetched_ids: Set[str] = set()
+        if self.config.get('resume', True):
+            for record_id, record in self._load_fetched_details():
+                fetched_ids.add(record_id)
+                if record:
+                    found += 1
+                    yield record
+            if fetched_ids:
+                logger.info(f"Resuming USTC crawl: {len(fetched_ids)} records already fetched")
+        elif self.details_file.exists():
+            self.details_file.unlink()
+
+        pool = ThreadPoolExecutor(max_workers=self.detail_workers)
         try:
+            next_search = pool.submit(self._perform_search, self._build_search_params(page, **kwargs))
             while page <= max_pages:
                 logger.info(f"Processing page {page}")
 
-                # Construct search parameters
-                search_params = self._build_search_params(page, **kwargs)
-
-                # Make search request
-                search_results = self._perform_search(search_params)
+                # Search page was requested while the previous page's details downloaded
+                search_results = next_search.result()
                 if not search_results:
                     logger.info("No more results found")
                     break
@@ -77,19 +108,30 @@ class USTCCollector(BaseCollector):
                     logger.info("No record IDs found on page")
                     break
 
-                # Get detailed information for each record
-                for record_id in record_ids:
+                # Check if we should continue pagination
+                last_page = len(record_ids) < records_per_page or page == max_pages
+                if not last_page:
+                    next_search = pool.submit(self._perform_search, self._build_search_params(page + 1, **kwargs))
+
+                # Get detailed information for each new record concurrently
+                pending = [(record_id, pool.submit(self._fetch_record_details, record_id))
+                           for record_id in record_ids if record_id not in fetched_ids]
+                for record_id, future in pending:
                     try:
-                        detailed_record = self.get_record_details(record_id)
-                        if detailed_record:
-                            records.append(detailed_record)
+                        detailed_record = future.result()
                     except Exception as e:
                         logger.error(f"Error getting details for record {record_id}: {e}")
                         continue
 
-                # Check if we should continue pagination
-                if len(record_ids) < self.config.get('records_per_page', 20):
-                    logger.info("Fewer records than expected, assuming last page")
+                    self._save_fetched_details(record_id, detailed_record)
+                    fetched_ids.add(record_id)
+                    if detailed_record:
+                        found += 1
+                        yield detailed_record
+
+                if last_page:
+                    if len(record_ids) < records_per_page:
+                        logger.info("Fewer records than expected, assuming last page")
                     break
 
                 page += 1
@@ -97,9 +139,27 @@ class USTCCollector(BaseCollector):
         except Exception as e:
             logger.error(f"Error in USTC search: {e}")
             raise
-
-        logger.info(f"Found {len(records)} total records in USTC")
-        return records
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        logger.info(f"Found {found} total records in USTC")
+
+    def _load_fetched_details(self) -> Iterator[tuple]:
+        """Stream (record_id, record or None) pairs saved by earlier crawls."""
+        if not self.details_file.exists():
+            return
+        with open(self.details_file, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from an interrupted crawl
+                yield entry['ustc_id'], entry.get('record')
+
+    def _save_fetched_details(self, record_id: str, record: Optional[Dict]):
+        """Append a fetched record (None if filtered out) to the details file."""
+        with open(self.details_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'ustc_id': record_id, 'record': record}, ensure_ascii=False) + '\n')
 
     def _build_search_params(self, page: int = 1, **kwargs) -> Dict:
         """
@@ -190,42 +250,56 @@ class USTCCollector(BaseCollector):
         Returns:
             Detailed record information or None if not found
         """
-        logger.debug(f"Getting details for USTC record: {record_id}")
-
         try:
-            self._rate_limit()
+            return self._fetch_record_details(record_id)
+        except Exception as e:
+            logger.error(f"Error getting record details for {record_id}: {e}")
+            return None
 
-            # Get record detail page
-            detail_url = f"{self.detail_url}/{record_id}"
-            response = self.session.get(detail_url, timeout=30)
-            response.raise_for_status()
+    def _fetch_record_details(self, record_id: str) -> Optional[Dict]:
+        """
+        Fetch and parse a USTC record page (safe to run on worker threads).
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+        Args:
+            record_id: USTC record identifier
 
-            # Extract detailed information
-            record = {
-                'ustc_id': record_id,
-                'detail_url': detail_url,
-                'raw_html': str(soup),
-            }
+        Returns:
+            Detailed record, or None if it is not a Latin work in the date range
 
-            # Extract bibliographic information
-            record.update(self._extract_bibliographic_details(soup))
+        Raises:
+            requests.RequestException: If the page could not be fetched
+        """
+        logger.debug(f"Getting details for USTC record: {record_id}")
 
-            # Check if it's a Latin work and within date range
-            if not self._is_latin_work(record):
-                return None
+        self._rate_limit()
 
-            year = record.get('publication_year')
-            if year and not self._validate_date_range(year):
-                return None
+        # Get record detail page
+        detail_url = f"{self.detail_url}/{record_id}"
+        response = self.session.get(detail_url, timeout=30)
+        response.raise_for_status()
 
-            return record
+        soup = BeautifulSoup(response.content, 'html.parser')
 
-        except Exception as e:
-            logger.error(f"Error getting record details for {record_id}: {e}")
+        # Extract detailed information
+        record = {
+            'ustc_id': record_id,
+            'detail_url': detail_url,
+            'raw_html': str(soup),
+        }
+
+        # Extract bibliographic information
+        record.update(self._extract_bibliographic_details(soup))
+
+        # Check if it's a Latin work and within date range
+        if not self._is_latin_work(record):
             return None
 
+        year = record.get('publication_year')
+        if year and not self._validate_date_range(year):
+            return None
+
+        return record
+
     def _extract_bibliographic_details(self, soup: BeautifulSoup) -> Dict:
         """
         Extract bibliographic details from USTC record page.
@@ -4,11 +4,9 @@ VD16 collector for harvesting Latin works from VD16 database.
 VD16: Verzeichnis der im deutschen Sprachraum erschienenen Drucke des 16. Jahrhunderts
 """
 
-import requests
 import re
-from typing import Dict, List, Optional
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 import pandas as pd
 from base_collector import BaseCollector, CollectorFactory
 import logging
@@ -22,95 +20,75 @@ class VD16Collector(BaseCollector):
     Uses Gateway.Bayern interface and OAI-PMH where possible.
     """
 
+    default_set = 'VD16'
+
     def __init__(self, config: Dict):
         super().__init__(config)
         self.base_url = "https://gateway-bayern.de"
         self.search_url = "https://gateway-bayern.de/VD16"
         self.oai_pmh_url = "https://oai.bsb-muenchen.de/oai2"
+        self.oai_set = config.get('oai_set', self.default_set)
 
         # VD16 specific configuration
         self.language_filter = config.get('language_filter', 'lat')  # Latin language code
         self.date_range = config.get('date_range', '1501-1600')
 
-    def search_latin_works(self, **kwargs) -> List[Dict]:
+    def search_latin_works(self, **kwargs) -> Iterator[Dict]:
         """
         Search for Latin works in VD16.
         Uses both web interface and OAI-PMH if available.
 
+        Records are streamed as they are harvested rather than collected
+        into a list first.
+
         Returns:
-            List of raw records from VD16
+            Iterator over raw records from VD16
         """
-        logger.info("Searching VD16 for Latin works")
-
-        records = []
+        logger.info(f"Searching {self.oai_set} for Latin works")
 
+        found = 0
         try:
             # Try OAI-PMH first if configured
             if self.config.get('use_oai_pmh', True):
-                oai_records = self._search_oai_pmh()
-                records.extend(oai_records)
+                for record in self._search_oai_pmh():
+                    found += 1
+                    yield record
 
             # Fallback to web scraping if OAI-PMH doesn't yield results
-            if not records or self.config.get('force_web_scraping', False):
-                web_records = self._search_web_interface()
-                records.extend(web_records)
+            if not found or self.config.get('force_web_scraping', False):
+                for record in self._search_web_interface():
+                    found += 1
+                    yield record
 
         except Exception as e:
-            logger.error(f"Error searching VD16: {e}")
+            logger.error(f"Error searching {self.oai_set}: {e}")
             raise
 
-        logger.info(f"Found {len(records)} total records in VD16")
-        return records
+        logger.info(f"Found {found} total records in {self.oai_set}")
 
-    def _search_oai_pmh(self) -> List[Dict]:
+    def _search_oai_pmh(self) -> Iterator[Dict]:
         """
-        Search using OAI-PMH interface.
+        Harvest the OAI-PMH set as a resumable stream (see BaseCollector._harvest_oai_pmh).
 
         Returns:
-            List of records from OAI-PMH
+            Iterator over Latin records from OAI-PMH
         """
-        logger.info("Attempting VD16 OAI-PMH harvest")
-
-        # OAI-PMH parameters for VD16
-        params = {
-            'verb': 'ListRecords',
-            'metadataPrefix': 'marcxml',
-            'set': 'VD16',  # VD16 set identifier
-        }
-
-        records = []
+        logger.info(f"Attempting {self.oai_set} OAI-PMH harvest")
 
+        harvested = 0
         try:
-            while True:
-                self._rate_limit()
-
-                response = requests.get(self.oai_pmh_url, params=params, timeout=30)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.content, 'xml')
-
-                # Extract records
-                marc_records = soup.find_all('record')
-                for record in marc_records:
-                    processed = self._process_marc_record(record)
-                    if processed:
-                        records.append(processed)
-
-                # Check for resumption token
-                resumption_token = soup.find('resumptionToken')
-                if resumption_token and resumption_token.text:
-                    params = {
-                        'verb': 'ListRecords',
-                        'resumptionToken': resumption_token.text
-                    }
-                else:
-                    break
+            for oai_record in self._harvest_oai_pmh(self.oai_pmh_url, self.oai_set, 'marcxml'):
+                if oai_record['deleted']:
+                    continue
+                processed = self._process_marc_record(oai_record['metadata'])
+                if processed:
+                    harvested += 1
+                    yield processed
 
         except Exception as e:
             logger.error(f"OAI-PMH harvest failed: {e}")
 
-        logger.info(f"OAI-PMH harvested {len(records)} records")
-        return records
+        logger.info(f"OAI-PMH harvested {harvested} records")
 
     def _search_web_interface(self) -> List[Dict]:
         """
@@ -145,30 +123,25 @@ class VD16Collector(BaseCollector):
 
         return records
 
-    def _process_marc_record(self, marc_record) -> Optional[Dict]:
+    def _process_marc_record(self, marc_record: Dict) -> Optional[Dict]:
         """
         Process a MARC XML record from OAI-PMH.
 
         Args:
-            marc_record: BeautifulSoup object representing MARC record
+            marc_record: Parsed MARC record (see oai_pmh.parse_marc_record)
 
         Returns:
             Processed record dictionary or None if not Latin
         """
         try:
-            # Extract MARC data fields
-            datafields = marc_record.find_all('datafield')
-
             record = {
                 'vd16_id': self._extract_control_number(marc_record),
-                'raw_marc': str(marc_record),
+                'raw_marc': marc_record.get('xml', ''),
             }
 
             # Extract standard bibliographic fields
-            for field in datafields:
-                tag = field.get('tag')
-                ind1 = field.get('ind1')
-                ind2 = field.get('ind2')
+            for field in marc_record['datafields']:
+                tag = field['tag']
 
                 if tag == '245':  # Title statement
                     record['title'] = self._extract_title(field)
@@ -176,13 +149,15 @@ class VD16Collector(BaseCollector):
                     record['author'] = self._extract_author(field)
                 elif tag == '260':  # Publication info
                     record['publication_info'] = self._extract_publication_info(field)
-                elif tag == '008':  # Fixed field
-                    record['fixed_field'] = field.text
                 elif tag == '300':  # Physical description
                     record['physical_description'] = self._extract_physical_description(field)
                 elif tag == '500':  # General notes
                     record['notes'] = self._extract_notes(field)
 
+            fixed_field = marc_record['controlfields'].get('008')
+            if fixed_field:
+                record['fixed_field'] = fixed_field
+
             # Process publication info
             if 'publication_info' in record:
                 pub_info = record['publication_info']
@@ -203,43 +178,34 @@ class VD16Collector(BaseCollector):
             logger.error(f"Error processing MARC record: {e}")
             return None
 
-    def _extract_control_number(self, marc_record) -> str:
+    def _extract_control_number(self, marc_record: Dict) -> str:
         """Extract VD16 control number (001 field)."""
-        control_field = marc_record.find('controlfield', {'tag': '001'})
-        if control_field:
-            return control_field.text.strip()
-        return ''
+        return marc_record['controlfields'].get('001', '')
 
-    def _extract_title(self, title_field) -> str:
+    def _extract_title(self, title_field: Dict) -> str:
         """Extract title from MARC 245 field."""
         title_parts = []
-        for subfield in title_field.find_all('subfield'):
-            code = subfield.get('code')
-            text = subfield.text.strip()
+        for code, text in title_field['subfields']:
             if code == 'a':  # Title proper
                 title_parts.append(text)
             elif code == 'b':  # Other title info
                 title_parts.append(text)
         return ' '.join(title_parts)
 
-    def _extract_author(self, author_field) -> str:
+    def _extract_author(self, author_field: Dict) -> str:
         """Extract author name from MARC 100 field."""
         author_parts = []
-        for subfield in author_field.find_all('subfield'):
-            code = subfield.get('code')
-            text = subfield.text.strip()
+        for code, text in author_field['subfields']:
             if code == 'a':  # Personal name
                 author_parts.append(text)
             elif code == 'd':  # Dates
                 author_parts.append(f"({text})")
         return ''.join(author_parts)
 
-    def _extract_publication_info(self, pub_field) -> Dict:
+    def _extract_publication_info(self, pub_field: Dict) -> Dict:
         """Extract publication information from MARC 260 field."""
         pub_info = {}
-        for subfield in pub_field.find_all('subfield'):
-            code = subfield.get('code')
-            text = subfield.text.strip()
+        for code, text in pub_field['subfields']:
             if code == 'a':  # Place of publication
                 pub_info['place'] = text
             elif code == 'b':  # Publisher/printer
@@ -248,34 +214,28 @@ class VD16Collector(BaseCollector):
                 pub_info['date'] = text
         return pub_info
 
-    def _extract_physical_description(self, phys_field) -> str:
+    def _extract_physical_description(self, phys_field: Dict) -> str:
         """Extract physical description from MARC 300 field."""
-        parts = []
-        for subfield in phys_field.find_all('subfield'):
-            parts.append(subfield.text.strip())
-        return ' '.join(parts)
+        return ' '.join(text for _, text in phys_field['subfields'])
 
-    def _extract_notes(self, notes_field) -> str:
+    def _extract_notes(self, notes_field: Dict) -> str:
         """Extract notes from MARC 500 field."""
-        subfield = notes_field.find('subfield', {'code': 'a'})
-        if subfield:
-            return subfield.text.strip()
-        return ''
+        return next((text for code, text in notes_field['subfields'] if code == 'a'), '')
 
-    def _extract_language(self, marc_record) -> str:
+    def _extract_language(self, marc_record: Dict) -> str:
         """Extract language code from MARC 008 field or 041 field."""
         # Try 008 field first (positions 35-37)
-        fixed_field = marc_record.find('controlfield', {'tag': '008'})
-        if fixed_field and len(fixed_field.text) > 37:
-            lang_code = fixed_field.text[35:38]
+        fixed_field = marc_record['controlfields'].get('008', '')
+        if len(fixed_field) > 37:
+            lang_code = fixed_field[35:38]
             return lang_code.lower()
 
         # Try 041 field as fallback
-        lang_field = marc_record.find('datafield', {'tag': '041'})
-        if lang_field:
-            subfield = lang_field.find('subfield', {'code': 'a'})
-            if subfield:
-                return subfield.text.strip().lower()
+        for field in marc_record['datafields']:
+            if field['tag'] == '041':
+                for code, text in field['subfields']:
+                    if code == 'a':
+                        return text.lower()
 
         return ''
 
@@ -283,7 +243,7 @@ class VD16Collector(BaseCollector):
         """Extract publication year from publication info."""
         date_str = pub_info.get('date', '')
         # Extract year using regex
-        year_match = re.search(r'\b(14[5-9]\d|15\d\d|16\d\d)\b', date_str)
+        year_match = re.search(r'\b(14[5-9]\d|1[5-8]\d\d)\b', date_str)
         if year_match:
             return int(year_match.group())
         return None
@@ -351,8 +311,22 @@ class VD16Collector(BaseCollector):
         return normalized
 
 
-# Register the collector
+class VD17Collector(VD16Collector):
+    """VD17 (17th century) - same OAI-PMH endpoint and MARC layout as VD16."""
+
+    default_set = 'VD17'
+
+
+class VD18Collector(VD16Collector):
+    """VD18 (18th century) - same OAI-PMH endpoint and MARC layout as VD16."""
+
+    default_set = 'VD18'
+
+
+# Register the collectors
 CollectorFactory.register_collector('vd16', VD16Collector)
+CollectorFactory.register_collector('vd17', VD17Collector)
+CollectorFactory.register_collector('vd18', VD18Collector)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Internet Archive page-count resolver.
+
+Reads the page count of an IA item from its metadata (``imagecount``) in a
+single request, falling back to the item's scandata page list, and only then
+to a HEAD-only search over the BookReader page images. Results are cached
+per identifier in memory and in the shared response cache, so a book's
+count is looked up once.
+
+Page images are ``/download/{identifier}/page/n{index}.jpg`` with 0-based
+indices, so an item with count N has pages n0..n{N-1}.
+
+Usage:
+    from ia_pages import resolve_page_count
+
+    count = resolve_page_count("hin-wel-all-00001266-001")
+
+    python ia_pages.py hin-wel-all-00001266-001 [--no-cache]
+"""
+
+import argparse
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+from response_cache import DAY, cached
+
+IA_METADATA_URL = "https://archive.org/metadata/{identifier}"
+IA_DOWNLOAD_URL = "https://archive.org/download/{identifier}/{name}"
+IA_PAGE_URL = "https://archive.org/download/{identifier}/page/n{index}.jpg"
+PAGE_COUNT_TTL = 90 * DAY
+MAX_PAGES = 10000
+
+_counts: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def page_count_from_metadata(item: Dict[str, Any]) -> Optional[int]:
+    """``imagecount`` from an archive.org/metadata response, if present."""
+    value = item.get("metadata", {}).get("imagecount")
+    if isinstance(value, list):
+        value = value[0] if value else None
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        return None
+    return count if count > 0 else None
+
+
+def page_count_from_scandata(xml_text: str) -> Optional[int]:
+    """Number of pages in a scandata.xml that are part of the access formats."""
+    try:
+        root = ET.fromstring(xml_text)
+    except ET.ParseError:
+        return None
+    pages = [page for page in root.iter("page")
+             if (page.findtext("addToAccessFormats") or "true").strip().lower() != "false"]
+    return len(pages) or None
+
+
+def _is_page(identifier: str, index: int, session) -> bool:
+    try:
+        response = session.head(IA_PAGE_URL.format(identifier=identifier, index=index),
+                                allow_redirects=True, timeout=10)
+    except requests.RequestException:
+        return False
+    return response.status_code == 200 and "image" in response.headers.get("content-type", "")
+
+
+def probe_page_count(identifier: str, session=requests) -> int:
+    """Page count by HEAD requests only: double until a page is missing, then bisect."""
+    if not _is_page(identifier, 0, session):
+        return 0
+
+    # Invariant: page ``low`` exists, page ``high`` does not
+    low, high = 0, 1
+    while high < MAX_PAGES and _is_page(identifier, high, session):
+        low, high = high, high * 2
+    high = min(high, MAX_PAGES)
+
+    while high - low > 1:
+        mid = (low + high) // 2
+        if _is_page(identifier, mid, session):
+            low = mid
+        else:
+            high = mid
+    return low + 1
+
+
+def fetch_page_count(identifier: str, session=requests) -> Optional[int]:
+    """Resolve a page count from metadata, scandata, or HEAD probing (uncached)."""
+    try:
+        response = session.get(IA_METADATA_URL.format(identifier=identifier), timeout=30)
+        response.raise_for_status()
+        item = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"  IA metadata error for {identifier}: {e}")
+        item = {}
+
+    count = page_count_from_metadata(item)
+    if count:
+        return count
+
+    scandata = next((f["name"] for f in item.get("files", [])
+                     if f.get("name", "").endswith("_scandata.xml")), None)
+    if scandata:
+        try:
+            response = session.get(IA_DOWNLOAD_URL.format(identifier=identifier, name=scandata), timeout=60)
+            response.raise_for_status()
+            count = page_count_from_scandata(response.text)
+        except requests.RequestException as e:
+            print(f"  IA scandata error for {identifier}: {e}")
+        if count:
+            return count
+
+    print(f"  No page count in IA metadata for {identifier}, probing page images...")
+    return probe_page_count(identifier, session) or None
+
+
+def resolve_page_count(identifier: str, session=requests, use_cache: bool = True) -> int:
+    """
+    Number of page images in an IA item (0 if none could be found).
+
+    Args:
+        identifier: IA item identifier
+        session: requests module or Session used for the lookups
+        use_cache: Reuse counts from the in-memory and persistent caches
+
+    Returns:
+        Page count N; page images are n0..n{N-1}
+    """
+    if use_cache and identifier in _counts:
+        return _counts[identifier]
+
+    def fetch():
+        count = fetch_page_count(identifier, session)
+        if not count:
+            raise LookupError(identifier)  # failures are not cached
+        return count
+
+    try:
+        count = cached("ia_page_count", identifier, fetch, ttl=PAGE_COUNT_TTL) if use_cache else fetch()
+    except LookupError:
+        return 0
+
+    with _lock:
+        _counts[identifier] = count
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve the page count of an Internet Archive item")
+    parser.add_argument("identifier", help="Internet Archive identifier")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached counts")
+    args = parser.parse_args()
+
+    print(f"{args.identifier}: {resolve_page_count(args.identifier, use_cache=not args.no_cache)} pages")
+
+
+if __name__ == "__main__":
+    main()
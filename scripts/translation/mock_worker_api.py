@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+In-memory mock of the webapp worker API (/api/worker/poll and /api/worker/update).
+
+Implements the same lease protocol as the Next.js routes and the
+claim_translation_job() SQL function, so translation_worker.py can be run
+and tested locally without Supabase: jobs are leased to one worker at a
+time, heartbeats renew the lease, an expired lease frees the job, and a
+worker that lost its lease gets 409 on update.
+
+Jobs are images jobs over a generated directory of small JPEGs, so no
+Internet Archive access is needed. Point ANTHROPIC_BASE_URL at a stub
+(e.g. scripts/matching/llm_queue.py --stub) to avoid model calls as well.
+
+Usage:
+    python mock_worker_api.py --port 3001 --jobs 5 --pages 40
+    WORKER_API_KEY=mock python translation_worker.py --api-url http://127.0.0.1:3001 --max-jobs 3
+
+    from mock_worker_api import start_mock_api
+    server = start_mock_api(jobs=3, pages=10)
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.state.summary()
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+WORKER_KEY = "mock"
+DEFAULT_LEASE_SECONDS = 120
+# 'rendering' too: a job whose worker died mid-render is picked up again
+CLAIMABLE = ('pending', 'rendering', 'processing_preview', 'processing_full')
+
+# Smallest valid JPEG (1x1 pixel)
+TINY_JPEG = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912"
+    "130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b080001"
+    "000101011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b5100002010303"
+    "020403050504040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f02433627282"
+    "090a161718191a25262728292a3435363738393a434445464748494a535455565758595a636465666768696a73747576"
+    "7778797a838485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6c7c8c9ca"
+    "d2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3ffd9"
+)
+
+
+class MockJobStore:
+    """Jobs, leases and page results shared by the request handlers."""
+
+    def __init__(self):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.pages: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.claims: List[tuple] = []  # (job_id, worker_id, time)
+        self.lock = threading.Lock()
+
+    def add_job(self, images_dir: Path, preview_pages: int = 30, max_pages: Optional[int] = None,
+                status: str = 'pending') -> str:
+        job_id = str(uuid.uuid4())
+        with self.lock:
+            self.jobs[job_id] = {
+                'id': job_id, 'images_dir': str(images_dir), 'status': status,
+                'prompts': {}, 'preview_pages': preview_pages, 'max_pages': max_pages,
+                'total_pages': None, 'pages_processed': 0, 'created_at': time.time(),
+                'leased_by': None, 'lease_expires_at': None,
+            }
+            self.pages[job_id] = {}
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Same selection and transition as claim_translation_job()."""
+        now = time.time()
+        with self.lock:
+            free = [job for job in self.jobs.values()
+                    if job['status'] in CLAIMABLE
+                    and (job['lease_expires_at'] is None or job['lease_expires_at'] < now)]
+            if not free:
+                return None
+            job = min(free, key=lambda j: (j['status'], j['created_at']))
+            if job['status'] == 'pending':
+                job['status'] = 'processing_preview' if job.get('ia_identifier') else 'rendering'
+            job['leased_by'] = worker_id
+            job['lease_expires_at'] = now + lease_seconds
+            self.claims.append((job['id'], worker_id, now))
+            return dict(job)
+
+    def update(self, payload: Dict[str, Any]) -> int:
+        """Apply a worker update; returns the HTTP status."""
+        job_id = payload.get('jobId')
+        worker_id = payload.get('workerId')
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return 404
+            if worker_id and job['leased_by'] and job['leased_by'] != worker_id:
+                return 409
+
+            if worker_id and payload.get('heartbeat'):
+                job['leased_by'] = worker_id
+                job['lease_expires_at'] = time.time() + (payload.get('lease_seconds') or DEFAULT_LEASE_SECONDS)
+            if worker_id and payload.get('release'):
+                job['leased_by'] = None
+                job['lease_expires_at'] = None
+
+            for field in ('status', 'total_pages', 'pages_processed', 'current_page',
+                          'error_message', 'preview_completed_at', 'completed_at'):
+                if payload.get(field) is not None:
+                    job[field] = payload[field]
+
+            page = payload.get('page_result')
+            if page:
+                self.pages[job_id][page['page_number']] = page
+        return 200
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            return {job_id: {'status': job['status'], 'pages_processed': job['pages_processed'],
+                             'pages': len(self.pages[job_id]), 'leased_by': job['leased_by']}
+                    for job_id, job in self.jobs.items()}
+
+
+def make_handler(state: MockJobStore, worker_key: str = WORKER_KEY):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            if self.headers.get('X-Worker-Key') != worker_key:
+                self._reply(401, {'error': 'Invalid worker key'})
+                return False
+            return True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != '/api/worker/poll':
+                return self._reply(404, {'error': 'Not found'})
+            if not self._authorized():
+                return
+            query = parse_qs(url.query)
+            worker_id = query.get('worker', ['legacy'])[0]
+            lease = float(query.get('lease', [DEFAULT_LEASE_SECONDS])[0])
+            self._reply(200, {'job': state.claim(worker_id, lease)})
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/api/worker/update':
+                return self._reply(404, {'error': 'Not found'})
+            if not self._authorized():
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not payload.get('jobId'):
+                return self._reply(400, {'error': 'jobId is required'})
+            status = state.update(payload)
+            errors = {404: 'Job not found', 409: 'Lease lost'}
+            self._reply(status, {'success': True} if status == 200 else {'error': errors[status]})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def make_images_dir(pages: int, directory: Optional[Path] = None) -> Path:
+    """Directory of ``pages`` tiny JPEGs named like an unpacked ZIP upload."""
+    directory = Path(directory or tempfile.mkdtemp(prefix='mock_job_'))
+    directory.mkdir(parents=True, exist_ok=True)
+    for page in range(1, pages + 1):
+        (directory / f'page_{page:04d}.jpg').write_bytes(TINY_JPEG)
+    return directory
+
+
+def start_mock_api(port: int = 0, jobs: int = 0, pages: int = 10, preview_pages: int = 30,
+                   worker_key: str = WORKER_KEY) -> ThreadingHTTPServer:
+    """
+    Serve the mock API on a background thread.
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        jobs: Number of pending images jobs to create
+        pages: Pages per job
+        preview_pages: Preview size of each job
+        worker_key: Expected X-Worker-Key
+
+    Returns:
+        The running server; its ``state`` attribute is the MockJobStore
+    """
+    state = MockJobStore()
+    for _ in range(jobs):
+        state.add_job(make_images_dir(pages), preview_pages=preview_pages)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state, worker_key))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock of the webapp worker API for local testing')
+    parser.add_argument('--port', type=int, default=3001)
+    parser.add_argument('--jobs', type=int, default=3, help='Pending images jobs to create')
+    parser.add_argument('--pages', type=int, default=20, help='Pages per job')
+    parser.add_argument('--preview-pages', type=int, default=30)
+    parser.add_argument('--worker-key', default=WORKER_KEY, help='Expected WORKER_API_KEY')
+    args = parser.parse_args()
+
+    server = start_mock_api(args.port, args.jobs, args.pages, args.preview_pages, args.worker_key)
+    print(f"Mock worker API on http://127.0.0.1:{server.server_address[1]} "
+          f"({args.jobs} jobs x {args.pages} pages, key '{args.worker_key}')")
+    try:
+        while True:
+            time.sleep(10)
+            for job_id, info in server.state.summary().items():
+                print(f"  {job_id[:8]}  {info['status']:<20} {info['pages']:>4} pages  {info['leased_by'] or ''}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Append-only progress journal for translation checkpoints.
+
+Page events are appended as JSON lines to ``progress.journal.jsonl`` next to
+the ``progress.json`` snapshot, so checkpointing a page is one small append
+instead of a rewrite of the whole file. Every ``compact_every`` events the
+journal is folded into a fresh snapshot, which is written to a temporary file
+and renamed over ``progress.json``, then the journal is truncated. A crash
+at any point leaves either the old or the new snapshot plus a replayable
+journal; a torn last line is ignored.
+
+Appends use O_APPEND and compaction holds an exclusive lock on the journal,
+so several threads or worker processes can share one journal.
+
+The snapshot keeps the original progress.json layout (sorted page lists),
+so existing readers keep working.
+
+Usage:
+    from progress_journal import ProgressJournal
+
+    progress = ProgressJournal(output_dir / "progress.json", {"identifier": identifier})
+    if page_num not in progress.completed:
+        ...
+        progress.mark_completed(page_num)
+    progress.set(total_pages=412)
+
+    python progress_journal.py path/to/progress.json   # compact and show a summary
+"""
+
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+COMPACT_EVERY = 500
+
+
+class ProgressJournal:
+    """Page-level progress kept as a snapshot plus an append-only event log."""
+
+    def __init__(self, path: Path, defaults: Optional[Dict[str, Any]] = None,
+                 compact_every: int = COMPACT_EVERY):
+        """
+        Args:
+            path: Snapshot file (progress.json); the journal lives beside it
+            defaults: Initial fields when no snapshot exists yet
+            compact_every: Fold the journal into the snapshot after this many events
+        """
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix(".journal.jsonl")
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._terminate_torn_line()
+
+        self.fields: Dict[str, Any] = {"started_at": datetime.now().isoformat(), "last_page": 0,
+                                       "total_pages": None, **(defaults or {})}
+        self.completed: Set[int] = set()
+        self.failed: Set[int] = set()
+        self._load()
+
+    def _terminate_torn_line(self):
+        """End a line left unfinished by a crash so the next event starts cleanly."""
+        with open(self.journal_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                os.write(self._fd, b"\n")
+
+    def _load(self):
+        """Read the snapshot, then replay the journal on top of it."""
+        if self.path.exists():
+            with open(self.path) as f:
+                snapshot = json.load(f)
+            self.completed = set(snapshot.pop("completed_pages", []))
+            self.failed = set(snapshot.pop("failed_pages", []))
+            self.fields.update(snapshot)
+
+        if self.journal_path.exists():
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write from a crash
+                    self._apply(event)
+                    self._pending += 1
+
+    def _apply(self, event: Dict[str, Any]):
+        op = event.get("op")
+        if op == "completed":
+            self.completed.add(event["page"])
+            self.failed.discard(event["page"])
+        elif op == "failed":
+            self.failed.add(event["page"])
+        elif op == "set":
+            self.fields.update(event["fields"])
+        self.fields["updated_at"] = event.get("at", self.fields.get("updated_at"))
+
+    def _append(self, event: Dict[str, Any]):
+        event["at"] = datetime.now().isoformat()
+        line = (json.dumps(event) + "\n").encode("utf-8")
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                os.write(self._fd, line)
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._apply(event)
+            self._pending += 1
+            compact = self._pending >= self.compact_every
+        if compact:
+            self.compact()
+
+    def mark_completed(self, page_num: int):
+        """Record a finished page (clears an earlier failure)."""
+        self._append({"op": "completed", "page": page_num})
+
+    def mark_failed(self, page_num: int):
+        self._append({"op": "failed", "page": page_num})
+
+    def set(self, **fields):
+        """Record top-level fields such as total_pages or last_page."""
+        self._append({"op": "set", "fields": fields})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "completed_pages":
+            return self.completed
+        if key == "failed_pages":
+            return self.failed
+        return self.fields[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state in the progress.json layout."""
+        return {**self.fields,
+                "completed_pages": sorted(self.completed),
+                "failed_pages": sorted(self.failed)}
+
+    def compact(self):
+        """Fold the journal into progress.json (atomic rename) and truncate it."""
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                # Pick up events other processes appended since we loaded
+                self._pending = 0
+                self._load()
+
+                tmp_path = self.path.with_suffix(f".json.{os.getpid()}.tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(self.snapshot(), f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                os.truncate(self.journal_path, 0)
+                self._pending = 0
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        """Compact and release the journal."""
+        if self._fd is None:
+            return
+        self.compact()
+        os.close(self._fd)
+        self._fd = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact a progress journal and summarize it")
+    parser.add_argument("path", type=Path, help="progress.json snapshot")
+    args = parser.parse_args()
+
+    progress = ProgressJournal(args.path)
+    progress.close()
+    print(f"{args.path}: {len(progress.completed)} completed, {len(progress.failed)} failed, "
+          f"last page {progress.get('last_page')}, total {progress.get('total_pages')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Thread-safe request spacing shared by the translation scripts.
+
+Kept free of third-party imports so translation_worker.py can use it even
+when translate_book.py's provider dependencies are not installed.
+
+Usage:
+    from rate_limiter import RateLimiter
+
+    limiter = RateLimiter(60.0 / requests_per_minute)
+    limiter.wait()   # before each request, from any thread
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least ``interval`` seconds apart."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller's slot comes up."""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
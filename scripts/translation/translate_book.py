@@ -8,8 +8,13 @@ This script processes Renaissance Latin texts from Internet Archive:
 3. Translates Latin to English
 4. Saves results with checkpointing
 
+Pages flow through separate download, transcription and translation
+worker pools, so OCR of one page overlaps translation of the previous ones.
+IA downloads and model calls each have their own rate limit.
+
 Usage:
     python translate_book.py --identifier hin-wel-all-00001266-001 --start 15 --end 50
+    python translate_book.py --identifier hin-wel-all-00001266-001 --start 1 --end 400 --transcribe-workers 8 --rpm 200
     python translate_book.py --identifier hin-wel-all-00001266-001 --resume
     python translate_book.py --identifier hin-wel-all-00001266-001 --provider openai --page 15
 
@@ -25,10 +30,18 @@ import json
 import argparse
 import time
 import base64
+import queue
+import random
+import threading
 import requests
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+from ia_pages import resolve_page_count
+from progress_journal import ProgressJournal
+from rate_limiter import RateLimiter
 
 # Load .env file
 from dotenv import load_dotenv
@@ -37,6 +50,20 @@ load_dotenv(Path(__file__).parent.parent / ".env")
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data" / "translations"
 
+# Parallel page pipeline
+DOWNLOAD_WORKERS = 4
+TRANSCRIBE_WORKERS = 4
+TRANSLATE_WORKERS = 4
+DOWNLOAD_DELAY = 0.25  # minimum seconds between IA image requests
+PROVIDER_REQUESTS_PER_MINUTE = {"openai": 500, "gemini": 60, "claude": 50}
+
+# Page images are downscaled to a pixel budget and recompressed before upload
+IMAGE_MAX_PIXELS = 1_600_000
+IMAGE_QUALITY = 85
+
+# Latencies kept per call kind for the p95 (counts and totals are exact)
+LATENCY_SAMPLES = 1000
+
 # Prompts
 TRANSCRIPTION_PROMPT = """Transcribe the Latin text from this page image exactly as it appears.
 
@@ -66,28 +93,181 @@ Latin text:
 Provide only the English translation, no commentary."""
 
 
+class CallMetrics:
+    """
+    Thread-safe per-call latency, payload size and token counts, by call kind.
+
+    Memory stays bounded however many calls are made: counts and sums are kept
+    exactly, latencies as a fixed-size random sample for the p95. Calls made on
+    a thread inside ``scope(other)`` are also recorded in ``other``, so one
+    job's calls can be reported from a provider shared by several jobs.
+    """
+
+    def __init__(self, latency_samples: int = LATENCY_SAMPLES):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._latency_samples = latency_samples
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, kind: str, seconds: float, bytes_sent: int,
+               input_tokens: Optional[int] = None, output_tokens: Optional[int] = None):
+        with self._lock:
+            stats = self._stats.setdefault(kind, {
+                "calls": 0, "seconds": 0.0, "bytes_sent": 0,
+                "input_tokens": 0, "output_tokens": 0, "latencies": [],
+            })
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["bytes_sent"] += bytes_sent
+            stats["input_tokens"] += input_tokens or 0
+            stats["output_tokens"] += output_tokens or 0
+            # Reservoir sampling: every call has the same chance to be kept
+            latencies = stats["latencies"]
+            if len(latencies) < self._latency_samples:
+                latencies.append(seconds)
+            else:
+                slot = random.randrange(stats["calls"])
+                if slot < self._latency_samples:
+                    latencies[slot] = seconds
+        for scoped in getattr(self._local, "scopes", ()):
+            scoped.record(kind, seconds, bytes_sent, input_tokens, output_tokens)
+
+    @contextmanager
+    def scope(self, metrics: "CallMetrics"):
+        """Also record this thread's calls in ``metrics`` until the block exits."""
+        scopes = getattr(self._local, "scopes", ())
+        self._local.scopes = scopes + (metrics,)
+        try:
+            yield metrics
+        finally:
+            self._local.scopes = scopes
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Calls, mean/p95 latency, total bytes and tokens per call kind."""
+        with self._lock:
+            stats = {kind: dict(row, latencies=sorted(row["latencies"]))
+                     for kind, row in self._stats.items()}
+        summary = {}
+        for kind, row in stats.items():
+            latencies = row["latencies"]
+            summary[kind] = {
+                "calls": row["calls"],
+                "mean_seconds": row["seconds"] / row["calls"],
+                "p95_seconds": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+                "bytes_sent": row["bytes_sent"],
+                "input_tokens": row["input_tokens"],
+                "output_tokens": row["output_tokens"],
+            }
+        return summary
+
+    def report(self):
+        for kind, stats in self.summary().items():
+            print(f"  {kind}: {stats['calls']} calls, {stats['mean_seconds']:.1f}s mean / "
+                  f"{stats['p95_seconds']:.1f}s p95, {stats['bytes_sent'] / 1e6:.1f} MB sent, "
+                  f"{stats['input_tokens']:,} in / {stats['output_tokens']:,} out tokens")
+
+
+def image_media_type(image_data: bytes) -> str:
+    """MIME type from the file signature (JPEG unless recognisably something else)."""
+    if image_data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP":
+        return "image/webp"
+    if image_data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/jpeg"
+
+
+def prepare_image(image_data: bytes, max_pixels: int = IMAGE_MAX_PIXELS,
+                  quality: int = IMAGE_QUALITY) -> Tuple[bytes, str]:
+    """
+    Downscale an image to at most ``max_pixels`` and recompress it as JPEG.
+
+    Images already within budget are sent as they are unless recompression
+    makes them smaller. Without Pillow the original bytes are returned.
+
+    Returns:
+        (image bytes, media type)
+    """
+    try:
+        from PIL import Image
+        import io
+    except ImportError:
+        return image_data, image_media_type(image_data)
+
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        width, height = image.size
+        if width * height > max_pixels:
+            scale = (max_pixels / (width * height)) ** 0.5
+            image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=quality, optimize=True)
+    except Exception:
+        return image_data, image_media_type(image_data)
+
+    if width * height <= max_pixels and out.tell() >= len(image_data):
+        return image_data, image_media_type(image_data)
+    return out.getvalue(), "image/jpeg"
+
+
+_clients: Dict[str, Any] = {}
+_providers: Dict[str, "ModelProvider"] = {}
+_pool_lock = threading.RLock()
+
+
+def shared_client(name: str, factory):
+    """One API client per process and SDK, so connections are pooled across calls and threads."""
+    with _pool_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
 class ModelProvider:
     """Base class for model providers"""
 
-    def transcribe_image(self, image_data: bytes) -> str:
+    # Images are downscaled to this many pixels before upload
+    max_pixels = IMAGE_MAX_PIXELS
+
+    def __init__(self):
+        self.metrics = CallMetrics()
+
+    def transcribe_image(self, image_data: Optional[bytes], prompt: str = TRANSCRIPTION_PROMPT,
+                         image_url: Optional[str] = None) -> str:
+        """Transcribe a page from image bytes (or, where supported, a public image URL)."""
         raise NotImplementedError
 
     def translate_text(self, latin_text: str) -> str:
+        return self.complete(TRANSLATION_PROMPT_TEMPLATE.format(latin_text=latin_text))
+
+    def complete(self, prompt: str) -> str:
+        """Text-only request."""
         raise NotImplementedError
 
 
 class OpenAIProvider(ModelProvider):
     """OpenAI GPT-4o provider - best value for vision tasks"""
 
+    max_pixels = 2048 * 768  # high-detail vision input is scaled to fit this anyway
+
     def __init__(self):
+        super().__init__()
         from openai import OpenAI
-        self.client = OpenAI()
+        self.client = shared_client("openai", OpenAI)
         self.vision_model = "gpt-4o"  # or "gpt-4o-mini" for cheaper
         self.text_model = "gpt-4o-mini"  # cheaper for text-only translation
 
-    def transcribe_image(self, image_data: bytes) -> str:
-        image_b64 = base64.standard_b64encode(image_data).decode("utf-8")
+    def transcribe_image(self, image_data: Optional[bytes], prompt: str = TRANSCRIPTION_PROMPT,
+                         image_url: Optional[str] = None) -> str:
+        if image_data is not None:
+            image_data, media_type = prepare_image(image_data, self.max_pixels)
+            image_b64 = base64.standard_b64encode(image_data).decode("utf-8")
+            image_url = f"data:{media_type};base64,{image_b64}"
 
+        started = time.time()
         response = self.client.chat.completions.create(
             model=self.vision_model,
             max_tokens=4096,
@@ -98,71 +278,111 @@ class OpenAIProvider(ModelProvider):
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_b64}"
+                                "url": image_url
                             }
                         },
                         {
                             "type": "text",
-                            "text": TRANSCRIPTION_PROMPT
+                            "text": prompt
                         }
                     ]
                 }
             ]
         )
+        self._record("transcribe", started, len(image_url) + len(prompt), response)
         return response.choices[0].message.content
 
-    def translate_text(self, latin_text: str) -> str:
+    def complete(self, prompt: str) -> str:
+        started = time.time()
         response = self.client.chat.completions.create(
             model=self.text_model,
             max_tokens=4096,
             messages=[
                 {
                     "role": "user",
-                    "content": TRANSLATION_PROMPT_TEMPLATE.format(latin_text=latin_text)
+                    "content": prompt
                 }
             ]
         )
+        self._record("text", started, len(prompt.encode("utf-8")), response)
         return response.choices[0].message.content
 
+    def _record(self, kind: str, started: float, bytes_sent: int, response):
+        usage = getattr(response, "usage", None)
+        self.metrics.record(kind, time.time() - started, bytes_sent,
+                            getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
+
 
 class GeminiProvider(ModelProvider):
     """Google Gemini provider - free tier available"""
 
+    max_pixels = 3072 * 3072
+
     def __init__(self):
+        super().__init__()
         import google.generativeai as genai
         genai.configure(api_key=os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY"))
         self.vision_model = genai.GenerativeModel("gemini-1.5-pro")
         self.text_model = genai.GenerativeModel("gemini-1.5-flash")  # cheaper for text
 
-    def transcribe_image(self, image_data: bytes) -> str:
+    def transcribe_image(self, image_data: Optional[bytes], prompt: str = TRANSCRIPTION_PROMPT,
+                         image_url: Optional[str] = None) -> str:
         from PIL import Image
         import io
 
+        if image_data is None:
+            image_data = requests.get(image_url, timeout=60).content
+        image_data, _ = prepare_image(image_data, self.max_pixels)
         image = Image.open(io.BytesIO(image_data))
+
+        started = time.time()
         response = self.vision_model.generate_content([
-            TRANSCRIPTION_PROMPT,
+            prompt,
             image
         ])
+        self._record("transcribe", started, len(image_data) + len(prompt), response)
         return response.text
 
-    def translate_text(self, latin_text: str) -> str:
-        response = self.text_model.generate_content(
-            TRANSLATION_PROMPT_TEMPLATE.format(latin_text=latin_text)
-        )
+    def complete(self, prompt: str) -> str:
+        started = time.time()
+        response = self.text_model.generate_content(prompt)
+        self._record("text", started, len(prompt.encode("utf-8")), response)
         return response.text
 
+    def _record(self, kind: str, started: float, bytes_sent: int, response):
+        usage = getattr(response, "usage_metadata", None)
+        self.metrics.record(kind, time.time() - started, bytes_sent,
+                            getattr(usage, "prompt_token_count", None),
+                            getattr(usage, "candidates_token_count", None))
+
 
 class ClaudeProvider(ModelProvider):
     """Anthropic Claude provider - highest quality"""
 
+    max_pixels = 1_150_000  # larger images are downscaled server-side anyway
+
     def __init__(self):
+        super().__init__()
         import anthropic
-        self.client = anthropic.Anthropic()
+        self.client = shared_client("anthropic", anthropic.Anthropic)
         self.model = "claude-sonnet-4-20250514"
 
-    def transcribe_image(self, image_data: bytes) -> str:
-        image_b64 = base64.standard_b64encode(image_data).decode("utf-8")
+    def transcribe_image(self, image_data: Optional[bytes], prompt: str = TRANSCRIPTION_PROMPT,
+                         image_url: Optional[str] = None) -> str:
+        if image_data is None:
+            # Let the API fetch the page itself
+            source = {"type": "url", "url": image_url}
+            bytes_sent = len(image_url)
+        else:
+            image_data, media_type = prepare_image(image_data, self.max_pixels)
+            source = {
+                "type": "base64",
+                "media_type": media_type,
+                "data": base64.standard_b64encode(image_data).decode("utf-8")
+            }
+            bytes_sent = len(source["data"])
 
+        started = time.time()
         response = self.client.messages.create(
             model=self.model,
             max_tokens=4096,
@@ -172,38 +392,42 @@ class ClaudeProvider(ModelProvider):
                     "content": [
                         {
                             "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/jpeg",
-                                "data": image_b64
-                            }
+                            "source": source
                         },
                         {
                             "type": "text",
-                            "text": TRANSCRIPTION_PROMPT
+                            "text": prompt
                         }
                     ]
                 }
             ]
         )
-        return response.content[0].text
+        self._record("transcribe", started, bytes_sent + len(prompt), response)
+        return response.content[0].text if response.content else ""
 
-    def translate_text(self, latin_text: str) -> str:
+    def complete(self, prompt: str) -> str:
+        started = time.time()
         response = self.client.messages.create(
             model=self.model,
             max_tokens=4096,
             messages=[
                 {
                     "role": "user",
-                    "content": TRANSLATION_PROMPT_TEMPLATE.format(latin_text=latin_text)
+                    "content": prompt
                 }
             ]
         )
-        return response.content[0].text
+        self._record("text", started, len(prompt.encode("utf-8")), response)
+        return response.content[0].text if response.content else ""
+
+    def _record(self, kind: str, started: float, bytes_sent: int, response):
+        usage = getattr(response, "usage", None)
+        self.metrics.record(kind, time.time() - started, bytes_sent,
+                            getattr(usage, "input_tokens", None), getattr(usage, "output_tokens", None))
 
 
 def get_provider(name: str) -> ModelProvider:
-    """Factory function to get the appropriate provider"""
+    """Factory function to get the appropriate provider (one shared instance per process)"""
     providers = {
         "openai": OpenAIProvider,
         "gemini": GeminiProvider,
@@ -213,11 +437,15 @@ def get_provider(name: str) -> ModelProvider:
     if name not in providers:
         raise ValueError(f"Unknown provider: {name}. Choose from: {list(providers.keys())}")
 
-    return providers[name]()
+    with _pool_lock:
+        if name not in _providers:
+            _providers[name] = providers[name]()
+        return _providers[name]
 
 
 class TranslationPipeline:
-    def __init__(self, identifier: str, provider_name: str = "openai", output_dir: Optional[Path] = None):
+    def __init__(self, identifier: str, provider_name: str = "openai", output_dir: Optional[Path] = None,
+                 requests_per_minute: Optional[float] = None):
         self.identifier = identifier
         self.output_dir = output_dir or DATA_DIR / identifier.replace("-", "_")
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -237,29 +465,16 @@ class TranslationPipeline:
         self.provider_name = provider_name
         self.provider = get_provider(provider_name)
 
-        # Load or initialize progress
-        self.progress = self._load_progress()
+        # Transcription and translation share the provider's request budget
+        rpm = requests_per_minute or PROVIDER_REQUESTS_PER_MINUTE[provider_name]
+        self.provider_limiter = RateLimiter(60.0 / rpm)
+        self.download_limiter = RateLimiter(DOWNLOAD_DELAY)
 
-    def _load_progress(self) -> Dict[str, Any]:
-        """Load progress from checkpoint file."""
-        if self.progress_file.exists():
-            with open(self.progress_file) as f:
-                return json.load(f)
-        return {
+        # Page checkpoints: progress.json snapshot plus an append-only journal
+        self.progress = ProgressJournal(self.progress_file, {
             "identifier": self.identifier,
             "provider": self.provider_name,
-            "started_at": datetime.now().isoformat(),
-            "completed_pages": [],
-            "failed_pages": [],
-            "last_page": 0,
-            "total_pages": None
-        }
-
-    def _save_progress(self):
-        """Save progress to checkpoint file."""
-        self.progress["updated_at"] = datetime.now().isoformat()
-        with open(self.progress_file, "w") as f:
-            json.dump(self.progress, f, indent=2)
+        })
 
     def _get_page_url(self, page_num: int) -> str:
         """Get Internet Archive page image URL."""
@@ -277,6 +492,7 @@ class TranslationPipeline:
         url = self._get_page_url(page_num)
 
         try:
+            self.download_limiter.wait()
             response = requests.get(url, allow_redirects=True, timeout=30)
 
             # Check for 302/404 (page doesn't exist)
@@ -300,35 +516,18 @@ class TranslationPipeline:
             return None
 
     def get_total_pages(self) -> int:
-        """Determine total number of pages in the book."""
+        """Determine the last page number of the book (pages are n0..n{last})."""
         if self.progress.get("total_pages"):
             return self.progress["total_pages"]
 
         print("Determining total page count...")
+        count = resolve_page_count(self.identifier)
+        last_page = max(count - 1, 0)
 
-        # Binary search for last page
-        low, high = 1, 1000
-
-        while low < high:
-            mid = (low + high + 1) // 2
-            url = self._get_page_url(mid)
-
-            try:
-                response = requests.head(url, allow_redirects=True, timeout=10)
-                content_type = response.headers.get("content-type", "")
-
-                if response.status_code == 200 and "image" in content_type:
-                    low = mid
-                else:
-                    high = mid - 1
-            except:
-                high = mid - 1
-
-        self.progress["total_pages"] = low
-        self._save_progress()
+        self.progress.set(total_pages=last_page)
 
-        print(f"Total pages: {low}")
-        return low
+        print(f"Total pages: {last_page}")
+        return last_page
 
     def transcribe_page(self, page_num: int, force: bool = False) -> Optional[str]:
         """Transcribe Latin text from page image using vision model."""
@@ -350,6 +549,7 @@ class TranslationPipeline:
             image_data = f.read()
 
         try:
+            self.provider_limiter.wait()
             transcription = self.provider.transcribe_image(image_data)
 
             # Save transcription
@@ -381,6 +581,7 @@ class TranslationPipeline:
                 transcription = f.read()
 
         try:
+            self.provider_limiter.wait()
             translation = self.provider.translate_text(transcription)
 
             # Save translation
@@ -409,8 +610,7 @@ class TranslationPipeline:
         transcription = self.transcribe_page(page_num, force=force)
         if not transcription:
             print(f"  Failed to transcribe page {page_num}")
-            self.progress["failed_pages"].append(page_num)
-            self._save_progress()
+            self.progress.mark_failed(page_num)
             return False
 
         # Translate
@@ -418,51 +618,144 @@ class TranslationPipeline:
         translation = self.translate_page(page_num, force=force)
         if not translation:
             print(f"  Failed to translate page {page_num}")
-            self.progress["failed_pages"].append(page_num)
-            self._save_progress()
+            self.progress.mark_failed(page_num)
             return False
 
         # Update progress
-        if page_num not in self.progress["completed_pages"]:
-            self.progress["completed_pages"].append(page_num)
-        self.progress["last_page"] = page_num
-        self._save_progress()
+        self.progress.mark_completed(page_num)
+        self.progress.set(last_page=page_num)
 
         print(f"  ✓ Page {page_num} complete")
         return True
 
-    def process_range(self, start: int, end: int, force: bool = False, delay: float = 1.0):
-        """Process a range of pages."""
+    def process_range(self, start: int, end: int, force: bool = False, delay: float = DOWNLOAD_DELAY,
+                      download_workers: int = DOWNLOAD_WORKERS, transcribe_workers: int = TRANSCRIBE_WORKERS,
+                      translate_workers: int = TRANSLATE_WORKERS):
+        """
+        Process a range of pages through a staged download/transcribe/translate pipeline.
+
+        Each stage has its own worker pool fed by a bounded queue, so pages
+        move on as soon as the previous stage is done with them. Page files
+        remain the checkpoints; page events are journaled from this thread.
+
+        Args:
+            start: First page number
+            end: Last page number (inclusive)
+            force: Reprocess pages that already have output files
+            delay: Minimum seconds between IA image downloads
+            download_workers: Concurrent page downloads
+            transcribe_workers: Concurrent vision transcriptions
+            translate_workers: Concurrent text translations
+        """
         total = end - start + 1
         completed = 0
         failed = 0
+        started = time.time()
+        self.download_limiter = RateLimiter(delay)
 
         print(f"\n{'='*60}")
         print(f"Processing pages {start} to {end} ({total} pages)")
         print(f"Identifier: {self.identifier}")
         print(f"Provider: {self.provider_name}")
+        print(f"Workers: {download_workers} download, {transcribe_workers} transcribe, {translate_workers} translate")
         print(f"Output: {self.output_dir}")
         print(f"{'='*60}")
 
+        pages = []
         for page_num in range(start, end + 1):
             # Skip already completed unless force
             if not force and page_num in self.progress["completed_pages"]:
                 print(f"\nSkipping page {page_num} (already completed)")
                 completed += 1
-                continue
+            else:
+                pages.append(page_num)
+
+        # Bounded queues keep fast stages from racing far ahead of slow ones
+        to_download = queue.Queue(maxsize=download_workers * 2)
+        to_transcribe = queue.Queue(maxsize=transcribe_workers * 2)
+        to_translate = queue.Queue(maxsize=translate_workers * 2)
+        outcomes = queue.Queue()
 
-            if self.process_page(page_num, force=force):
+        def feed():
+            for page_num in pages:
+                to_download.put(page_num)
+
+        def stage(inbox, work, outbox):
+            while True:
+                page_num = inbox.get()
+                if page_num is None:
+                    return
+                try:
+                    status = work(page_num)
+                except Exception as e:
+                    print(f"  Error on page {page_num}: {e}")
+                    status = "failed"
+                if status is None:
+                    outbox.put(page_num)
+                else:
+                    outcomes.put((page_num, status))
+
+        def download(page_num):
+            if not self.download_page(page_num, force=force):
+                return "unavailable"
+
+        def transcribe(page_num):
+            if not self.transcribe_page(page_num, force=force):
+                return "failed"
+
+        def translate(page_num):
+            return "done" if self.translate_page(page_num, force=force) else "failed"
+
+        stages = [(to_download, download, to_transcribe, download_workers),
+                  (to_transcribe, transcribe, to_translate, transcribe_workers),
+                  (to_translate, translate, None, translate_workers)]
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for inbox, work, outbox, workers in stages:
+            threads += [threading.Thread(target=stage, args=(inbox, work, outbox), daemon=True)
+                        for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        # last_page only advances past pages that have all finished, so --resume stays safe
+        finished = set()
+        watermark = pages[0] - 1 if pages else None
+
+        for n in range(len(pages)):
+            page_num, status = outcomes.get()
+            if status == "done":
                 completed += 1
+                self.progress.mark_completed(page_num)
+                print(f"  ✓ Page {page_num} complete")
+            elif status == "unavailable":
+                failed += 1
+                print(f"  Page {page_num} not available")
             else:
                 failed += 1
-
-            # Rate limiting
-            if delay > 0:
-                time.sleep(delay)
+                self.progress.mark_failed(page_num)
+                print(f"  Failed to process page {page_num}")
+
+            finished.add(page_num)
+            while watermark + 1 in finished:
+                watermark += 1
+                if watermark in self.progress.completed and watermark > self.progress["last_page"]:
+                    self.progress.set(last_page=watermark)
+
+            if (n + 1) % 10 == 0:
+                rate = (n + 1) / max(time.time() - started, 1e-9) * 60
+                print(f"  {n + 1}/{len(pages)} pages finished ({rate:.1f} pages/min)")
+
+        for inbox, _, _, workers in stages:
+            for _ in range(workers):
+                inbox.put(None)
+        for thread in threads:
+            thread.join()
+        self.progress.compact()
 
         print(f"\n{'='*60}")
-        print(f"COMPLETE: {completed}/{total} pages processed, {failed} failed")
+        print(f"COMPLETE: {completed}/{total} pages processed, {failed} failed "
+              f"in {time.time() - started:.0f}s")
         print(f"{'='*60}")
+        self.provider.metrics.report()
 
     def generate_combined_output(self):
         """Generate combined transcription and translation files."""
@@ -568,14 +861,21 @@ def main():
     parser.add_argument("--end", "-e", type=int, help="End page number")
     parser.add_argument("--resume", "-r", action="store_true", help="Resume from last page")
     parser.add_argument("--force", "-f", action="store_true", help="Force reprocess existing pages")
-    parser.add_argument("--delay", "-d", type=float, default=1.0, help="Delay between pages (seconds)")
+    parser.add_argument("--delay", "-d", type=float, default=DOWNLOAD_DELAY,
+                        help="Minimum seconds between IA image downloads")
+    parser.add_argument("--download-workers", type=int, default=DOWNLOAD_WORKERS, help="Concurrent page downloads")
+    parser.add_argument("--transcribe-workers", type=int, default=TRANSCRIBE_WORKERS,
+                        help="Concurrent vision transcription requests")
+    parser.add_argument("--translate-workers", type=int, default=TRANSLATE_WORKERS,
+                        help="Concurrent translation requests")
+    parser.add_argument("--rpm", type=float, help="Model requests per minute (default depends on provider)")
     parser.add_argument("--status", action="store_true", help="Show status only")
     parser.add_argument("--combine", action="store_true", help="Generate combined output files")
     parser.add_argument("--page", "-p", type=int, help="Process single page")
 
     args = parser.parse_args()
 
-    pipeline = TranslationPipeline(args.identifier, provider_name=args.provider)
+    pipeline = TranslationPipeline(args.identifier, provider_name=args.provider, requests_per_minute=args.rpm)
 
     if args.status:
         pipeline.status()
@@ -600,7 +900,10 @@ def main():
         print("Please specify --start and --end, or use --resume")
         sys.exit(1)
 
-    pipeline.process_range(start, end, force=args.force, delay=args.delay)
+    pipeline.process_range(start, end, force=args.force, delay=args.delay,
+                           download_workers=args.download_workers,
+                           transcribe_workers=args.transcribe_workers,
+                           translate_workers=args.translate_workers)
     pipeline.generate_combined_output()
 
 
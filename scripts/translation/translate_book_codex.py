@@ -16,7 +16,6 @@ Requirements:
 
 import os
 import sys
-import json
 import argparse
 import time
 import subprocess
@@ -24,7 +23,10 @@ import tempfile
 import requests
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional
+
+from ia_pages import resolve_page_count
+from progress_journal import ProgressJournal
 
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data" / "translations"
@@ -114,29 +116,11 @@ class TranslationPipeline:
         self.progress_file = self.output_dir / "progress.json"
         self.manifest_file = self.output_dir / "manifest.json"
 
-        # Load or initialize progress
-        self.progress = self._load_progress()
-
-    def _load_progress(self) -> Dict[str, Any]:
-        """Load progress from checkpoint file."""
-        if self.progress_file.exists():
-            with open(self.progress_file) as f:
-                return json.load(f)
-        return {
+        # Page checkpoints: progress.json snapshot plus an append-only journal
+        self.progress = ProgressJournal(self.progress_file, {
             "identifier": self.identifier,
             "provider": "codex",
-            "started_at": datetime.now().isoformat(),
-            "completed_pages": [],
-            "failed_pages": [],
-            "last_page": 0,
-            "total_pages": None
-        }
-
-    def _save_progress(self):
-        """Save progress to checkpoint file."""
-        self.progress["updated_at"] = datetime.now().isoformat()
-        with open(self.progress_file, "w") as f:
-            json.dump(self.progress, f, indent=2)
+        })
 
     def _get_page_url(self, page_num: int) -> str:
         """Get Internet Archive page image URL."""
@@ -173,34 +157,18 @@ class TranslationPipeline:
             return None
 
     def get_total_pages(self) -> int:
-        """Determine total number of pages in the book."""
+        """Determine the last page number of the book (pages are n0..n{last})."""
         if self.progress.get("total_pages"):
             return self.progress["total_pages"]
 
         print("Determining total page count...")
+        count = resolve_page_count(self.identifier)
+        last_page = max(count - 1, 0)
 
-        low, high = 1, 1000
-
-        while low < high:
-            mid = (low + high + 1) // 2
-            url = self._get_page_url(mid)
-
-            try:
-                response = requests.head(url, allow_redirects=True, timeout=10)
-                content_type = response.headers.get("content-type", "")
+        self.progress.set(total_pages=last_page)
 
-                if response.status_code == 200 and "image" in content_type:
-                    low = mid
-                else:
-                    high = mid - 1
-            except:
-                high = mid - 1
-
-        self.progress["total_pages"] = low
-        self._save_progress()
-
-        print(f"Total pages: {low}")
-        return low
+        print(f"Total pages: {last_page}")
+        return last_page
 
     def transcribe_page(self, page_num: int, force: bool = False) -> Optional[str]:
         """Transcribe Latin text from page image using Codex CLI."""
@@ -304,8 +272,7 @@ class TranslationPipeline:
         transcription = self.transcribe_page(page_num, force=force)
         if not transcription:
             print(f"  Failed to transcribe page {page_num}")
-            self.progress["failed_pages"].append(page_num)
-            self._save_progress()
+            self.progress.mark_failed(page_num)
             return False
 
         # Translate
@@ -313,15 +280,12 @@ class TranslationPipeline:
         translation = self.translate_page(page_num, force=force)
         if not translation:
             print(f"  Failed to translate page {page_num}")
-            self.progress["failed_pages"].append(page_num)
-            self._save_progress()
+            self.progress.mark_failed(page_num)
             return False
 
         # Update progress
-        if page_num not in self.progress["completed_pages"]:
-            self.progress["completed_pages"].append(page_num)
-        self.progress["last_page"] = page_num
-        self._save_progress()
+        self.progress.mark_completed(page_num)
+        self.progress.set(last_page=page_num)
 
         print(f"  ✓ Page {page_num} complete")
         return True
@@ -354,6 +318,8 @@ class TranslationPipeline:
             if delay > 0:
                 time.sleep(delay)
 
+        self.progress.compact()
+
         print(f"\n{'='*60}")
         print(f"COMPLETE: {completed}/{total} pages processed, {failed} failed")
         print(f"{'='*60}")
@@ -9,10 +9,18 @@ This worker:
 4. Translates Latin to English
 5. Reports progress back to the API
 
+Jobs are claimed under a lease that a heartbeat thread renews; a worker that
+dies simply stops renewing, and the job becomes claimable again. With
+--max-jobs N the worker holds up to N leases and processes pages from all of
+them on a shared pool, within per-provider rate limits.
+
 Usage:
     export WORKER_API_KEY="your-key"
     export OPENAI_API_KEY="your-key"
     python scripts/translation_worker.py --api-url http://localhost:3000
+    python scripts/translation_worker.py --api-url http://localhost:3000 --max-jobs 4 --page-workers 8
+
+    python scripts/translation/mock_worker_api.py --port 3001 --jobs 5   # local API for testing
 
 For production:
     python scripts/translation_worker.py --api-url https://secondrenaissance.vercel.app
@@ -24,9 +32,14 @@ import os
 import sys
 import time
 import json
+import uuid
+import socket
 import argparse
+import threading
 import requests
 import base64
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -34,13 +47,29 @@ from io import BytesIO
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "pipeline"))
+
+from ia_pages import resolve_page_count
+from progress_journal import ProgressJournal
+from rate_limiter import RateLimiter
+
+# Per-job working directory (rendered PDF pages, page result checkpoints)
+JOBS_DIR = Path("data/translation_jobs")
+
+# Concurrency
+LEASE_SECONDS = 120
+PAGE_WORKERS = 4
+
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
 try:
-    from translate_book import get_provider, ModelProvider
+    from translate_book import CallMetrics, DOWNLOAD_DELAY, PROVIDER_REQUESTS_PER_MINUTE, get_provider
     HAS_PROVIDERS = True
 except ImportError:
     HAS_PROVIDERS = False
-    print("Warning: translate_book.py not found, using direct OpenAI API")
+    DOWNLOAD_DELAY = 0.25
+    PROVIDER_REQUESTS_PER_MINUTE = {"claude": 50}
+    print("Warning: translate_book.py not importable, using direct Anthropic API")
 
 try:
     from de_mysteriis_processing import render_pdf_pages
@@ -58,14 +87,61 @@ class TranslationWorker:
         api_url: str,
         worker_key: str,
         poll_interval: int = 10,
-        provider_name: str = "openai"
+        provider_name: str = "openai",
+        max_jobs: int = 1,
+        page_workers: int = PAGE_WORKERS,
+        lease_seconds: int = LEASE_SECONDS,
+        requests_per_minute: Optional[float] = None,
+        image_urls: bool = False
     ):
+        """
+        Args:
+            api_url: Base URL of the webapp API
+            worker_key: Shared secret for the worker endpoints
+            poll_interval: Seconds between polls when idle
+            provider_name: LLM provider
+            max_jobs: Job leases held (and processed) at once
+            page_workers: Pages processed concurrently across all jobs
+            lease_seconds: Lease length; heartbeats renew it every third of that
+            requests_per_minute: Model request budget (default depends on provider)
+            image_urls: Send IA page URLs for the API to fetch instead of uploading images
+        """
         self.api_url = api_url.rstrip('/')
         self.worker_key = worker_key
         self.poll_interval = poll_interval
         self.provider_name = provider_name
+        self.max_jobs = max_jobs
+        self.page_workers = page_workers
+        self.lease_seconds = lease_seconds
+        self.image_urls = image_urls
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
         self.headers = {'X-Worker-Key': worker_key}
         self.session = requests.Session()
+        self.journals: Dict[str, ProgressJournal] = {}
+        # Model call metrics of each held job (the provider's are process-wide)
+        self.job_metrics: Dict[str, Any] = {}
+
+        # Leased jobs: job_id -> event set when the lease is lost
+        self.leases: Dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.pages = ThreadPoolExecutor(max_workers=page_workers, thread_name_prefix='page')
+
+        # All model calls currently go to Claude (see transcribe_image_claude)
+        rpm = requests_per_minute or PROVIDER_REQUESTS_PER_MINUTE['claude']
+        self.model_limiter = RateLimiter(60.0 / rpm)
+        self.download_limiter = RateLimiter(DOWNLOAD_DELAY)
+        self.anthropic_client = None  # only without translate_book (see claude_message)
+
+    def journal(self, job_id: str) -> ProgressJournal:
+        """Local checkpoint journal for a job, so a restarted worker reuses finished pages."""
+        with self.lock:
+            if job_id not in self.journals:
+                self.journals[job_id] = ProgressJournal(JOBS_DIR / job_id / "progress.json", {"job_id": job_id})
+            return self.journals[job_id]
+
+    def _result_path(self, job_id: str, page_num: int) -> Path:
+        return JOBS_DIR / job_id / "results" / f"page_{page_num:04d}.json"
 
     def poll_for_job(self) -> Optional[Dict[str, Any]]:
         """Poll API for next available job."""
@@ -73,6 +149,7 @@ class TranslationWorker:
             response = self.session.get(
                 f"{self.api_url}/api/worker/poll",
                 headers=self.headers,
+                params={'worker': self.worker_id, 'lease': self.lease_seconds},
                 timeout=30
             )
             if response.status_code == 200:
@@ -91,13 +168,19 @@ class TranslationWorker:
     def update_job(self, job_id: str, **kwargs) -> bool:
         """Report progress/results back to API."""
         try:
-            payload = {'jobId': job_id, **kwargs}
+            payload = {'jobId': job_id, 'workerId': self.worker_id, **kwargs}
             response = self.session.post(
                 f"{self.api_url}/api/worker/update",
                 headers=self.headers,
                 json=payload,
                 timeout=30
             )
+            if response.status_code == 409:
+                print(f"Lease lost for job {job_id}, another worker has it")
+                with self.lock:
+                    if job_id in self.leases:
+                        self.leases[job_id].set()
+                return False
             if response.status_code != 200:
                 print(f"Update error: {response.status_code} - {response.text}")
                 return False
@@ -110,6 +193,7 @@ class TranslationWorker:
         """Download a page image from Internet Archive."""
         url = f"https://archive.org/download/{identifier}/page/n{page_num}.jpg"
         try:
+            self.download_limiter.wait()
             response = self.session.get(url, timeout=60)
             if response.status_code == 200:
                 return response.content
@@ -123,87 +207,100 @@ class TranslationWorker:
             return None
 
     def detect_ia_page_count(self, identifier: str) -> int:
-        """Detect total pages in an IA item using binary search."""
-        # Try common page counts first
-        for test_page in [10, 50, 100, 200, 500]:
-            if self.download_ia_page(identifier, test_page) is None:
-                break
-            last_valid = test_page
-
-        # Binary search to find exact count
-        low, high = last_valid if 'last_valid' in dir() else 1, test_page
-        while low < high:
-            mid = (low + high + 1) // 2
-            if self.download_ia_page(identifier, mid) is not None:
-                low = mid
-            else:
-                high = mid - 1
+        """Total pages in an IA item, from its metadata (see ia_pages)."""
+        return resolve_page_count(identifier, self.session)
 
-        return low
+    def transcribe_image_claude(self, image_data: Optional[bytes], prompt: str,
+                                image_url: Optional[str] = None) -> str:
+        """Transcribe image using Claude's vision API (pooled client, downscaled upload).
 
-    def transcribe_image_claude(self, image_data: bytes, prompt: str) -> str:
-        """Transcribe image using Claude's vision API."""
-        import anthropic
-        client = anthropic.Anthropic()
+        With no image_data, the API fetches image_url itself.
+        """
+        self.model_limiter.wait()
+        if HAS_PROVIDERS:
+            return get_provider("claude").transcribe_image(image_data, prompt, image_url=image_url)
 
-        base64_image = base64.b64encode(image_data).decode('utf-8')
-
-        # Detect media type (assume JPEG for IA images)
-        media_type = "image/jpeg"
-
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4096,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": base64_image
-                            }
-                        },
-                        {"type": "text", "text": prompt}
-                    ]
-                }
-            ]
-        )
-
-        return response.content[0].text if response.content else ""
+        if image_data is None:
+            source = {"type": "url", "url": image_url}
+        else:
+            source = {"type": "base64", "media_type": "image/jpeg",
+                      "data": base64.b64encode(image_data).decode('utf-8')}
+        return self.claude_message([{"type": "image", "source": source},
+                                    {"type": "text", "text": prompt}])
 
     def translate_text_claude(self, text: str, prompt: str) -> str:
         """Translate text using Claude's API."""
-        import anthropic
-        client = anthropic.Anthropic()
-
         full_prompt = f"{prompt}\n\nLatin text:\n{text}"
 
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        self.model_limiter.wait()
+        if HAS_PROVIDERS:
+            return get_provider("claude").complete(full_prompt)
+        return self.claude_message(full_prompt)
+
+    def claude_message(self, content) -> str:
+        """Direct Anthropic call, used when translate_book's providers are unavailable."""
+        with self.lock:
+            if self.anthropic_client is None:
+                import anthropic
+                self.anthropic_client = anthropic.Anthropic()
+        response = self.anthropic_client.messages.create(
+            model=CLAUDE_MODEL,
             max_tokens=4096,
-            messages=[{"role": "user", "content": full_prompt}]
+            messages=[{"role": "user", "content": content}]
         )
-
         return response.content[0].text if response.content else ""
 
     def process_page(
         self,
         job_id: str,
         page_num: int,
-        image_data: bytes,
+        image_data: Optional[bytes],
         prompts: Dict[str, str],
         image_url: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Process a single page: OCR + translate."""
+        """Process a single page: OCR + translate.
+
+        Completed results are checkpointed under JOBS_DIR, so a page that was
+        finished before a crash or a lost update is re-reported, not re-run.
+        """
+        journal = self.journal(job_id)
+        result_path = self._result_path(job_id, page_num)
+        if page_num in journal.completed and result_path.exists():
+            with open(result_path) as f:
+                return json.load(f)
+
+        if HAS_PROVIDERS:
+            with self.lock:
+                metrics = self.job_metrics.setdefault(job_id, CallMetrics())
+            with get_provider("claude").metrics.scope(metrics):
+                result = self._process_page(page_num, image_data, prompts, image_url)
+        else:
+            result = self._process_page(page_num, image_data, prompts, image_url)
+
+        if result['status'] == 'completed':
+            result_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = result_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, result_path)
+            journal.mark_completed(page_num)
+        else:
+            journal.mark_failed(page_num)
+        return result
+
+    def _process_page(
+        self,
+        page_num: int,
+        image_data: Optional[bytes],
+        prompts: Dict[str, str],
+        image_url: Optional[str]
+    ) -> Dict[str, Any]:
         start_time = time.time()
 
         try:
             # OCR
             ocr_prompt = prompts.get('ocr', 'Transcribe the Latin text from this image.')
-            ocr_text = self.transcribe_image_claude(image_data, ocr_prompt)
+            ocr_text = self.transcribe_image_claude(image_data, ocr_prompt, image_url)
 
             # Translate
             translation_prompt = prompts.get('translation', 'Translate the following Latin text to English.')
@@ -237,6 +334,63 @@ class TranslationWorker:
                 'error_message': str(e)
             }
 
+    def process_pages(self, job_id: str, prompts: Dict[str, str], start_page: int, end_page: int,
+                      load_page) -> bool:
+        """
+        Process pages [start_page, end_page) on the shared page pool, reporting in order.
+
+        Args:
+            job_id: Job the pages belong to
+            prompts: Job prompts
+            start_page: First page index (0-based)
+            end_page: End page index (exclusive)
+            load_page: Callable page index -> (image_data, image_url), or None to skip
+
+        Returns:
+            False if the job's lease was lost and processing stopped
+        """
+        lost = self.leases.get(job_id) or threading.Event()
+
+        def run(page_num):
+            loaded = load_page(page_num)
+            if loaded is None:
+                return None
+            image_data, image_url = loaded
+            return self.process_page(job_id, page_num + 1, image_data, prompts, image_url)
+
+        # Keep a few pages per job queued so all jobs share the pool
+        window = deque()
+        upcoming = iter(range(start_page, end_page))
+        while True:
+            while len(window) < self.page_workers * 2:
+                page_num = next(upcoming, None)
+                if page_num is None:
+                    break
+                window.append((page_num, self.pages.submit(run, page_num)))
+            if not window:
+                return True
+
+            page_num, future = window.popleft()
+            result = future.result()
+            if lost.is_set() or self.stopping.is_set():
+                for _, pending in window:
+                    pending.cancel()
+                return False
+
+            if result is None:
+                print(f"  [{job_id[:8]}] Page {page_num + 1}/{end_page} not found, skipping")
+                continue
+
+            # Report progress
+            self.update_job(
+                job_id,
+                pages_processed=page_num + 1,
+                current_page=page_num + 1,
+                page_result=result
+            )
+            print(f"  [{job_id[:8]}] Page {page_num + 1}/{end_page} "
+                  f"{'done' if result['status'] == 'completed' else 'failed'}")
+
     def process_ia_job(self, job: Dict[str, Any]):
         """Process a job from Internet Archive."""
         job_id = job['id']
@@ -280,32 +434,17 @@ class TranslationWorker:
 
             print(f"Processing pages {start_page + 1} to {end_page}")
 
-            # Process pages
-            for page_num in range(start_page, end_page):
-                print(f"  Page {page_num + 1}/{end_page}...", end=" ", flush=True)
-
-                # Download image
+            def load_page(page_num):
+                image_url = f"https://archive.org/download/{identifier}/page/n{page_num}.jpg"
+                if self.image_urls:
+                    return None, image_url
                 image_data = self.download_ia_page(identifier, page_num)
                 if image_data is None:
-                    print("not found, skipping")
-                    continue
-
-                # Process
-                image_url = f"https://archive.org/download/{identifier}/page/n{page_num}.jpg"
-                result = self.process_page(job_id, page_num + 1, image_data, prompts, image_url)
-
-                # Report progress
-                self.update_job(
-                    job_id,
-                    pages_processed=page_num + 1,
-                    current_page=page_num + 1,
-                    page_result=result
-                )
-
-                print(f"{'done' if result['status'] == 'completed' else 'failed'}")
+                    return None
+                return image_data, image_url
 
-                # Rate limiting
-                time.sleep(1)
+            if not self.process_pages(job_id, prompts, start_page, end_page, load_page):
+                return
 
             # Update final status
             if status in ['pending', 'processing_preview']:
@@ -355,7 +494,7 @@ class TranslationWorker:
 
         try:
             # Set up output directory
-            output_dir = Path(f"data/translation_jobs/{job_id}")
+            output_dir = JOBS_DIR / job_id
             output_dir.mkdir(parents=True, exist_ok=True)
 
             if status == 'rendering':
@@ -368,7 +507,9 @@ class TranslationWorker:
                     start_page=1,
                     end_page=9999,
                     dpi=300,
-                    max_dim=1900
+                    max_dim=1900,
+                    # Up to max_jobs jobs may render at once; share the CPUs
+                    workers=max(1, (os.cpu_count() or 1) // self.max_jobs)
                 )
 
                 total_pages = len(records)
@@ -394,36 +535,15 @@ class TranslationWorker:
 
             print(f"Processing pages {start_page + 1} to {end_page}")
 
-            for page_num in range(start_page, end_page):
-                print(f"  Page {page_num + 1}/{end_page}...", end=" ", flush=True)
-
+            def load_page(page_num):
                 # Read processed image
                 image_path = output_dir / 'processed_images' / f'page_{page_num + 1:04d}_processed.jpg'
                 if not image_path.exists():
-                    print("not found, skipping")
-                    continue
-
-                with open(image_path, 'rb') as f:
-                    image_data = f.read()
+                    return None
+                return image_path.read_bytes(), str(image_path)
 
-                # Process
-                result = self.process_page(
-                    job_id,
-                    page_num + 1,
-                    image_data,
-                    prompts,
-                    str(image_path)
-                )
-
-                self.update_job(
-                    job_id,
-                    pages_processed=page_num + 1,
-                    current_page=page_num + 1,
-                    page_result=result
-                )
-
-                print(f"{'done' if result['status'] == 'completed' else 'failed'}")
-                time.sleep(1)
+            if not self.process_pages(job_id, prompts, start_page, end_page, load_page):
+                return
 
             # Update final status
             if status == 'processing_preview':
@@ -489,33 +609,13 @@ class TranslationWorker:
 
             print(f"Processing pages {start_page + 1} to {end_page}")
 
-            for i, page_num in enumerate(range(start_page, end_page)):
-                if page_num >= len(image_files):
-                    break
-
+            def load_page(page_num):
                 image_path = image_files[page_num]
-                print(f"  Page {page_num + 1}/{end_page}...", end=" ", flush=True)
+                return image_path.read_bytes(), str(image_path)
 
-                with open(image_path, 'rb') as f:
-                    image_data = f.read()
-
-                result = self.process_page(
-                    job_id,
-                    page_num + 1,
-                    image_data,
-                    prompts,
-                    str(image_path)
-                )
-
-                self.update_job(
-                    job_id,
-                    pages_processed=page_num + 1,
-                    current_page=page_num + 1,
-                    page_result=result
-                )
-
-                print(f"{'done' if result['status'] == 'completed' else 'failed'}")
-                time.sleep(1)
+            end_page = min(end_page, len(image_files))
+            if not self.process_pages(job_id, prompts, start_page, end_page, load_page):
+                return
 
             # Update final status
             if status in ['pending', 'processing_preview']:
@@ -543,38 +643,79 @@ class TranslationWorker:
 
     def process_job(self, job: Dict[str, Any]):
         """Route job to appropriate processor."""
-        if job.get('ia_identifier'):
-            self.process_ia_job(job)
-        elif job.get('pdf_path'):
-            self.process_pdf_job(job)
-        elif job.get('images_dir'):
-            self.process_images_job(job)
-        else:
-            self.update_job(
-                job['id'],
-                status='failed',
-                error_message='Job has no ia_identifier, pdf_path, or images_dir'
-            )
+        with self.lock:
+            self.leases[job['id']] = threading.Event()
+        try:
+            if job.get('ia_identifier'):
+                self.process_ia_job(job)
+            elif job.get('pdf_path'):
+                self.process_pdf_job(job)
+            elif job.get('images_dir'):
+                self.process_images_job(job)
+            else:
+                self.update_job(
+                    job['id'],
+                    status='failed',
+                    error_message='Job has no ia_identifier, pdf_path, or images_dir'
+                )
+        finally:
+            with self.lock:
+                lost = self.leases.pop(job['id']).is_set()
+                journal = self.journals.pop(job['id'], None)
+                metrics = self.job_metrics.pop(job['id'], None)
+            if journal:
+                journal.close()
+            if not lost:
+                self.update_job(job['id'], release=True)
+            if metrics:
+                print(f"Model calls for job {job['id']}:")
+                metrics.report()
+
+    def heartbeat(self):
+        """Renew the leases of all held jobs until the worker stops."""
+        while not self.stopping.wait(self.lease_seconds / 3):
+            with self.lock:
+                job_ids = list(self.leases)
+            for job_id in job_ids:
+                self.update_job(job_id, heartbeat=True, lease_seconds=self.lease_seconds)
 
     def run(self):
-        """Main loop: poll for jobs and process them."""
+        """Main loop: keep up to max_jobs leased jobs in progress."""
         print(f"Translation Worker started")
         print(f"API: {self.api_url}")
+        print(f"Worker: {self.worker_id}")
+        print(f"Jobs: up to {self.max_jobs} at once, {self.page_workers} page workers, "
+              f"{self.lease_seconds}s leases")
         print(f"Poll interval: {self.poll_interval}s")
         print("-" * 40)
 
+        threading.Thread(target=self.heartbeat, daemon=True).start()
+        jobs: List[threading.Thread] = []
+
         while True:
             try:
-                job = self.poll_for_job()
+                jobs = [thread for thread in jobs if thread.is_alive()]
+                job = self.poll_for_job() if len(jobs) < self.max_jobs else None
 
                 if job:
-                    self.process_job(job)
-                else:
+                    thread = threading.Thread(target=self.process_job, args=(job,), daemon=True)
+                    thread.start()
+                    jobs.append(thread)
+                    continue  # claim more right away while slots are free
+
+                if not jobs:
                     print(f"[{datetime.now().strftime('%H:%M:%S')}] No jobs, sleeping {self.poll_interval}s...")
-                    time.sleep(self.poll_interval)
+                time.sleep(self.poll_interval)
 
             except KeyboardInterrupt:
                 print("\nShutting down...")
+                self.stopping.set()
+                # Hand unfinished jobs back so other workers pick them up at once
+                with self.lock:
+                    job_ids = list(self.leases)
+                for job_id in job_ids:
+                    self.update_job(job_id, release=True)
+                self.pages.shutdown(wait=False, cancel_futures=True)
                 break
             except Exception as e:
                 print(f"Worker error: {e}")
@@ -602,6 +743,34 @@ def main():
         choices=['openai', 'gemini', 'claude'],
         help='LLM provider to use (default: openai)'
     )
+    parser.add_argument(
+        '--max-jobs',
+        type=int,
+        default=1,
+        help='Jobs to lease and process at once (default: 1)'
+    )
+    parser.add_argument(
+        '--page-workers',
+        type=int,
+        default=PAGE_WORKERS,
+        help=f'Pages processed concurrently across all jobs (default: {PAGE_WORKERS})'
+    )
+    parser.add_argument(
+        '--lease-seconds',
+        type=int,
+        default=LEASE_SECONDS,
+        help=f'Job lease length, renewed by heartbeats (default: {LEASE_SECONDS})'
+    )
+    parser.add_argument(
+        '--image-urls',
+        action='store_true',
+        help='Let the model API fetch IA page images by URL instead of uploading them'
+    )
+    parser.add_argument(
+        '--rpm',
+        type=float,
+        help='Model requests per minute across all jobs (default depends on provider)'
+    )
     args = parser.parse_args()
 
     worker_key = os.environ.get('WORKER_API_KEY')
@@ -617,7 +786,12 @@ def main():
         api_url=args.api_url,
         worker_key=worker_key,
         poll_interval=args.poll_interval,
-        provider_name=args.provider
+        provider_name=args.provider,
+        max_jobs=args.max_jobs,
+        page_workers=args.page_workers,
+        lease_seconds=args.lease_seconds,
+        requests_per_minute=args.rpm,
+        image_urls=args.image_urls
     )
 
     worker.run()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Blocked deduplication engine for the Latin master bibliography.
+
+Replaces the row-by-row scan in RecordDeduplicator.find_duplicate_groups:
+1. Precompute normalized title/author/place columns once
+2. Generate candidate pairs from several blocking keys
+   (title prefix + year bucket, surname + year bucket, and the shared
+   MinHash LSH title index from matching/title_lsh.py);
+   oversized blocks fall back to a sorted neighbourhood over the title
+3. Score all candidate pairs at once with the deduplicator's vectorized scorers
+4. Build groups as connected components with union-find
+"""
+
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Shared MinHash LSH index lives with the matching scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "matching"))
+from title_lsh import TitleLSHIndex
+
+logger = logging.getLogger(__name__)
+
+
+class UnionFind:
+    """Disjoint-set forest over positions 0..n-1 (path halving, union by size)."""
+
+    def __init__(self, n: int):
+        self.parent = np.arange(n, dtype=np.int64)
+        self.size = np.ones(n, dtype=np.int64)
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return int(x)
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+    def components(self) -> Dict[int, List[int]]:
+        """Map root -> sorted member positions."""
+        groups: Dict[int, List[int]] = {}
+        for x in range(len(self.parent)):
+            groups.setdefault(self.find(x), []).append(x)
+        return groups
+
+
+class BlockedDeduplicationEngine:
+    """
+    Candidate generation and grouping for RecordDeduplicator.
+
+    Scoring and thresholds come from the deduplicator; this class only
+    decides which pairs get scored and how matched pairs become groups.
+    """
+
+    def __init__(self, deduplicator, config: Dict = None):
+        """
+        Args:
+            deduplicator: RecordDeduplicator providing normalization and scoring
+            config: Blocking parameters (max_block_size, window,
+                    lsh_bands, lsh_rows, lsh_cache)
+        """
+        self.dedup = deduplicator
+        config = config or {}
+        self.max_block_size = config.get('max_block_size', 200)
+        self.window = config.get('window', 20)
+        self.lsh_bands = config.get('lsh_bands', 8)
+        self.lsh_rows = config.get('lsh_rows', 4)
+        self.lsh_cache = config.get('lsh_cache')
+
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Precompute the normalized columns used for blocking and scoring.
+
+        Returns:
+            Frame aligned positionally with ``df`` (RangeIndex)
+        """
+        def column(name):
+            if name in df.columns:
+                return df[name].reset_index(drop=True)
+            return pd.Series([None] * len(df), dtype=object)
+
+        normalize = self.dedup.normalize_text
+        title = column('title')
+        author = column('author')
+        place = column('publication_place')
+
+        prepared = pd.DataFrame({
+            'title_missing': title.isna().to_numpy(),
+            'author_missing': author.isna().to_numpy(),
+            'place_missing': place.isna().to_numpy(),
+            'title_norm': title.map(normalize),
+            'author_norm': author.map(normalize),
+            'place_norm': place.map(normalize),
+            'year': pd.to_numeric(column('publication_year'), errors='coerce'),
+        })
+
+        prepared['surname'] = prepared['author_norm'].str.split().str[-1].fillna('')
+        prepared['title_prefix'] = prepared['title_norm'].str[:3]
+        prepared['year_bucket'] = (prepared['year'].fillna(0).astype(int) // 5).astype(str)
+        prepared['title_keywords'] = prepared['title_norm'].map(self.dedup.extract_keywords)
+
+        return prepared
+
+    def _block_pairs(self, positions: np.ndarray, titles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """All pairs in a small block; a sorted title neighbourhood in a large one."""
+        m = len(positions)
+        if m <= self.max_block_size:
+            i, j = np.triu_indices(m, k=1)
+            return positions[i], positions[j]
+
+        ordered = positions[np.argsort(titles[positions], kind='stable')]
+        left, right = [], []
+        for offset in range(1, min(self.window, m - 1) + 1):
+            left.append(ordered[:-offset])
+            right.append(ordered[offset:])
+        return np.concatenate(left), np.concatenate(right)
+
+    def build_lsh(self, prepared: pd.DataFrame) -> TitleLSHIndex:
+        """MinHash LSH index over the normalized titles (row = position)."""
+        ids = [str(i) for i in range(len(prepared))]
+        titles = prepared['title_norm'].tolist()
+        params = dict(bands=self.lsh_bands, rows=self.lsh_rows, max_bucket_size=None)
+        if self.lsh_cache:
+            return TitleLSHIndex.load_or_build(Path(self.lsh_cache), ids, titles, **params)
+        return TitleLSHIndex(**params).build(ids, titles)
+
+    def candidate_pairs(self, prepared: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Union of candidate pairs over all blocking keys.
+
+        Returns:
+            (left, right) position arrays with left < right, each pair once
+        """
+        n = len(prepared)
+        titles = prepared['title_norm'].to_numpy(dtype=object)
+
+        key_passes = {
+            'title_prefix+year': np.where(
+                prepared['title_prefix'] != '',
+                prepared['title_prefix'] + '|' + prepared['year_bucket'], ''),
+            'surname+year': np.where(
+                prepared['surname'] != '',
+                prepared['surname'] + '|' + prepared['year_bucket'], ''),
+        }
+
+        encoded = []
+        for name, keys in key_passes.items():
+            blocks = (positions for key, positions in pd.Series(keys).groupby(keys).indices.items()
+                      if key != '')
+            pairs = self._encode_block_pairs(blocks, titles, n)
+            logger.debug(f"Blocking pass {name}: {len(pairs)} candidate pairs")
+            encoded.append(pairs)
+
+        pairs = self._encode_block_pairs(self.build_lsh(prepared).buckets(), titles, n)
+        logger.debug(f"Blocking pass title_lsh: {len(pairs)} candidate pairs")
+        encoded.append(pairs)
+
+        unique = np.unique(np.concatenate(encoded))
+        return unique // n, unique % n
+
+    def _encode_block_pairs(self, blocks: Iterable[np.ndarray], titles: np.ndarray,
+                            n: int) -> np.ndarray:
+        """Pairs from every block, encoded as lo * n + hi."""
+        encoded = [np.zeros(0, dtype=np.int64)]
+        for positions in blocks:
+            if len(positions) < 2:
+                continue
+            left, right = self._block_pairs(np.asarray(positions, dtype=np.int64), titles)
+            encoded.append(np.minimum(left, right) * n + np.maximum(left, right))
+        return np.concatenate(encoded)
+
+    def score_pairs(self, prepared: pd.DataFrame,
+                    left: np.ndarray, right: np.ndarray) -> Dict[str, np.ndarray]:
+        """Field and overall similarity for every candidate pair."""
+        dedup = self.dedup
+        col = lambda name, idx: prepared[name].to_numpy()[idx]
+
+        scores = {}
+        scores['title'] = dedup.score_normalized_titles(
+            col('title_norm', left).tolist(), col('title_norm', right).tolist(),
+            col('title_keywords', left).tolist(), col('title_keywords', right).tolist(),
+        )
+        scores['title'][col('title_missing', left) | col('title_missing', right)] = 0.0
+
+        scores['author'] = dedup.score_normalized_authors(
+            col('author_norm', left).tolist(), col('author_norm', right).tolist(),
+        )
+        scores['author'][col('author_missing', left) | col('author_missing', right)] = 0.0
+
+        scores['date'] = dedup.score_years(col('year', left), col('year', right))
+
+        scores['place'] = dedup.score_normalized_places(
+            col('place_norm', left).tolist(), col('place_norm', right).tolist(),
+        )
+        scores['place'][col('place_missing', left) | col('place_missing', right)] = 0.0
+
+        scores['overall'] = sum(scores[field] * weight
+                                for field, weight in dedup.weights.items())
+        return scores
+
+    def find_groups(self, df: pd.DataFrame) -> List[List]:
+        """
+        Group duplicate records.
+
+        Returns:
+            Duplicate groups (lists of index labels, ordered by position),
+            followed by one single-element group per non-duplicate record
+        """
+        prepared = self.prepare(df)
+        left, right = self.candidate_pairs(prepared)
+        logger.info(f"Scoring {len(left)} candidate pairs "
+                    f"(vs {len(df) * (len(df) - 1) // 2} exhaustive)")
+
+        uf = UnionFind(len(df))
+        if len(left):
+            scores = self.score_pairs(prepared, left, right)
+            is_duplicate = ((scores['overall'] >= self.dedup.overall_score_threshold) &
+                            (scores['title'] >= self.dedup.title_similarity_threshold) &
+                            (scores['author'] >= self.dedup.author_similarity_threshold))
+            for a, b in zip(left[is_duplicate].tolist(), right[is_duplicate].tolist()):
+                uf.union(a, b)
+
+        labels = df.index
+        components = sorted(uf.components().values(), key=lambda members: members[0])
+        duplicates = [[labels[p] for p in members] for members in components if len(members) > 1]
+        singles = [[labels[members[0]]] for members in components if len(members) == 1]
+        return duplicates + singles
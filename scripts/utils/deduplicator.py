@@ -5,6 +5,7 @@ Implements record matching and merging across multiple catalogues.
 """
 
 import re
+import sys
 import hashlib
 import pandas as pd
 import numpy as np
@@ -15,6 +16,12 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+# Shared batched scorer lives with the matching scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "matching"))
+from fuzzy_scoring import score_pairs
+
+from dedup_engine import BlockedDeduplicationEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,6 +53,9 @@ class RecordDeduplicator:
             'place': 0.1
         })
 
+        # Candidate blocking for find_duplicate_groups
+        self.engine = BlockedDeduplicationEngine(self, self.config.get('blocking', {}))
+
         # Statistics
         self.stats = {
             'total_records': 0,
@@ -112,37 +122,137 @@ class RecordDeduplicator:
         Returns:
             Similarity score between 0 and 1
         """
-        if pd.isna(title1) or pd.isna(title2):
-            return 0.0
+        return float(self.calculate_title_similarities([title1], [title2])[0])
+
+    def calculate_title_similarities(self, titles1: List[str], titles2: List[str]) -> np.ndarray:
+        """
+        Calculate similarity between titles1[i] and titles2[i] for every i.
+
+        The string scores for all pairs are computed in batched rapidfuzz
+        calls spread over all cores.
+
+        Args:
+            titles1: First titles
+            titles2: Second titles (same length)
+
+        Returns:
+            Array of similarity scores between 0 and 1
+        """
+        missing = np.array([pd.isna(t1) or pd.isna(t2) for t1, t2 in zip(titles1, titles2)],
+                           dtype=bool)
 
         # Normalize both titles
-        norm1 = self.normalize_text(title1)
-        norm2 = self.normalize_text(title2)
+        norm1 = [self.normalize_text(t) for t in titles1]
+        norm2 = [self.normalize_text(t) for t in titles2]
+
+        combined = self.score_normalized_titles(
+            norm1, norm2,
+            [self.extract_keywords(t) for t in norm1],
+            [self.extract_keywords(t) for t in norm2],
+        )
+        combined[missing] = 0.0
+        return combined
+
+    def score_normalized_titles(self, norm1: List[str], norm2: List[str],
+                                keywords1: List[Set[str]], keywords2: List[Set[str]]) -> np.ndarray:
+        """
+        Pairwise title similarity for already-normalized titles.
 
+        Args:
+            norm1, norm2: Normalized titles (same length)
+            keywords1, keywords2: Keyword sets for each title
+
+        Returns:
+            Array of similarity scores between 0 and 1
+        """
         # Direct string similarity
-        direct_similarity = fuzz.ratio(norm1, norm2) / 100.0
+        direct_similarity = score_pairs(norm1, norm2, scorer=fuzz.ratio) / 100.0
 
         # Token-based similarity
-        token_similarity = fuzz.token_set_ratio(norm1, norm2) / 100.0
+        token_similarity = score_pairs(norm1, norm2, scorer=fuzz.token_set_ratio) / 100.0
 
         # Keyword overlap
-        keywords1 = self.extract_keywords(title1)
-        keywords2 = self.extract_keywords(title2)
-
-        if not keywords1 and not keywords2:
-            keyword_similarity = 1.0
-        elif not keywords1 or not keywords2:
-            keyword_similarity = 0.0
-        else:
-            intersection = keywords1 & keywords2
-            union = keywords1 | keywords2
-            keyword_similarity = len(intersection) / len(union) if union else 0.0
+        keyword_similarity = np.array([
+            self._keyword_overlap(k1, k2) for k1, k2 in zip(keywords1, keywords2)
+        ], dtype=np.float64)
 
         # Weighted combination
         return (direct_similarity * 0.3 +
                 token_similarity * 0.4 +
                 keyword_similarity * 0.3)
 
+    def score_normalized_authors(self, norm1: List[str], norm2: List[str]) -> np.ndarray:
+        """
+        Pairwise author similarity for already-normalized names.
+
+        Same rules as calculate_author_similarity, scored in one batch.
+
+        Returns:
+            Array of similarity scores between 0 and 1
+        """
+        similarity = score_pairs(norm1, norm2, scorer=fuzz.ratio) / 100.0
+
+        for i, (a1, a2) in enumerate(zip(norm1, norm2)):
+            words1 = a1.split()
+            words2 = a2.split()
+
+            # Exact surname (last word) match
+            if words1 and words2 and words1[-1] == words2[-1]:
+                similarity[i] = 1.0
+                continue
+
+            # Bonus for matching first letters of words
+            if words1 and len(words1) == len(words2):
+                matching_initials = sum(1 for w1, w2 in zip(words1, words2) if w1[0] == w2[0])
+                similarity[i] += (matching_initials / len(words1)) * 0.2
+
+        return np.minimum(similarity, 1.0)
+
+    def score_years(self, years1: np.ndarray, years2: np.ndarray) -> np.ndarray:
+        """
+        Pairwise publication year similarity (NaN = unknown).
+
+        Same bands as calculate_date_similarity.
+        """
+        years1 = np.asarray(years1, dtype=np.float64)
+        years2 = np.asarray(years2, dtype=np.float64)
+        diff = np.abs(years1 - years2)
+
+        return np.select(
+            [np.isnan(diff), diff == 0, diff <= 1, diff <= 2,
+             diff <= self.date_tolerance_years, diff <= self.date_tolerance_years * 2],
+            [0.0, 1.0, 0.9, 0.7, 0.5, 0.3],
+            default=0.1,
+        )
+
+    def score_normalized_places(self, norm1: List[str], norm2: List[str]) -> np.ndarray:
+        """
+        Pairwise place similarity for already-normalized places.
+
+        Same rules as calculate_place_similarity, scored in one batch.
+        """
+        similarity = score_pairs(norm1, norm2, scorer=fuzz.ratio) / 100.0
+
+        # Bonus for exact word matches
+        for i, (p1, p2) in enumerate(zip(norm1, norm2)):
+            words1 = set(p1.split())
+            words2 = set(p2.split())
+            if words1 and words2:
+                word_overlap = len(words1 & words2) / len(words1 | words2)
+                similarity[i] = max(similarity[i], word_overlap)
+
+        return similarity
+
+    @staticmethod
+    def _keyword_overlap(keywords1: Set[str], keywords2: Set[str]) -> float:
+        """Jaccard overlap of two keyword sets."""
+        if not keywords1 and not keywords2:
+            return 1.0
+        if not keywords1 or not keywords2:
+            return 0.0
+        union = keywords1 | keywords2
+        return len(keywords1 & keywords2) / len(union) if union else 0.0
+
     def calculate_author_similarity(self, author1: str, author2: str) -> float:
         """
         Calculate similarity between two author names.
@@ -177,7 +287,7 @@ class RecordDeduplicator:
 
         # Bonus for matching first letters of words
         bonus = 0.0
-        if len(words1) == len(words2):
+        if words1 and len(words1) == len(words2):
             matching_initials = sum(1 for w1, w2 in zip(words1, words2)
                                    if w1[0] == w2[0])
             bonus = (matching_initials / len(words1)) * 0.2
@@ -311,6 +421,10 @@ class RecordDeduplicator:
         """
         Find groups of duplicate records.
 
+        Only pairs sharing a blocking key (title prefix, surname, year bucket,
+        title MinHash band) are compared; matched pairs are joined
+        transitively into groups.
+
         Args:
             df: DataFrame of records to deduplicate
 
@@ -320,64 +434,22 @@ class RecordDeduplicator:
         logger.info(f"Finding duplicate groups in {len(df)} records")
         start_time = datetime.now()
 
-        # Create normalized versions for faster matching
+        # Normalized columns are part of the output schema
         df['title_normalized'] = df['title'].apply(self.normalize_text)
         df['author_normalized'] = df['author'].apply(self.normalize_text)
 
-        # Group by basic criteria first (year, first letter of title/author)
-        df['title_first'] = df['title_normalized'].str[:3]
-        df['author_first'] = df['author_normalized'].str[:3]
-        df['year_bucket'] = df['publication_year'].fillna(0).astype(int) // 5
-
-        # Find potential matches within groups
-        groups = []
-        processed = set()
-
-        for idx, record in df.iterrows():
-            if idx in processed:
-                continue
-
-            # Find potential matches
-            matches = [idx]
-            processed.add(idx)
-
-            # Filter potential matches by basic criteria
-            potential_matches = df[
-                (df.index != idx) &
-                (~df.index.isin(processed)) &
-                (df['year_bucket'] == record['year_bucket']) &
-                (df['title_first'] == record['title_first'])
-            ]
-
-            # Check each potential match
-            for match_idx, match_record in potential_matches.iterrows():
-                is_duplicate, scores = self.is_duplicate_pair(
-                    record.to_dict(), match_record.to_dict()
-                )
-
-                if is_duplicate:
-                    matches.append(match_idx)
-                    processed.add(match_idx)
-
-            if len(matches) > 1:
-                groups.append(matches)
-
-        # Add single records (non-duplicates)
-        all_indices = set(df.index)
-        duplicate_indices = set(idx for group in groups for idx in group)
-        single_indices = list(all_indices - duplicate_indices)
-
-        for idx in single_indices:
-            groups.append([idx])
+        # Multi-key blocking, vectorized pair scoring, union-find grouping
+        groups = self.engine.find_groups(df)
+        single_count = sum(1 for g in groups if len(g) == 1)
 
         end_time = datetime.now()
         self.stats['processing_time'] = (end_time - start_time).total_seconds()
         self.stats['total_records'] = len(df)
-        self.stats['duplicate_groups'] = len([g for g in groups if len(g) > 1])
+        self.stats['duplicate_groups'] = len(groups) - single_count
         self.stats['unique_records'] = len(groups)
 
         logger.info(f"Found {self.stats['duplicate_groups']} duplicate groups "
-                   f"and {len(single_indices)} unique records "
+                   f"and {single_count} unique records "
                    f"in {self.stats['processing_time']:.2f} seconds")
 
         return groups
@@ -394,7 +466,7 @@ class RecordDeduplicator:
             Merged master record
         """
         if len(group) == 1:
-            return df.iloc[group[0]].to_dict()
+            return df.loc[group[0]].to_dict()
 
         # Get records in the group
         group_records = df.loc[group].copy()
@@ -558,8 +630,8 @@ class RecordDeduplicator:
 
         for i in range(len(group)):
             for j in range(i + 1, len(group)):
-                record1 = group_records.iloc[group[i]].to_dict()
-                record2 = group_records.iloc[group[j]].to_dict()
+                record1 = group_records.loc[group[i]].to_dict()
+                record2 = group_records.loc[group[j]].to_dict()
                 scores = self.calculate_overall_similarity(record1, record2)
                 similarities.append(scores['overall'])
 
@@ -4,6 +4,7 @@ Digitization Status Checker - Identifies which works have digital facsimiles
 and which are missing from major digital libraries.
 """
 
+import re
 import requests
 import time
 import logging
@@ -11,6 +12,8 @@ from typing import Dict, List, Optional, Set
 from urllib.parse import quote
 import pandas as pd
 
+from response_cache import DAY, cached_get
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,16 +22,21 @@ class DigitizationChecker:
     Checks digitization status across major digital libraries.
     """
 
+    CACHE_NAMESPACE = 'digitization'
+
     def __init__(self, config: Dict = None):
         """
         Initialize digitization checker.
 
         Args:
             config: Configuration dictionary for rate limiting and APIs
+                    ('use_cache' and 'cache_ttl_days' control response caching)
         """
         self.config = config or {}
         self.requests_per_second = self.config.get('requests_per_second', 2)
         self.last_request_time = 0
+        self.use_cache = self.config.get('use_cache', True)
+        self.cache_ttl = self.config.get('cache_ttl_days', 30) * DAY
 
         # Digital library APIs and search patterns
         self.digital_sources = {
@@ -66,6 +74,12 @@ class DigitizationChecker:
 
         self.last_request_time = time.time()
 
+    def _get(self, url: str, params: Dict, as_text: bool = False):
+        """Rate-limited, cached GET (see response_cache.cached_get)."""
+        return cached_get(requests, url, params, limiter=self._rate_limit,
+                          namespace=self.CACHE_NAMESPACE, as_text=as_text,
+                          ttl=self.cache_ttl, use_cache=self.use_cache)
+
     def check_google_books(self, title: str, author: str, year: int = None) -> Dict:
         """
         Check Google Books for digitization status.
@@ -88,8 +102,6 @@ class DigitizationChecker:
         }
 
         try:
-            self._rate_limit()
-
             # Build search queries
             queries = []
 
@@ -116,14 +128,7 @@ class DigitizationChecker:
                     'orderBy': 'relevance'
                 }
 
-                response = requests.get(
-                    self.digital_sources['google_books']['base_url'],
-                    params=params,
-                    timeout=30
-                )
-                response.raise_for_status()
-
-                data = response.json()
+                data = self._get(self.digital_sources['google_books']['base_url'], params)
 
                 if 'items' in data:
                     result['found'] = True
@@ -187,8 +192,6 @@ class DigitizationChecker:
         }
 
         try:
-            self._rate_limit()
-
             # Build search queries
             search_terms = []
             if title:
@@ -212,14 +215,7 @@ class DigitizationChecker:
                 'rows': 20
             }
 
-            response = requests.get(
-                self.digital_sources['internet_archive']['base_url'],
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get(self.digital_sources['internet_archive']['base_url'], params)
 
             if 'response' in data and 'docs' in data['response']:
                 docs = data['response']['docs']
@@ -307,8 +303,6 @@ class DigitizationChecker:
         }
 
         try:
-            self._rate_limit()
-
             # Build search query for Gallica API
             search_terms = []
             if title:
@@ -331,16 +325,14 @@ class DigitizationChecker:
                 'maximumRecords': 10
             }
 
-            response = requests.get(sru_url, params=params, timeout=30)
-            response.raise_for_status()
+            text = self._get(sru_url, params, as_text=True)
 
             # Parse Gallica SRU response (XML format)
             # This is simplified - would need proper XML parsing
-            if response.text and '<zs:numberOfRecords>' in response.text:
+            if text and '<zs:numberOfRecords>' in text:
                 result['found'] = True
                 # Extract record count (simplified)
-                import re
-                match = re.search(r'<zs:numberOfRecords>(\d+)</zs:numberOfRecords>', response.text)
+                match = re.search(r'<zs:numberOfRecords>(\d+)</zs:numberOfRecords>', text)
                 if match:
                     result['record_count'] = int(match.group(1))
 
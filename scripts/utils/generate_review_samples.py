@@ -20,6 +20,8 @@ from collections import defaultdict
 
 from supabase import create_client
 
+from supabase_reader import iter_rows_parallel
+
 # Configuration
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "human_review"
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "https://ykhxaecbbxaaqlujuzde.supabase.co")
@@ -38,22 +40,11 @@ def get_supabase_client():
 
 def load_bph_works(year_min=1400, year_max=1700):
     """Load BPH Latin works from the target period."""
-    client = get_supabase_client()
-
-    all_works = []
-    offset = 0
-
-    while True:
-        result = client.table('bph_works').select(
-            'id, title, author, year, ubn, detected_language'
-        ).eq('detected_language', 'Latin').gte('year', year_min).lte('year', year_max).range(offset, offset + 999).execute()
-
-        if not result.data:
-            break
-        all_works.extend(result.data)
-        offset += 1000
-
-    return all_works
+    return list(iter_rows_parallel(
+        get_supabase_client, 'bph_works', 'id, title, author, year, ubn, detected_language', key='id',
+        filters=[('eq', 'detected_language', 'Latin'),
+                 ('gte', 'year', year_min), ('lte', 'year', year_max)],
+    ))
 
 
 def sample_for_latin_validation(works, n=SAMPLES_PER_CATEGORY):
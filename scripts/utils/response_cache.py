@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed cache for API responses and LLM verdicts.
+
+Entries live in one SQLite file keyed by a SHA-256 of (namespace, model,
+request payload), so a re-run or threshold sweep reuses every IA search,
+catalogue lookup and Claude verdict it has already paid for. Each entry has
+an optional expiry, and the file is kept under a size budget by evicting
+the least recently used entries.
+
+Set RESPONSE_CACHE=off to bypass the cache, or RESPONSE_CACHE_PATH to use
+another file.
+
+Usage:
+    from response_cache import cached, cached_get
+
+    docs = cached('ia_search', params, lambda: fetch(params), ttl=IA_SEARCH_TTL)
+    data = cached_get(session, url, params, limiter=rate_limit, namespace='catalogue')
+
+    python response_cache.py            # show per-namespace statistics
+    python response_cache.py --clear ia_search
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "responses.sqlite"
+MAX_BYTES = 512 * 1024 * 1024
+DAY = 24 * 3600
+
+_MISSING = object()
+_default = None
+
+
+class ResponseCache:
+    """SQLite key/value store with per-entry TTL and LRU size bound."""
+
+    def __init__(self, path: Path = CACHE_PATH, max_bytes: int = MAX_BYTES):
+        """
+        Args:
+            path: SQLite file (created with its directory if missing)
+            max_bytes: Total stored payload size before LRU eviction
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                expires REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def key(namespace: str, payload: Any, model: str = '') -> str:
+        """Hash of the request; payload must be JSON-serializable."""
+        text = json.dumps([namespace, model, payload], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                self.misses += 1
+                return default
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, value: Any, namespace: str = '', ttl: Optional[float] = None):
+        """Store a JSON-serializable value, expiring after ``ttl`` seconds if given."""
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, value, size, created, accessed, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, blob, len(blob), now, now, now + ttl if ttl else None),
+            )
+            self._size += len(blob) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def cached(self, namespace: str, payload: Any, fetch: Callable[[], Any],
+               model: str = '', ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached response for ``payload`` or fetch and store it.
+
+        Exceptions from ``fetch`` propagate and nothing is stored, so failed
+        requests are retried on the next run.
+        """
+        key = self.key(namespace, payload, model)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fetch()
+            self.set(key, value, namespace, ttl)
+        return value
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones down to 90% of the budget."""
+        self._db.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        target = int(self.max_bytes * 0.9)
+        if self._size <= target:
+            return
+        excess = self._size - target
+        cutoff = self._db.execute("""
+            SELECT accessed FROM (
+                SELECT accessed, SUM(size) OVER (ORDER BY accessed) AS freed FROM entries
+            ) WHERE freed >= ? ORDER BY accessed LIMIT 1
+        """, (excess,)).fetchone()
+        if cutoff:
+            self._db.execute("DELETE FROM entries WHERE accessed <= ?", (cutoff[0],))
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def clear(self, namespace: Optional[str] = None):
+        with self._lock:
+            if namespace:
+                self._db.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            else:
+                self._db.execute("DELETE FROM entries")
+            self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Entry count and stored bytes per namespace."""
+        rows = self._db.execute(
+            "SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace ORDER BY namespace"
+        ).fetchall()
+        return {namespace: {'entries': count, 'bytes': size} for namespace, count, size in rows}
+
+
+def default_cache() -> Optional[ResponseCache]:
+    """Shared cache at RESPONSE_CACHE_PATH (or CACHE_PATH); None if RESPONSE_CACHE=off."""
+    global _default
+    if os.environ.get('RESPONSE_CACHE', '').lower() in ('0', 'off', 'false', 'no'):
+        return None
+    if _default is None:
+        _default = ResponseCache(Path(os.environ.get('RESPONSE_CACHE_PATH', CACHE_PATH)))
+    return _default
+
+
+def cached(namespace: str, payload: Any, fetch: Callable[[], Any],
+           model: str = '', ttl: Optional[float] = None) -> Any:
+    """ResponseCache.cached() on the default cache, or just fetch() when it is off."""
+    cache = default_cache()
+    if cache is None:
+        return fetch()
+    return cache.cached(namespace, payload, fetch, model, ttl)
+
+
+def cached_get(session, url: str, params: Optional[dict] = None,
+               limiter: Optional[Callable[[], None]] = None, namespace: str = 'http',
+               as_text: bool = False, ttl: Optional[float] = None,
+               use_cache: bool = True, timeout: int = 30) -> Any:
+    """
+    GET returning parsed JSON (or text), via the response cache.
+
+    Only cache misses hit the network, so only they call ``limiter``.
+
+    Args:
+        session: requests module or Session
+        url: Request URL
+        params: Query parameters (part of the cache key)
+        limiter: Called before each network request (e.g. a rate limiter)
+        namespace: Cache namespace
+        as_text: Return the body as text instead of parsed JSON
+        ttl: Cache entry lifetime in seconds
+        use_cache: False always fetches (and stores nothing)
+        timeout: Request timeout in seconds
+    """
+    def fetch():
+        if limiter:
+            limiter()
+        response = session.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.text if as_text else response.json()
+
+    if not use_cache:
+        return fetch()
+    return cached(namespace, {'url': url, 'params': params}, fetch, ttl=ttl)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear the response cache')
+    parser.add_argument('--clear', nargs='?', const='', default=None, metavar='NAMESPACE',
+                        help='Delete all entries, or only those in NAMESPACE')
+    args = parser.parse_args()
+
+    cache = ResponseCache(Path(os.environ.get('RESPONSE_CACHE_PATH', CACHE_PATH)))
+    if args.clear is not None:
+        cache.clear(args.clear or None)
+        print(f"Cleared {args.clear or 'all namespaces'}")
+
+    print(f"Response cache: {cache.path}")
+    for namespace, info in cache.stats().items():
+        print(f"  {namespace:<24} {info['entries']:>8,} entries  {info['bytes'] / 1e6:>8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Paginated and sampled reads from Supabase tables.
+
+``.range(offset, offset + 999)`` makes Postgres skip ``offset`` rows on
+every request, so full-table reads get slower page by page, and sampling
+one random offset per request costs one round trip per sample. This module
+provides:
+
+- iter_pages / iter_rows: keyset pagination on the primary key
+  (``WHERE key > last ORDER BY key LIMIT n``), streamed as a generator
+- iter_pages_parallel / iter_rows_parallel: split the key space into
+  ranges (numerically for integer keys, at sampled boundary keys for text
+  keys) and read several ranges at once, one client per worker thread,
+  yielding in key order with a bounded number of ranges in flight
+- sample_rows: random sample selected by key in a handful of requests
+  (random IDs probed with ``in_`` for integer keys, a key-only scan for
+  text keys) instead of one request per sample
+
+Filters are (method, column, value) tuples applied to the PostgREST query
+builder, e.g. ('eq', 'language_1', 'Latin') or ('gte', 'year', 1400).
+
+Usage:
+    from supabase_reader import iter_rows, sample_rows
+    for row in iter_rows(client, 'ustc_editions', 'id, title', key='id',
+                         filters=[('eq', 'language_1', 'Latin')]):
+        ...
+    sample = sample_rows(client, 'ustc_editions', 'id, title', key='id', n=100,
+                         filters=[('eq', 'language_1', 'Latin')], seed=456)
+    for row in iter_rows_parallel(get_supabase_client, 'bph_works', 'id, title', key='id',
+                                  workers=4):
+        ...
+"""
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+PAGE_SIZE = 1000
+
+# Ranges per worker for parallel reads; more ranges balance uneven key density
+RANGES_PER_WORKER = 8
+
+# Keys per ``in_`` request; keeps the query string well under URL limits
+IN_BATCH_SIZE = 200
+
+Filter = Tuple[str, str, Any]
+
+
+def _apply(query, filters: Sequence[Filter]):
+    for method, column, value in filters:
+        query = getattr(query, method)(column, value)
+    return query
+
+
+def iter_pages(client, table: str, columns: str, key: str,
+               filters: Sequence[Filter] = (),
+               after: Any = None, before: Any = None, start: Any = None,
+               page_size: int = PAGE_SIZE) -> Iterator[List[dict]]:
+    """
+    Pages of rows ordered by ``key``, using keyset pagination.
+
+    Args:
+        client: Supabase client
+        table: Table name
+        columns: Select string; must include ``key``
+        key: Unique, indexed column to paginate on (usually the primary key)
+        filters: (method, column, value) tuples
+        after: Only rows with key > after
+        before: Only rows with key < before
+        start: Only rows with key >= start (ignored if ``after`` is given)
+        page_size: Rows per request
+
+    Yields:
+        Lists of row dicts
+    """
+    while True:
+        query = _apply(client.table(table).select(columns), filters)
+        if after is not None:
+            query = query.gt(key, after)
+        elif start is not None:
+            query = query.gte(key, start)
+        if before is not None:
+            query = query.lt(key, before)
+        result = query.order(key).limit(page_size).execute()
+
+        if not result.data:
+            return
+        yield result.data
+        if len(result.data) < page_size:
+            return
+        after = result.data[-1][key]
+
+
+def iter_rows(client, table: str, columns: str, key: str,
+              filters: Sequence[Filter] = (), **kwargs) -> Iterator[dict]:
+    """Rows ordered by ``key``, streamed one at a time (see iter_pages)."""
+    for page in iter_pages(client, table, columns, key, filters, **kwargs):
+        yield from page
+
+
+def key_bounds(client, table: str, key: str,
+               filters: Sequence[Filter] = ()) -> Tuple[Any, Any]:
+    """Smallest and largest ``key`` matching the filters ((None, None) if none)."""
+    def edge(desc: bool):
+        query = _apply(client.table(table).select(key), filters)
+        result = query.order(key, desc=desc).limit(1).execute()
+        return result.data[0][key] if result.data else None
+    return edge(False), edge(True)
+
+
+def split_keys(client, table: str, key: str, filters: Sequence[Filter] = (),
+               ranges: int = 32) -> List[Tuple[Any, Any]]:
+    """
+    Split the matching key space into about ``ranges`` half-open [start, before) ranges.
+
+    Integer keys are split evenly between the smallest and largest key. Other
+    keys are split at the keys found at evenly spaced offsets (one small,
+    index-only request per boundary), so each range holds about as many rows.
+
+    Returns:
+        (start, before) pairs in key order; None means unbounded
+    """
+    lo, hi = key_bounds(client, table, key, filters)
+    if lo is None:
+        return []
+    if isinstance(lo, int):
+        width = (hi - lo) // ranges + 1
+        return [(start, start + width) for start in range(lo, hi + 1, width)]
+
+    count = _apply(client.table(table).select(key, count='exact'), filters).limit(1).execute().count or 0
+    boundaries = []
+    for i in range(1, ranges):
+        offset = i * count // ranges
+        result = _apply(client.table(table).select(key), filters).order(key).range(offset, offset).execute()
+        if result.data and (not boundaries or result.data[0][key] > boundaries[-1]):
+            boundaries.append(result.data[0][key])
+    edges = [None] + boundaries + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def iter_pages_parallel(client_factory: Callable, table: str, columns: str, key: str,
+                        filters: Sequence[Filter] = (),
+                        workers: int = 4,
+                        page_size: int = PAGE_SIZE) -> Iterator[List[dict]]:
+    """
+    Pages of rows ordered by ``key``, reading several key ranges at once.
+
+    The key space is split with ``split_keys`` into ``workers *
+    RANGES_PER_WORKER`` ranges; each range is read with keyset pagination by
+    a worker thread holding its own client. At most ``workers * 2`` ranges
+    are buffered at a time.
+
+    Args:
+        client_factory: Returns a new Supabase client (called once per thread)
+        table, columns, key, filters, page_size: As for iter_pages
+        workers: Concurrent requests
+
+    Yields:
+        Lists of row dicts, in key order
+    """
+    ranges = split_keys(client_factory(), table, key, filters, workers * RANGES_PER_WORKER)
+    local = threading.local()
+
+    def read_range(bounds: Tuple[Any, Any]) -> List[List[dict]]:
+        if not hasattr(local, 'client'):
+            local.client = client_factory()
+        start, before = bounds
+        return list(iter_pages(local.client, table, columns, key, filters,
+                               start=start, before=before, page_size=page_size))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for bounds in ranges:
+            pending.append(pool.submit(read_range, bounds))
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+
+def iter_rows_parallel(client_factory: Callable, table: str, columns: str, key: str,
+                       filters: Sequence[Filter] = (), **kwargs) -> Iterator[dict]:
+    """Rows ordered by ``key``, read concurrently (see iter_pages_parallel)."""
+    for page in iter_pages_parallel(client_factory, table, columns, key, filters, **kwargs):
+        yield from page
+
+
+def _fetch_keys(client, table: str, columns: str, key: str, keys: list,
+                filters: Sequence[Filter]) -> List[dict]:
+    rows = []
+    for i in range(0, len(keys), IN_BATCH_SIZE):
+        query = _apply(client.table(table).select(columns), filters)
+        rows.extend(query.in_(key, keys[i:i + IN_BATCH_SIZE]).execute().data or [])
+    return rows
+
+
+def sample_rows(client, table: str, columns: str, key: str, n: int,
+                filters: Sequence[Filter] = (), seed: Optional[int] = None,
+                max_rounds: int = 20) -> List[dict]:
+    """
+    Random sample of up to ``n`` rows matching the filters.
+
+    Integer keys: draw random IDs between the min and max matching key,
+    oversampled by the observed hit rate, and fetch them with ``in_``;
+    repeat until ``n`` rows are found. Text keys: scan just the key column
+    (keyset-paginated), sample keys locally and fetch those rows.
+
+    Args:
+        client: Supabase client
+        table: Table name
+        columns: Select string ('*' allowed); must include ``key``
+        key: Primary key column
+        n: Sample size
+        filters: (method, column, value) tuples
+        seed: Random seed for a reproducible sample
+        max_rounds: Give up probing integer IDs after this many rounds
+
+    Returns:
+        Row dicts in sampled order
+    """
+    rng = random.Random(seed)
+    lo, hi = key_bounds(client, table, key, filters)
+    if lo is None or n <= 0:
+        return []
+
+    if not isinstance(lo, int):
+        keys = [row[key] for row in iter_rows(client, table, key, key, filters)]
+        chosen = rng.sample(keys, min(n, len(keys)))
+        by_key = {row[key]: row for row in _fetch_keys(client, table, columns, key, chosen, filters)}
+        return [by_key[k] for k in chosen if k in by_key]
+
+    span = hi - lo + 1
+    sample: List[dict] = []
+    tried = set()
+    hit_rate = 1.0
+    for _ in range(max_rounds):
+        need = n - len(sample)
+        if need <= 0 or len(tried) >= span:
+            break
+        want = min(span - len(tried), int(need / max(hit_rate, 0.01) * 1.2) + 10)
+        probe = []
+        while len(probe) < want:
+            candidate = rng.randint(lo, hi)
+            if candidate not in tried:
+                tried.add(candidate)
+                probe.append(candidate)
+
+        found = {row[key]: row for row in _fetch_keys(client, table, columns, key, probe, filters)}
+        hit_rate = max(len(found) / len(probe), 0.001)
+        sample.extend(found[k] for k in probe if k in found)
+
+    return sample[:n]
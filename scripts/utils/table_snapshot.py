@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Local Arrow snapshots of Supabase tables.
+
+The matching scripts used to page through bph_works and ia_latin_texts
+1,000 rows at a time on every run. This module keeps one Arrow IPC file per
+table under data/snapshots/, refreshes it incrementally and memory-maps it
+on load, so a matcher starts in seconds and can run offline.
+
+Refresh strategy per table:
+- With an ``updated_column``: fetch rows whose timestamp is >= the stored
+  watermark (keyset-paginated on the primary key) and upsert them by key.
+  The column must change on every update (a trigger-maintained updated_at,
+  not created_at), or rows edited in place are never refreshed
+- Without one: keyset-paginate from the largest stored key (append-only)
+- ``full=True`` rebuilds from scratch (picks up deletions); full builds
+  read several key ranges concurrently (``READ_WORKERS``)
+
+If a refresh fails (e.g. no network) an existing snapshot is used as-is.
+Set SNAPSHOT_OFFLINE=1 to skip refreshing entirely.
+
+Usage:
+    from table_snapshot import load_table
+    works = load_table('bph_works', ['id', 'title', 'author', 'year'],
+                       filters=[('detected_language', '==', 'Latin')],
+                       client_factory=get_supabase_client)
+
+    python table_snapshot.py bph_works ia_latin_texts [--full]
+"""
+
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from supabase_reader import iter_pages, iter_pages_parallel
+
+SNAPSHOT_DIR = Path(__file__).parent.parent / "data" / "snapshots"
+PAGE_SIZE = 1000
+READ_WORKERS = 4   # Concurrent range reads when building a snapshot from scratch
+
+
+@dataclass
+class TableSpec:
+    name: str
+    key: str                               # Primary key, used for keyset pagination
+    columns: List[str]                     # Columns kept in the snapshot
+    updated_column: Optional[str] = None   # Monotonic timestamp for incremental refresh
+
+
+# Tables the matchers read, with the union of the columns they need
+TABLES = {
+    'bph_works': TableSpec(
+        name='bph_works',
+        key='id',
+        columns=['id', 'title', 'author', 'year', 'publisher', 'place', 'ubn',
+                 'detected_language', 'updated_at'],
+        # Trigger-maintained (db/supabase_bph_updated_at_migration.sql), so
+        # in-place updates such as detected_language are picked up
+        updated_column='updated_at',
+    ),
+    'ia_latin_texts': TableSpec(
+        name='ia_latin_texts',
+        key='identifier',
+        columns=['identifier', 'title', 'creator', 'year', 'description', 'updated_at'],
+        # Trigger-maintained (db/supabase_ia_updated_at_migration.sql), so
+        # rescrapes that upsert an existing identifier are picked up
+        updated_column='updated_at',
+    ),
+}
+
+# (column, op, value) filters applied to the local snapshot
+Filter = Tuple[str, str, object]
+
+_FILTER_OPS = {
+    '==': pc.equal,
+    '!=': pc.not_equal,
+    '>': pc.greater,
+    '>=': pc.greater_equal,
+    '<': pc.less,
+    '<=': pc.less_equal,
+}
+
+
+class TableSnapshot:
+    """One table's snapshot file plus its refresh metadata."""
+
+    def __init__(self, spec: TableSpec, client_factory: Optional[Callable] = None,
+                 snapshot_dir: Path = SNAPSHOT_DIR):
+        self.spec = spec
+        self.client_factory = client_factory
+        self.path = Path(snapshot_dir) / f"{spec.name}.arrow"
+        self.meta_path = Path(snapshot_dir) / f"{spec.name}.meta.json"
+
+    def exists(self) -> bool:
+        return self.path.exists() and self.meta_path.exists()
+
+    def read_meta(self) -> dict:
+        if not self.meta_path.exists():
+            return {}
+        with open(self.meta_path) as f:
+            return json.load(f)
+
+    def load(self) -> pa.Table:
+        """Memory-map the snapshot (zero-copy; pages are read on access)."""
+        source = pa.memory_map(str(self.path), 'r')
+        return pa.ipc.open_file(source).read_all()
+
+    def _pages(self, client, after_key=None, updated_since=None) -> Iterator[list]:
+        """Keyset-paginated pages ordered by the primary key."""
+        spec = self.spec
+        filters = []
+        if updated_since is not None:
+            filters.append(('gte', spec.updated_column, updated_since))
+        return iter_pages(client, spec.name, ', '.join(spec.columns), spec.key,
+                          filters, after=after_key, page_size=PAGE_SIZE)
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Bring the snapshot up to date with the table.
+
+        Args:
+            full: Ignore the existing snapshot and re-download everything
+
+        Returns:
+            Number of rows fetched
+        """
+        spec = self.spec
+        meta = {} if full or not self.exists() else self.read_meta()
+        incremental = bool(meta) and meta.get('columns') == spec.columns
+
+        if incremental and spec.updated_column:
+            pages = self._pages(self.client_factory(), updated_since=meta.get('watermark'))
+        elif incremental:
+            pages = self._pages(self.client_factory(), after_key=meta.get('last_key'))
+        else:
+            pages = iter_pages_parallel(self.client_factory, spec.name, ', '.join(spec.columns),
+                                        spec.key, workers=READ_WORKERS, page_size=PAGE_SIZE)
+
+        fetched = []
+        report_at = 10000
+        for page in pages:
+            fetched.extend(page)
+            # Pages from parallel range reads can be short, so count rather than test sizes
+            if len(fetched) >= report_at:
+                print(f"    {spec.name}: {len(fetched)} rows fetched...")
+                report_at += 10000
+
+        if incremental and not fetched:
+            meta['refreshed_at'] = datetime.now().isoformat()
+            self._write_meta(meta)
+            return 0
+
+        new_rows = pa.Table.from_pylist(fetched) if fetched else None
+        if incremental:
+            table = self.load()
+            if new_rows is not None:
+                # Upsert: drop stored versions of fetched keys, then append
+                keep = pc.invert(pc.is_in(table[spec.key], value_set=new_rows[spec.key]))
+                table = pa.concat_tables([table.filter(keep), new_rows.select(table.column_names)],
+                                         promote_options='default')
+        else:
+            table = new_rows if new_rows is not None else pa.table(
+                {c: pa.array([], pa.null()) for c in spec.columns})
+
+        table = table.sort_by(spec.key).combine_chunks()
+        self._write(table)
+        return len(fetched)
+
+    def _write(self, table: pa.Table):
+        spec = self.spec
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial file
+        tmp = self.path.with_suffix('.arrow.tmp')
+        with pa.OSFile(str(tmp), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, self.path)
+
+        meta = {
+            'table': spec.name,
+            'columns': spec.columns,
+            'rows': table.num_rows,
+            'last_key': table[spec.key][-1].as_py() if table.num_rows else None,
+            'watermark': (pc.max(table[spec.updated_column]).as_py()
+                          if spec.updated_column and table.num_rows else None),
+            'refreshed_at': datetime.now().isoformat(),
+        }
+        self._write_meta(meta)
+
+    def _write_meta(self, meta: dict):
+        tmp = self.meta_path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(tmp, self.meta_path)
+
+
+def _apply_filters(table: pa.Table, filters: Sequence[Filter]) -> pa.Table:
+    for column, op, value in filters:
+        table = table.filter(_FILTER_OPS[op](table[column], value))
+    return table
+
+
+def load_table(table: str, columns: Optional[Sequence[str]] = None,
+               filters: Sequence[Filter] = (),
+               client_factory: Optional[Callable] = None,
+               refresh: bool = True, full: bool = False,
+               snapshot_dir: Path = SNAPSHOT_DIR) -> List[dict]:
+    """
+    Rows of a Supabase table from the local snapshot, refreshed first.
+
+    Args:
+        table: Table name (must be in TABLES)
+        columns: Columns to return (default: all snapshot columns)
+        filters: (column, op, value) tuples, e.g. ('year', '>=', 1400);
+                 rows where the column is NULL never pass, as in PostgREST
+        client_factory: Returns a Supabase client; only called to refresh
+        refresh: Refresh before loading (skipped if SNAPSHOT_OFFLINE=1)
+        full: Rebuild the snapshot from scratch
+
+    Returns:
+        List of row dicts ordered by primary key
+    """
+    return load_arrow(table, columns, filters, client_factory,
+                      refresh, full, snapshot_dir).to_pylist()
+
+
+def load_arrow(table: str, columns: Optional[Sequence[str]] = None,
+               filters: Sequence[Filter] = (),
+               client_factory: Optional[Callable] = None,
+               refresh: bool = True, full: bool = False,
+               snapshot_dir: Path = SNAPSHOT_DIR) -> pa.Table:
+    """Same as load_table, but returns the (memory-mapped) Arrow table."""
+    spec = TABLES[table]
+    columns = list(columns or spec.columns)
+    unknown = set(columns) - set(spec.columns)
+    if unknown:
+        raise ValueError(f"Columns not in {table} snapshot: {sorted(unknown)}")
+
+    snapshot = TableSnapshot(spec, client_factory, snapshot_dir)
+    offline = os.environ.get('SNAPSHOT_OFFLINE') == '1'
+
+    if (refresh and not offline and client_factory is not None) or not snapshot.exists():
+        if client_factory is None:
+            raise RuntimeError(f"No snapshot of {table} and no Supabase client to build one")
+        try:
+            fetched = snapshot.refresh(full=full)
+            print(f"  Snapshot {table}: {fetched} rows fetched")
+        except Exception as e:
+            if not snapshot.exists():
+                raise
+            print(f"  Snapshot {table}: refresh failed ({e}), using local copy")
+
+    data = snapshot.load()
+    data = _apply_filters(data, filters)
+    return data.select(columns)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Refresh local Supabase table snapshots')
+    parser.add_argument('tables', nargs='*', default=list(TABLES), help='Tables to refresh')
+    parser.add_argument('--full', action='store_true', help='Rebuild from scratch')
+    args = parser.parse_args()
+
+    from supabase import create_client
+    url = os.environ.get("SUPABASE_URL", "https://ykhxaecbbxaaqlujuzde.supabase.co")
+    key = os.environ.get("SUPABASE_KEY")
+    if not key:
+        sys.exit("Set SUPABASE_KEY to refresh snapshots")
+
+    for table in args.tables:
+        snapshot = TableSnapshot(TABLES[table], lambda: create_client(url, key))
+        fetched = snapshot.refresh(full=args.full)
+        meta = snapshot.read_meta()
+        print(f"{table}: {fetched} rows fetched, {meta['rows']} rows in snapshot")
+
+
+if __name__ == "__main__":
+    main()
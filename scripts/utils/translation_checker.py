@@ -12,6 +12,8 @@ from typing import Dict, List, Optional, Set
 from urllib.parse import quote
 import pandas as pd
 
+from response_cache import DAY, cached_get
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,16 +22,21 @@ class TranslationChecker:
     Checks translation status across major bibliographic sources.
     """
 
+    CACHE_NAMESPACE = 'translation'
+
     def __init__(self, config: Dict = None):
         """
         Initialize translation checker.
 
         Args:
             config: Configuration dictionary for rate limiting and APIs
+                    ('use_cache' and 'cache_ttl_days' control response caching)
         """
         self.config = config or {}
         self.requests_per_second = self.config.get('requests_per_second', 2)
         self.last_request_time = 0
+        self.use_cache = self.config.get('use_cache', True)
+        self.cache_ttl = self.config.get('cache_ttl_days', 30) * DAY
 
         # Translation databases and sources
         self.translation_sources = {
@@ -68,6 +75,12 @@ class TranslationChecker:
 
         self.last_request_time = time.time()
 
+    def _get(self, url: str, params: Dict, as_text: bool = False):
+        """Rate-limited, cached GET (see response_cache.cached_get)."""
+        return cached_get(requests, url, params, limiter=self._rate_limit,
+                          namespace=self.CACHE_NAMESPACE, as_text=as_text,
+                          ttl=self.cache_ttl, use_cache=self.use_cache)
+
     def _load_translation_map(self) -> Dict:
         """
         Load known translations for major Neo-Latin authors.
@@ -349,8 +362,6 @@ class TranslationChecker:
         }
 
         try:
-            self._rate_limit()
-
             # Search for translations
             translation_queries = [
                 f'intitle:"{title}" translation',
@@ -366,14 +377,7 @@ class TranslationChecker:
                     'printType': 'books'
                 }
 
-                response = requests.get(
-                    self.translation_sources['google_books']['base_url'],
-                    params=params,
-                    timeout=30
-                )
-                response.raise_for_status()
-
-                data = response.json()
+                data = self._get(self.translation_sources['google_books']['base_url'], params)
 
                 if 'items' in data:
                     for item in data['items']:
@@ -0,0 +1,73 @@
+"""
+Tests for the Parquet-backed results of BaseCollector.
+
+Run from the repository root:
+    python -m pytest tests/
+"""
+
+import sys
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'scrapers'))
+
+from base_collector import BaseCollector, LazyFrame, load_collected
+
+
+def write_parts(dataset_dir: Path, batches):
+    """Write each batch of records as its own part file, as collect_data does."""
+    partition_dir = dataset_dir / 'catalogue=TEST'
+    partition_dir.mkdir(parents=True)
+    for i, records in enumerate(batches):
+        pq.write_table(BaseCollector._records_to_table(records), partition_dir / f'part-{i:05d}.parquet')
+
+
+def test_conflicting_types_across_parts(tmp_path):
+    write_parts(tmp_path, [
+        [{'id': 'a', 'year': 1500}, {'id': 'b', 'year': 1501}],
+        [{'id': 'c', 'year': 'c. 1510'}],
+    ])
+
+    df = load_collected(tmp_path, 'TEST')
+    frame = df.to_pandas()
+
+    assert len(df) == 3
+    assert list(frame['id']) == ['a', 'b', 'c']
+    assert list(frame['year']) == ['1500', '1501', 'c. 1510']
+
+
+def test_mixed_types_within_a_batch_and_across_parts(tmp_path):
+    write_parts(tmp_path, [
+        [{'id': 'a', 'pages': 120}],
+        [{'id': 'b', 'pages': 'xii, 240'}, {'id': 'c', 'pages': 96}],
+        [{'id': 'd', 'pages': None}],
+    ])
+
+    frame = load_collected(tmp_path).to_pandas()
+
+    assert list(frame['pages'][:3]) == ['120', 'xii, 240', '96']
+    assert frame['pages'].isna()[3]
+
+
+def test_widening_types_stay_numeric():
+    df = LazyFrame(tables=[
+        BaseCollector._records_to_table([{'id': 'a', 'price': 3}]),
+        BaseCollector._records_to_table([{'id': 'b', 'price': 2.5}, {'id': 'c'}]),
+    ])
+
+    table = df.to_arrow()
+
+    assert str(table.schema.field('price').type) == 'double'
+    assert table.column('price').to_pylist() == [3.0, 2.5, None]
+
+
+def test_in_memory_tables_with_conflicting_types():
+    df = LazyFrame(tables=[
+        BaseCollector._records_to_table([{'id': 'a', 'subjects': ['Theology']}]),
+        BaseCollector._records_to_table([{'id': 'b', 'subjects': 'Theology; Law'}]),
+    ])
+
+    frame = df.to_pandas()
+
+    assert list(frame['subjects']) == ["['Theology']", 'Theology; Law']
@@ -0,0 +1,89 @@
+"""
+Tests for BulkLoader's handling of failed upserts.
+
+Run from the repository root:
+    python -m pytest tests/
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts' / 'loaders'))
+
+from loader_core import BulkLoader, RetryPolicy
+
+
+class APIError(Exception):
+    """Shaped like postgrest.exceptions.APIError (the SQLSTATE is in ``code``)."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeTable:
+    def __init__(self, client, batch):
+        self.client = client
+        self.batch = batch
+
+    def upsert(self, batch, on_conflict=None):
+        self.batch = batch
+        return self
+
+    def execute(self):
+        self.client.requests += 1
+        if self.client.outage:
+            raise ConnectionError("connection reset")
+        bad = [row for row in self.batch if row['id'] in self.client.bad_ids]
+        if bad:
+            raise APIError('23502', f"null value in column \"title\" (id {bad[0]['id']})")
+        self.client.rows.update(row['id'] for row in self.batch)
+
+
+class FakeClient:
+    def __init__(self, bad_ids=(), outage=False):
+        self.bad_ids = set(bad_ids)
+        self.outage = outage
+        self.requests = 0
+        self.rows = set()
+
+    def table(self, name):
+        return FakeTable(self, None)
+
+
+def make_loader(client, state_dir):
+    return BulkLoader('works', key='id', transform=lambda record: record,
+                      client_factory=lambda: client, batch_size=10, workers=2,
+                      retry=RetryPolicy(attempts=2, base_delay=0), state_dir=state_dir)
+
+
+def test_rejected_rows_are_isolated(tmp_path):
+    client = FakeClient(bad_ids={3, 17})
+    stats = make_loader(client, tmp_path).run({'id': i} for i in range(30))
+
+    assert stats.uploaded == 28
+    assert stats.errors == 2
+    assert client.rows == set(range(30)) - {3, 17}
+    failed = [json.loads(line)['id'] for line in open(tmp_path / 'works.failed.jsonl')]
+    assert sorted(failed) == [3, 17]
+
+
+def test_outage_fails_the_batch_without_committing_it(tmp_path):
+    client = FakeClient(outage=True)
+    with pytest.raises(ConnectionError):
+        make_loader(client, tmp_path).run({'id': i} for i in range(30))
+
+    # Retried, not bisected into single-row requests, and nothing logged as rejected
+    assert client.requests <= 2 * 3
+    assert not (tmp_path / 'works.failed.jsonl').exists()
+    checkpoint = json.loads((tmp_path / 'works.checkpoint.json').read_text())
+    assert checkpoint['committed_batches'] == 0
+
+    # Once the database is back, a rerun sends every batch
+    client.outage = False
+    stats = make_loader(client, tmp_path).run({'id': i} for i in range(30))
+    assert stats.uploaded == 30
+    assert client.rows == set(range(30))
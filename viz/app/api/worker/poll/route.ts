@@ -1,7 +1,10 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { createServerClient } from '@/lib/supabase-server';
 
+const DEFAULT_LEASE_SECONDS = 120;
+
 // GET: Worker polls for next available job
+// Query: ?worker=<id>&lease=<seconds> claims the job under a renewable lease
 export async function GET(request: NextRequest) {
   // Validate worker API key
   const workerKey = request.headers.get('X-Worker-Key');
@@ -14,12 +17,31 @@ export async function GET(request: NextRequest) {
   try {
     const supabase = createServerClient();
 
+    // Lease-aware workers identify themselves; the claim is atomic, so
+    // concurrent workers never receive the same job
+    const workerId = request.nextUrl.searchParams.get('worker');
+    if (workerId) {
+      const leaseSeconds = Number(request.nextUrl.searchParams.get('lease')) || DEFAULT_LEASE_SECONDS;
+      const { data: claimed, error: claimError } = await supabase.rpc('claim_translation_job', {
+        p_worker: workerId,
+        p_lease_seconds: leaseSeconds
+      });
+
+      if (claimError) {
+        console.error('Job claim error:', claimError);
+        return NextResponse.json({ error: 'Failed to claim job' }, { status: 500 });
+      }
+
+      return NextResponse.json({ job: claimed?.[0] ?? null });
+    }
+
     // Find next job to process
     // Priority: processing_preview/processing_full (resume) > pending (new)
     const { data: job, error } = await supabase
       .from('translation_jobs')
       .select('*')
       .in('status', ['pending', 'processing_preview', 'processing_full'])
+      .or(`lease_expires_at.is.null,lease_expires_at.lt.${new Date().toISOString()}`)
       .order('status', { ascending: true }) // pending comes after processing_*
       .order('created_at', { ascending: true })
       .limit(1)
@@ -14,6 +14,10 @@ interface PageResult {
 
 interface UpdatePayload {
   jobId: string;
+  workerId?: string;
+  heartbeat?: boolean;
+  release?: boolean;
+  lease_seconds?: number;
   status?: string;
   total_pages?: number;
   pages_processed?: number;
@@ -24,7 +28,11 @@ interface UpdatePayload {
   page_result?: PageResult;
 }
 
+const DEFAULT_LEASE_SECONDS = 120;
+
 // POST: Worker reports progress/results
+// With workerId: heartbeat renews the lease, release gives the job back,
+// and a worker that no longer holds the lease gets 409
 export async function POST(request: NextRequest) {
   // Validate worker API key
   const workerKey = request.headers.get('X-Worker-Key');
@@ -38,6 +46,10 @@ export async function POST(request: NextRequest) {
     const body: UpdatePayload = await request.json();
     const {
       jobId,
+      workerId,
+      heartbeat,
+      release,
+      lease_seconds,
       status,
       total_pages,
       pages_processed,
@@ -54,9 +66,25 @@ export async function POST(request: NextRequest) {
 
     const supabase = createServerClient();
 
+    // Worker IDs are embedded in the lease filter below
+    if (workerId && !/^[\w.:-]+$/.test(workerId)) {
+      return NextResponse.json({ error: 'Invalid workerId' }, { status: 400 });
+    }
+
     // Update job fields
     const jobUpdates: Record<string, unknown> = {};
 
+    if (workerId && heartbeat) {
+      jobUpdates.leased_by = workerId;
+      jobUpdates.lease_expires_at = new Date(
+        Date.now() + (lease_seconds || DEFAULT_LEASE_SECONDS) * 1000
+      ).toISOString();
+    }
+    if (workerId && release) {
+      jobUpdates.leased_by = null;
+      jobUpdates.lease_expires_at = null;
+    }
+
     if (status) jobUpdates.status = status;
     if (total_pages !== undefined) jobUpdates.total_pages = total_pages;
     if (pages_processed !== undefined) jobUpdates.pages_processed = pages_processed;
@@ -65,16 +93,32 @@ export async function POST(request: NextRequest) {
     if (preview_completed_at) jobUpdates.preview_completed_at = preview_completed_at;
     if (completed_at) jobUpdates.completed_at = completed_at;
 
+    // Page-only updates still touch the row, so the lease check below runs
+    if (workerId && Object.keys(jobUpdates).length === 0) {
+      jobUpdates.updated_at = new Date().toISOString();
+    }
+
     if (Object.keys(jobUpdates).length > 0) {
-      const { error: jobError } = await supabase
+      let jobQuery = supabase
         .from('translation_jobs')
         .update(jobUpdates)
         .eq('id', jobId);
 
+      // The lease check is part of the UPDATE itself: a worker whose lease
+      // expired (and was taken over) matches no row and must stop writing
+      if (workerId) {
+        jobQuery = jobQuery.or(`leased_by.is.null,leased_by.eq.${workerId}`);
+      }
+
+      const { data: updated, error: jobError } = await jobQuery.select('id');
+
       if (jobError) {
         console.error('Job update error:', jobError);
         return NextResponse.json({ error: 'Failed to update job' }, { status: 500 });
       }
+      if (workerId && (!updated || updated.length === 0)) {
+        return NextResponse.json({ error: 'Lease lost' }, { status: 409 });
+      }
     }
 
     // Insert/update page result if provided